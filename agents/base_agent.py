@@ -1,6 +1,11 @@
+from utils import random_utils as ru
+
 class Agent:
-    def __init__(self, id):
+    def __init__(self, id, rngs=None, seed=None):
+        # rngs: the run's RNGManager; without one the agent gets its own,
+        # seeded from `seed` (subclasses pass their config's SEED)
         self.id = id
+        self.rng = ru.manager(rngs, seed).stream('agent', id)
 
     def act(self, market_state):
         raise NotImplementedError
@@ -1,32 +1,28 @@
 from agents.base_agent import Agent
-import config as cfg
-import random
+from environment.orders import Order
+from sim_config import resolve
 
 class FundamentalTrader(Agent):
-    def __init__(self, id, fundamental_price=100, aggressiveness=cfg.FUNDAMENTAL_TRADER_AGGRESSIVENESS, order_prob = cfg.FUNDAMENTAL_TRADER_ORDER_PROB):
-        super().__init__(id)
+    def __init__(self, id, fundamental_price=100, aggressiveness=None, order_prob=None, ttl=None, config=None,
+                 rngs=None):
+        c = resolve(config)
+        super().__init__(id, rngs, c.SEED)
         self.fundamental_price = fundamental_price
-        self.aggressiveness = aggressiveness
-        self.order_prob = order_prob
+        self.aggressiveness = c.FUNDAMENTAL_TRADER_AGGRESSIVENESS if aggressiveness is None else aggressiveness
+        self.order_prob = c.FUNDAMENTAL_TRADER_ORDER_PROB if order_prob is None else order_prob
+        self.ttl = c.FUNDAMENTAL_ORDER_TTL if ttl is None else ttl
 
 
     def act(self, market_state):
         mid = market_state['mid_price']
         self.fundamental_price = market_state['fundamental_price']
 
-        if random.random() > self.order_prob:
+        if self.rng.random() > self.order_prob:
             return []
 
         deviation = self.fundamental_price - mid
         side = 'buy' if deviation > 0 else 'sell'
         price = mid + deviation * 0.5
         qty = max(1, int(abs(deviation) / self.aggressiveness))
-        return [{
-            'agent_id': self.id,
-            'instrument': 'spot',
-            'order_type': 'limit',
-            'side': side,
-            'price': float(price),
-            'qty': int(qty),
-        }]
+        return [Order(self.id, side, float(price), int(qty), ttl=self.ttl)]
 
@@ -1,12 +1,15 @@
 from agents.base_agent import Agent
-import config as cfg
+from environment.orders import Order
+from sim_config import resolve
 
 
 class InformedTrader(Agent):
-    def __init__(self, id, sensitivity = cfg.INFORMED_TRADER_SENSITIVITY, aggressiveness = cfg.INFORMED_TRADER_AGGRESSIVENESS):
-        super().__init__(id)
-        self.sensitivity = sensitivity
-        self.aggressiveness = aggressiveness
+    def __init__(self, id, sensitivity=None, aggressiveness=None, ttl=None, config=None, rngs=None):
+        c = resolve(config)
+        super().__init__(id, rngs, c.SEED)
+        self.sensitivity = c.INFORMED_TRADER_SENSITIVITY if sensitivity is None else sensitivity
+        self.aggressiveness = c.INFORMED_TRADER_AGGRESSIVENESS if aggressiveness is None else aggressiveness
+        self.ttl = c.INFORMED_ORDER_TTL if ttl is None else ttl
 
     def act(self, market_state):
         mid = market_state['mid_price']
@@ -18,13 +21,6 @@ class InformedTrader(Agent):
         price = mid * (1 + self.sensitivity * news)
         side = 'buy' if news > 0 else 'sell'
         qty = max(1, int(abs(news) / self.aggressiveness))
-        return [{
-            'agent_id': self.id,
-            'instrument': 'spot',
-            'order_type': 'limit',
-            'side': side,
-            'price': float(price),
-            'qty': int(qty),
-        }]
+        return [Order(self.id, side, float(price), int(qty), ttl=self.ttl)]
 
 
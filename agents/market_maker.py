@@ -1,21 +1,25 @@
 from agents.base_agent import Agent
-import config as cfg
+from environment.orders import Order
+from sim_config import resolve
 
 class MarketMaker(Agent):
     def __init__(
         self,
         id,
-        base_spread=cfg.MM_BASE_SPREAD,
-        inventory_risk_aversion=cfg.MM_INV_RISK,
-        max_inventory=cfg.MM_MAX_INVENTORY,
-        base_size=cfg.MM_BASE_SIZE
+        base_spread=None,
+        inventory_risk_aversion=None,
+        max_inventory=None,
+        base_size=None,
+        config=None,
+        rngs=None
     ):
-        super().__init__(id)
+        c = resolve(config)
+        super().__init__(id, rngs, c.SEED)
         self.inventory = 0
-        self.max_inventory = max_inventory
-        self.base_spread = base_spread
-        self.inventory_risk_aversion = inventory_risk_aversion
-        self.base_size = base_size
+        self.max_inventory = c.MM_MAX_INVENTORY if max_inventory is None else max_inventory
+        self.base_spread = c.MM_BASE_SPREAD if base_spread is None else base_spread
+        self.inventory_risk_aversion = c.MM_INV_RISK if inventory_risk_aversion is None else inventory_risk_aversion
+        self.base_size = c.MM_BASE_SIZE if base_size is None else base_size
 
     def compute_spread(self):
         inv_penalty = self.inventory_risk_aversion * abs(self.inventory) / self.max_inventory
@@ -44,23 +48,9 @@ class MarketMaker(Agent):
         orders = []
 
         if bid_qty > 0:
-            orders.append({
-                'agent_id': self.id,
-                'instrument': 'spot',
-                'order_type': 'limit',
-                'side': 'buy',
-                'price': float(bid_price),
-                'qty': int(bid_qty),
-            })
+            orders.append(Order(self.id, 'buy', float(bid_price), int(bid_qty)))
 
         if ask_qty > 0:
-            orders.append({
-                'agent_id': self.id,
-                'instrument': 'spot',
-                'order_type': 'limit',
-                'side': 'sell',
-                'price': float(ask_price),
-                'qty': int(ask_qty),
-            })
+            orders.append(Order(self.id, 'sell', float(ask_price), int(ask_qty)))
 
         return orders
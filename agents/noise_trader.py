@@ -1,30 +1,24 @@
 from agents.base_agent import Agent
-from utils import random_utils as ru
-import config as cfg
-import random
+from environment.orders import Order
+from sim_config import resolve
 
 class NoiseTrader(Agent):
 
-    def __init__(self, id, noise_level=cfg.NOISE_TRADER_NOISE_LEVEL, order_prob = cfg.NOISE_ORDER_PROB):
-        super().__init__(id)
-        self.noise_level = noise_level
-        self.order_prob = order_prob
+    def __init__(self, id, noise_level=None, order_prob=None, ttl=None, config=None, rngs=None):
+        c = resolve(config)
+        super().__init__(id, rngs, c.SEED)
+        self.noise_level = c.NOISE_TRADER_NOISE_LEVEL if noise_level is None else noise_level
+        self.order_prob = c.NOISE_ORDER_PROB if order_prob is None else order_prob
+        self.ttl = c.NOISE_ORDER_TTL if ttl is None else ttl
 
     def act(self, market_state):
         mid = market_state['mid_price']
 
-        if random.random() > self.order_prob:
+        if self.rng.random() > self.order_prob:
             return []
-        price = mid * (1 + ru.uniform(-self.noise_level, self.noise_level))
-        qty = ru.randint(1, 5)
-        side = ru.choice(['buy', 'sell'])
+        price = mid * (1 + self.rng.uniform(-self.noise_level, self.noise_level))
+        qty = self.rng.randint(1, 5)
+        side = self.rng.choice(['buy', 'sell'])
 
-        return [{
-            'agent_id': self.id,
-            'instrument': 'spot',
-            'order_type': 'limit',
-            'side': side,
-            'price': float(price),
-            'qty': int(qty),
-        }]
+        return [Order(self.id, side, float(price), int(qty), ttl=self.ttl)]
 
@@ -1,12 +1,14 @@
 from agents.base_agent import Agent
-import config as cfg
-from utils.bs_utils import bs_price
+from environment.orders import Order
+from sim_config import resolve
+from utils.bs_utils import chain_snapshot
 import math
 
 class OptionsArbitrageur(Agent):
-    def __init__(self, id, threshold=cfg.OPTION_ARB_THRESHOLD, max_qty=5):
-        super().__init__(id)
-        self.threshold = threshold
+    def __init__(self, id, threshold=None, max_qty=5, config=None, rngs=None):
+        c = resolve(config)
+        super().__init__(id, rngs, c.SEED)
+        self.threshold = c.OPTION_ARB_THRESHOLD if threshold is None else threshold
         self.max_qty = max_qty
 
     def act(self, market_state):
@@ -20,6 +22,11 @@ class OptionsArbitrageur(Agent):
         mid_prices_call = market_state['mid_prices_call']
         mid_prices_put = market_state['mid_prices_put']
 
+        chain = market_state.get('chain')
+        if chain is None:
+            chain = chain_snapshot(S, strikes, r, q, vol, tau)
+        theos = chain['theo']
+
         orders = []
 
         for K in strikes:
@@ -29,8 +36,8 @@ class OptionsArbitrageur(Agent):
             if C_market is None or P_market is None:
                 continue
 
-            C_theo = bs_price(S, K, r, q, vol, tau, option_type='call')
-            P_theo = bs_price(S, K, r, q, vol, tau, option_type='put')
+            C_theo = theos[(K, 'call')]
+            P_theo = theos[(K, 'put')]
 
             if C_theo <= 0 or P_theo <= 0:
                 continue
@@ -40,46 +47,14 @@ class OptionsArbitrageur(Agent):
             if abs(parity_diff) > self.threshold:
                 if parity_diff > 0:
                     # call слишком дорогой относительно put
-                    orders.append({
-                        'agent_id': self.id,
-                        'instrument': 'option',
-                        'order_type': 'limit',
-                        'side': 'sell',
-                        'price': float(C_market),
-                        'qty': int(self.max_qty),
-                        'strike': K,
-                        'option_type': 'call'
-                    })
-                    orders.append({
-                        'agent_id': self.id,
-                        'instrument': 'option',
-                        'order_type': 'limit',
-                        'side': 'buy',
-                        'price': float(P_market),
-                        'qty': int(self.max_qty),
-                        'strike': K,
-                        'option_type': 'put'
-                    })
+                    orders.append(Order(self.id, 'sell', float(C_market), int(self.max_qty),
+                                        instrument='option', strike=K, option_type='call'))
+                    orders.append(Order(self.id, 'buy', float(P_market), int(self.max_qty),
+                                        instrument='option', strike=K, option_type='put'))
                 else:
-                    orders.append({
-                        'agent_id': self.id,
-                        'instrument': 'option',
-                        'order_type': 'limit',
-                        'side': 'buy',
-                        'price': float(C_market),
-                        'qty': int(self.max_qty),
-                        'strike': K,
-                        'option_type': 'call'
-                    })
-                    orders.append({
-                        'agent_id': self.id,
-                        'instrument': 'option',
-                        'order_type': 'limit',
-                        'side': 'sell',
-                        'price': float(P_market),
-                        'qty': int(self.max_qty),
-                        'strike': K,
-                        'option_type': 'put'
-                })
+                    orders.append(Order(self.id, 'buy', float(C_market), int(self.max_qty),
+                                        instrument='option', strike=K, option_type='call'))
+                    orders.append(Order(self.id, 'sell', float(P_market), int(self.max_qty),
+                                        instrument='option', strike=K, option_type='put'))
 
         return orders
@@ -1,17 +1,19 @@
 # agents/options_market_maker.py
 from agents.base_agent import Agent
-import config as cfg
-from utils.bs_utils import bs_price, bs_delta
+from environment.orders import Order
+from sim_config import resolve
+from utils.bs_utils import chain_snapshot
 from collections import defaultdict
 import math
-from utils import random_utils as ru
 
 class OptionsMarketMaker(Agent):
-    def __init__(self, id, base_spread_factor=cfg.OPTION_SPREAD_FACTOR, base_size=1, hedge_aggressiveness=1.0):
-        super().__init__(id)
+    def __init__(self, id, base_spread_factor=None, base_size=1, hedge_aggressiveness=1.0, config=None,
+                 rngs=None):
+        c = resolve(config)
+        super().__init__(id, rngs, c.SEED)
         self.inventory = 0
         self.inventory_by_option = {}
-        self.base_spread_factor = base_spread_factor
+        self.base_spread_factor = c.OPTION_SPREAD_FACTOR if base_spread_factor is None else base_spread_factor
         self.base_size = base_size
         self.hedge_aggressiveness = hedge_aggressiveness
         self.max_spot_inventory = 50
@@ -31,11 +33,15 @@ class OptionsMarketMaker(Agent):
         q = market_state.get('q', 0.0)
         strikes = market_state['strikes']
 
+        chain = market_state.get('chain')
+        if chain is None:
+            chain = chain_snapshot(S, strikes, r, q, vol, tau)
+        theos = chain['theo']
+
         orders = []
         for K in strikes:
             for option_type in ['call', 'put']:
-                theo = bs_price(S, K, r, q, vol, tau, option_type=option_type)
-                theo = max(float(theo), 0.0001)
+                theo = max(theos[(K, option_type)], 0.0001)
 
 
                 spread = self.base_spread_factor * theo
@@ -44,33 +50,17 @@ class OptionsMarketMaker(Agent):
                 ask = theo + spread / 2
 
 
-                qty = float(ru.uniform(1, 3))
+                qty = float(self.rng.uniform(1, 3))
 
                 long_limit_hit = self.inventory >= self.max_spot_inventory
                 short_limit_hit = self.inventory <= -self.max_spot_inventory
 
                 if not long_limit_hit:
-                    orders.append({
-                        'agent_id': self.id,
-                        'instrument': 'option',
-                        'order_type': 'limit',
-                        'side': 'buy',
-                        'price': float(bid),
-                        'qty': qty,
-                        'strike': K,
-                        'option_type': option_type,
-                    })
+                    orders.append(Order(self.id, 'buy', float(bid), qty, instrument='option',
+                                        strike=K, option_type=option_type))
 
                 if not short_limit_hit:
-                    orders.append({
-                        'agent_id': self.id,
-                        'instrument': 'option',
-                        'order_type': 'limit',
-                        'side': 'sell',
-                        'price': float(ask),
-                        'qty': qty,
-                        'strike': K,
-                        'option_type': option_type,
-                    })
+                    orders.append(Order(self.id, 'sell', float(ask), qty, instrument='option',
+                                        strike=K, option_type=option_type))
 
         return orders
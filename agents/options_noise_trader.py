@@ -1,9 +1,9 @@
 from agents.base_agent import Agent
-from utils import random_utils as ru
+from environment.orders import Order
 
 class OptionsNoiseTrader(Agent):
-    def __init__(self, id, max_qty=2, noise=0.3):
-        super().__init__(id)
+    def __init__(self, id, max_qty=2, noise=0.3, rngs=None):
+        super().__init__(id, rngs)
         self.max_qty = max_qty
         self.noise = noise
 
@@ -11,25 +11,17 @@ class OptionsNoiseTrader(Agent):
         S = market_state['spot']
         strikes = market_state['strikes']
 
-        if ru.choice([True, False]):
-            K = ru.choice(strikes)
-            option_type = ru.choice(['call', 'put'])
+        if self.rng.choice([True, False]):
+            K = self.rng.choice(strikes)
+            option_type = self.rng.choice(['call', 'put'])
             if option_type == 'call':
-                price = market_state['mid_prices_call'].get(K, 1.0) * (1 + ru.uniform(-self.noise, self.noise))
+                price = market_state['mid_prices_call'].get(K, 1.0) * (1 + self.rng.uniform(-self.noise, self.noise))
             else:
-                price = market_state['mid_prices_put'].get(K, 1.0) * (1 + ru.uniform(-self.noise, self.noise))
+                price = market_state['mid_prices_put'].get(K, 1.0) * (1 + self.rng.uniform(-self.noise, self.noise))
 
-            qty = ru.randint(1, self.max_qty)
-            side = ru.choice(['buy', 'sell'])
-            return [{
-                'agent_id': self.id,
-                'instrument': 'option',
-                'order_type': 'limit',
-                'side': side,
-                'price': float(price),
-                'qty': int(qty),
-                'strike': K,
-                'option_type': option_type
-            }]
+            qty = self.rng.randint(1, self.max_qty)
+            side = self.rng.choice(['buy', 'sell'])
+            return [Order(self.id, side, float(price), int(qty), instrument='option',
+                          strike=K, option_type=option_type)]
 
         return []
@@ -0,0 +1,113 @@
+import numpy as np
+from utils import random_utils as ru
+from environment.orders import Order
+from sim_config import resolve
+
+
+def _per_member(value, n):
+    # scalar or per-member sequence -> float array of length n
+    return np.array(np.broadcast_to(np.asarray(value, dtype=float), (n,)))
+
+
+class AgentPopulation:
+    # a group of same-type traders acting as one entry in the market's agent
+    # list: parameters live in arrays indexed like `ids`, and act() draws the
+    # whole group's decisions for a step at once and returns their orders in
+    # member order, as if each member had acted in turn
+    def __init__(self, ids, ttl=None, rng=None, rngs=None, seed=None):
+        # rng: a numpy Generator; by default one from the run's RNGManager
+        # (rngs), or from a manager of its own seeded from `seed`
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.ttl = ttl
+        if rng is None:
+            key = int(self.ids[0]) if len(self.ids) else 'empty'
+            rng = ru.manager(rngs, seed).generator('population', key)
+        self.rng = rng
+
+    def __len__(self):
+        return len(self.ids)
+
+    def act(self, market_state):
+        raise NotImplementedError
+
+    def _orders(self, ids, sides, prices, qtys):
+        ttl = self.ttl
+        return [Order(agent_id, side, price, qty, ttl=ttl)
+                for agent_id, side, price, qty in zip(ids.tolist(), sides, prices.tolist(), qtys.tolist())]
+
+
+class NoiseTraderPopulation(AgentPopulation):
+    # vectorised NoiseTrader
+    def __init__(self, ids, noise_level=None, order_prob=None, ttl=None, rng=None, config=None, rngs=None):
+        c = resolve(config)
+        super().__init__(ids, ttl=c.NOISE_ORDER_TTL if ttl is None else ttl, rng=rng, rngs=rngs, seed=c.SEED)
+        self.noise_level = _per_member(c.NOISE_TRADER_NOISE_LEVEL if noise_level is None else noise_level, len(self))
+        self.order_prob = _per_member(c.NOISE_ORDER_PROB if order_prob is None else order_prob, len(self))
+
+    def act(self, market_state):
+        mid = market_state['mid_price']
+        rng = self.rng
+
+        active = rng.random(len(self)) <= self.order_prob
+        ids = self.ids[active]
+        if not len(ids):
+            return []
+        noise = self.noise_level[active]
+        prices = mid * (1 + rng.uniform(-noise, noise))
+        qtys = rng.integers(1, 6, len(ids))
+        sides = np.where(rng.random(len(ids)) < 0.5, 'buy', 'sell').tolist()
+
+        return self._orders(ids, sides, prices, qtys)
+
+
+class InformedTraderPopulation(AgentPopulation):
+    # vectorised InformedTrader; every member trades on non-zero news
+    def __init__(self, ids, sensitivity=None, aggressiveness=None, ttl=None, rng=None, config=None,
+                 rngs=None):
+        c = resolve(config)
+        super().__init__(ids, ttl=c.INFORMED_ORDER_TTL if ttl is None else ttl, rng=rng, rngs=rngs,
+                         seed=c.SEED)
+        self.sensitivity = _per_member(c.INFORMED_TRADER_SENSITIVITY if sensitivity is None else sensitivity,
+                                       len(self))
+        self.aggressiveness = _per_member(c.INFORMED_TRADER_AGGRESSIVENESS if aggressiveness is None
+                                          else aggressiveness, len(self))
+
+    def act(self, market_state):
+        mid = market_state['mid_price']
+        news = market_state['news']
+        news = max(-1.0, min(1.0, float(news)))  # clip
+        if news == 0 or not len(self):
+            return []
+
+        prices = mid * (1 + self.sensitivity * news)
+        side = 'buy' if news > 0 else 'sell'
+        qtys = np.maximum(1, (abs(news) / self.aggressiveness).astype(np.int64))
+        return self._orders(self.ids, [side] * len(self), prices, qtys)
+
+
+class FundamentalTraderPopulation(AgentPopulation):
+    # vectorised FundamentalTrader
+    def __init__(self, ids, fundamental_price=100, aggressiveness=None, order_prob=None, ttl=None, rng=None,
+                 config=None, rngs=None):
+        c = resolve(config)
+        super().__init__(ids, ttl=c.FUNDAMENTAL_ORDER_TTL if ttl is None else ttl, rng=rng, rngs=rngs,
+                         seed=c.SEED)
+        self.fundamental_price = fundamental_price
+        self.aggressiveness = _per_member(c.FUNDAMENTAL_TRADER_AGGRESSIVENESS if aggressiveness is None
+                                          else aggressiveness, len(self))
+        self.order_prob = _per_member(c.FUNDAMENTAL_TRADER_ORDER_PROB if order_prob is None else order_prob, len(self))
+
+    def act(self, market_state):
+        mid = market_state['mid_price']
+        self.fundamental_price = market_state['fundamental_price']
+
+        active = self.rng.random(len(self)) <= self.order_prob
+        ids = self.ids[active]
+        if not len(ids):
+            return []
+
+        deviation = self.fundamental_price - mid
+        side = 'buy' if deviation > 0 else 'sell'
+        price = mid + deviation * 0.5
+        qtys = np.maximum(1, (abs(deviation) / self.aggressiveness[active]).astype(np.int64))
+        return self._orders(ids, [side] * len(ids), np.full(len(ids), price), qtys)
@@ -1,45 +1,42 @@
 from agents.base_agent import Agent
-import numpy as np
-from collections import deque
-import config as cfg
+from environment.orders import Order
+from environment.trend_indicators import TrendIndicator
+from sim_config import resolve
 
 class TrendTrader(Agent):
     def __init__(self, id,
-                 lookback=cfg.TREND_TRADER_LOOKBACK,
-                 threshold=cfg.TREND_TRADER_THRESHOLD,
-                 k=cfg.TREND_TRADER_AGGRESSIVENESS,
-                 max_qty=cfg.TREND_TRADER_MAX_QTY):
-        super().__init__(id)
-        self.lookback = lookback
-        self.threshold = threshold
-        self.k = k
-        self.max_qty = max_qty
-        self.price_history = deque(maxlen=lookback)
+                 lookback=None,
+                 threshold=None,
+                 k=None,
+                 max_qty=None,
+                 ttl=None,
+                 config=None,
+                 rngs=None):
+        c = resolve(config)
+        super().__init__(id, rngs, c.SEED)
+        self.lookback = c.TREND_TRADER_LOOKBACK if lookback is None else lookback
+        self.threshold = c.TREND_TRADER_THRESHOLD if threshold is None else threshold
+        self.k = c.TREND_TRADER_AGGRESSIVENESS if k is None else k
+        self.max_qty = c.TREND_TRADER_MAX_QTY if max_qty is None else max_qty
+        self.ttl = c.TREND_ORDER_TTL if ttl is None else ttl
+        # private until the market hands over its shared indicators
+        self.indicator = TrendIndicator(self.lookback)
+        self._shared = False
+
+    def subscribe_indicators(self, indicators):
+        self.indicator = indicators.subscribe(self.lookback)
+        self._shared = True
 
     def atr(self):
-        if len(self.price_history) < 20:
-            return None
-        closes = np.array(self.price_history)
-        returns = np.abs(np.diff(closes))
-        atr = np.mean(returns)
-        return atr if atr > 0 else None
+        return self.indicator.atr()
 
     def trend(self):
-        if len(self.price_history) < 10:
-            return 0
-        prices = np.array(self.price_history)
-        logp = np.log(prices)
-        x = np.arange(len(logp))
-        slope = np.polyfit(x, logp, 1)[0]
-        ret = np.diff(logp)
-        vol = np.std(ret) if len(ret) > 1 else 0
-        if vol == 0:
-            return 0
-        return slope / vol
+        return self.indicator.trend()
 
     def act(self, market_state):
         mid = market_state['mid_price']
-        self.price_history.append(mid)
+        if not self._shared:
+            self.indicator.update(mid)
 
         trend = self.trend()
         if abs(trend) < self.threshold:
@@ -59,12 +56,5 @@ class TrendTrader(Agent):
         spread = max(mid * 0.002, 2 * atr)
         price = mid - spread / 2 if side == 'buy' else mid + spread / 2
 
-        return [{
-            'agent_id': self.id,
-            'instrument': 'spot',
-            'order_type': 'limit',
-            'side': side,
-            'price': float(price),
-            'qty': int(qty),
-        }]
+        return [Order(self.id, side, float(price), int(qty), ttl=self.ttl)]
 
@@ -0,0 +1,105 @@
+# python -m benchmarks.bench_implied_vol [--chains 2000] [--tol 1e-6]
+import argparse
+import time
+import numpy as np
+import config as cfg
+from utils import bs_utils
+from benchmarks.harness import register
+
+
+def make_chains(n_chains, strikes, seed=0):
+    rng = np.random.default_rng(seed)
+    # spot and vol surface follow random walks, like consecutive simulation steps
+    S = 100 * np.exp(np.cumsum(0.01 * rng.standard_normal(n_chains)))
+    level = 0.2 * np.exp(np.cumsum(0.02 * rng.standard_normal(n_chains)))
+    skew = 1 + 0.05 * rng.standard_normal((n_chains, len(strikes), 2))
+    vols = np.clip(level[:, None, None] * skew, 0.01, 3.0)
+    K = np.asarray(strikes, dtype=float)[None, :, None]
+    prices = bs_utils.bs_price_vec(S[:, None, None], K, cfg.OPTION_R, cfg.OPTION_Q, vols, cfg.OPTION_TAU,
+                                   np.array(['call', 'put']))
+    return S, vols, prices
+
+
+def run_bisection(S, prices, strikes, tol):
+    out = np.full(prices.shape, np.nan)
+    for n in range(len(S)):
+        for i, K in enumerate(strikes):
+            for j, option_type in enumerate(('call', 'put')):
+                iv = bs_utils.implied_volatility(prices[n, i, j], S[n], K, cfg.OPTION_R, cfg.OPTION_Q,
+                                                 cfg.OPTION_TAU, option_type=option_type, tol=tol)
+                out[n, i, j] = np.nan if iv is None else iv
+    return out
+
+
+def run_solver(S, prices, strikes, tol):
+    solver = bs_utils.ImpliedVolSolver(strikes, cfg.OPTION_R, cfg.OPTION_Q, cfg.OPTION_TAU, tol=tol)
+    out = np.full(prices.shape, np.nan)
+    for n in range(len(S)):
+        calls = dict(zip(strikes, prices[n, :, 0]))
+        puts = dict(zip(strikes, prices[n, :, 1]))
+        out[n, :, 0], out[n, :, 1] = solver.solve_arrays(S[n], calls, puts)
+    return out
+
+
+def bench_chains(run, n_chains=200, tol=1e-6):
+    # harness factory: one of the run_* solvers over n_chains seeded chains
+    def setup():
+        strikes = cfg.OPTION_STRIKES
+        S, _, prices = make_chains(n_chains, strikes)
+        return lambda: run(S, prices, strikes, tol)
+    return setup
+
+
+def run_batch(S, prices, strikes, tol):
+    return bs_utils.implied_volatility_vec(prices, S[:, None, None], np.asarray(strikes, dtype=float)[None, :, None],
+                                           cfg.OPTION_R, cfg.OPTION_Q, cfg.OPTION_TAU,
+                                           np.array(['call', 'put']), tol=tol)
+
+
+# per chain (every strike, call and put), for python -m benchmarks.run
+register("implied_vol.bisection[chain]", bench_chains(run_bisection), ops=200, repeat=5)
+register("implied_vol.solver[chain]", bench_chains(run_solver), ops=200, repeat=5)
+register("implied_vol.batch[chain]", bench_chains(run_batch), ops=200, repeat=5)
+
+
+def report(name, seconds, ivs, S, prices, strikes, n_chains):
+    K = np.asarray(strikes, dtype=float)[None, :, None]
+    repriced = bs_utils.bs_price_vec(S[:, None, None], K, cfg.OPTION_R, cfg.OPTION_Q, ivs, cfg.OPTION_TAU,
+                                     np.array(['call', 'put']))
+    err = np.nanmax(np.abs(repriced - prices))
+    print(f"{name:<12} {seconds * 1e3:9.1f} ms  {seconds / n_chains * 1e6:9.1f} us/chain  "
+          f"max |price error| {err:.2e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Implied vol: bisection vs vectorised Halley solver")
+    parser.add_argument("--chains", type=int, default=2000)
+    parser.add_argument("--tol", type=float, default=1e-6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    strikes = cfg.OPTION_STRIKES
+    S, vols, prices = make_chains(args.chains, strikes, seed=args.seed)
+
+    t0 = time.perf_counter()
+    iv_bisect = run_bisection(S, prices, strikes, args.tol)
+    t_bisect = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    iv_solver = run_solver(S, prices, strikes, args.tol)
+    t_solver = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    iv_batch = run_batch(S, prices, strikes, args.tol)
+    t_batch = time.perf_counter() - t0
+
+    print(f"{args.chains} chains x {len(strikes)} strikes x 2 types, tol={args.tol:g}")
+    report("bisection", t_bisect, iv_bisect, S, prices, strikes, args.chains)
+    report("solver", t_solver, iv_solver, S, prices, strikes, args.chains)
+    report("batch", t_batch, iv_batch, S, prices, strikes, args.chains)
+    print(f"max |solver - bisection| IV: {np.nanmax(np.abs(iv_solver - iv_bisect)):.2e}")
+    print(f"speed-up per chain: {t_bisect / t_solver:.1f}x (warm-started), {t_bisect / t_batch:.1f}x (batch)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import json
+import platform
+import subprocess
+import time
+import numpy as np
+
+# Minimal benchmark runner. A benchmark is a factory registered under a
+# name: each call does the (untimed) setup and returns the callable to time,
+# which performs `ops` operations. Every repeat gets a fresh setup, so
+# benchmarks that change state (adding orders, stepping a market) always
+# time the same work. Results are seconds per operation; the minimum over
+# the repeats is what baselines are compared on.
+
+BENCHMARKS = {}
+
+
+class Benchmark:
+    def __init__(self, name, factory, ops=1, repeat=15, suite='micro'):
+        self.name = name
+        self.factory = factory
+        self.ops = ops
+        self.repeat = repeat
+        self.suite = suite
+
+    def run(self, repeat=None):
+        times = []
+        for _ in range(repeat or self.repeat):
+            fn = self.factory()
+            t0 = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - t0) / self.ops)
+        return {
+            'min': min(times),
+            'median': float(np.median(times)),
+            'ops': self.ops,
+            'repeat': len(times),
+            'suite': self.suite,
+        }
+
+
+def register(name, factory, ops=1, repeat=15, suite='micro'):
+    if name in BENCHMARKS:
+        raise ValueError(f"duplicate benchmark name: {name!r}")
+    BENCHMARKS[name] = Benchmark(name, factory, ops, repeat, suite)
+
+
+def select(suite='all', pattern=None):
+    return [b for b in BENCHMARKS.values()
+            if (suite == 'all' or b.suite == suite) and (pattern is None or pattern in b.name)]
+
+
+def _git_rev():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'git_rev': _git_rev(),
+        'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def run_all(benchmarks, repeat=None, stream=None):
+    results = {}
+    for b in benchmarks:
+        results[b.name] = r = b.run(repeat)
+        if stream is not None:
+            print(f"{b.name:<48}{format_time(r['min']):>12}{format_time(r['median']):>12}", file=stream, flush=True)
+    return {'env': environment(), 'results': results}
+
+
+def format_time(seconds):
+    for unit, scale in (('s', 1.0), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def save(path, report):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current, threshold=0.5, thresholds=None):
+    # -> [(name, base, new, ratio, status)] with status 'regression' when
+    # new > base * (1 + threshold), 'improvement' when new < base / (1 +
+    # threshold), 'ok' otherwise; benchmarks only in one report are skipped.
+    # thresholds: {name: threshold} overrides for noisy benchmarks.
+    thresholds = thresholds or {}
+    rows = []
+    base_results = baseline['results']
+    for name, r in current['results'].items():
+        if name not in base_results:
+            continue
+        base = base_results[name]['min']
+        new = r['min']
+        ratio = new / base if base > 0 else float('inf')
+        limit = 1 + thresholds.get(name, threshold)
+        if ratio > limit:
+            status = 'regression'
+        elif ratio < 1 / limit:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append((name, base, new, ratio, status))
+    return rows
+
+
+def comparison_table(rows):
+    lines = [f"{'benchmark':<48}{'baseline':>12}{'current':>12}{'ratio':>8}  status"]
+    for name, base, new, ratio, status in rows:
+        lines.append(f"{name:<48}{format_time(base):>12}{format_time(new):>12}{ratio:>8.2f}  {status}")
+    return "\n".join(lines)
@@ -0,0 +1,66 @@
+import numpy as np
+from environment.simulation import Simulation, build_spot, build_options
+from sim_config import SimConfig
+from utils.logger import Logger
+from utils.sinks import SummarySink
+from benchmarks.harness import register
+
+# Macro-benchmarks: whole market steps and an end-to-end run, with fixed
+# seeds and nothing written to disk.
+
+SEED = 11
+N_STEPS = 200
+
+
+def quiet_logger():
+    return Logger(trades_file=None, events_file=None, enable_console=False, level='warning')
+
+
+def bench_market_step(n_steps=N_STEPS, warmup=100):
+    def setup():
+        c = SimConfig.from_module(SEED=SEED)
+        market, agents = build_spot(c, quiet_logger())
+        for t in range(warmup):
+            market.step(t, agents)
+
+        def run():
+            for t in range(warmup, warmup + n_steps):
+                market.step(t, agents)
+        return run
+    return setup
+
+
+def bench_options_market_step(n_steps=N_STEPS, warmup=100):
+    # options only: spot mids follow a seeded random walk, the spot book is
+    # there for the hedge orders
+    def setup():
+        c = SimConfig.from_module(SEED=SEED)
+        market, agents = build_spot(c, quiet_logger())
+        for t in range(warmup):
+            market.step(t, agents)
+        options_market, options_agents = build_options(c, logger=market.logger)
+        rng = np.random.default_rng(SEED)
+        spots = (market.mid_price * np.exp(np.cumsum(0.002 * rng.standard_normal(n_steps)))).tolist()
+
+        def run():
+            for i, S in enumerate(spots):
+                options_market.step(warmup + i, S, options_agents, vol=c.OPTION_VOL,
+                                    spot_order_book=market.order_book)
+        return run
+    return setup
+
+
+def bench_simulation(n_steps, warmup=100, include_arbitrage=True):
+    # warm-up and measured steps through a SummarySink
+    def setup():
+        c = SimConfig.from_module(SEED=SEED, NUM_STEPS=n_steps, WARMUP_STEPS=warmup)
+        sim = Simulation(c, include_arbitrage=include_arbitrage, logger=quiet_logger())
+        return lambda: sim.run(SummarySink())
+    return setup
+
+
+register("Market.step", bench_market_step(), ops=N_STEPS, repeat=5, suite='macro')
+register("OptionsMarket.step", bench_options_market_step(), ops=N_STEPS, repeat=5, suite='macro')
+register("Simulation.run[500]", bench_simulation(500), ops=600, repeat=3, suite='macro')
+register("Simulation.run[500,no-arb]", bench_simulation(500, include_arbitrage=False), ops=600, repeat=3,
+         suite='macro')
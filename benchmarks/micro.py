@@ -0,0 +1,163 @@
+import numpy as np
+import config as cfg
+from agents.trend_trader import TrendTrader
+from environment.market import ORDER_BOOK_IMPLS
+from environment.order_book import OrderBook
+from environment.orders import Order
+from utils import bs_utils
+from utils.vol_utils import realised_vol_last
+from benchmarks.harness import register
+
+# Micro-benchmarks: single hot functions on synthetic, seeded inputs.
+
+DEPTHS = (10, 100, 1000)    # resting orders per side
+N_ORDERS = 200              # orders added / matched per timed call
+N_AGENTS = 50
+
+
+def make_book(impl, depth, seed=0):
+    # `depth` resting orders per side, one tick apart, around a 100.00 mid
+    rng = np.random.default_rng(seed)
+    book = OrderBook(initial_price=100.0, impl=impl)
+    qty = rng.integers(1, 10, size=(2, depth))
+    agents = rng.integers(1, N_AGENTS + 1, size=(2, depth))
+    for i in range(depth):
+        book.add_order(Order(int(agents[0, i]), 'buy', 99.99 - 0.01 * i, int(qty[0, i])))
+        book.add_order(Order(int(agents[1, i]), 'sell', 100.01 + 0.01 * i, int(qty[1, i])))
+    return book
+
+
+def passive_orders(n, seed=1):
+    # inside the resting range, so nothing crosses
+    rng = np.random.default_rng(seed)
+    offsets = 0.01 * rng.integers(0, 50, size=n)
+    return [Order(N_AGENTS + 1, 'buy', 99.99 - d, 1) if i % 2 else Order(N_AGENTS + 1, 'sell', 100.01 + d, 1)
+            for i, d in enumerate(offsets.tolist())]
+
+
+def crossing_orders(n):
+    # small marketable orders alternating sides; each takes part of the top level
+    return [Order(N_AGENTS + 1, 'buy' if i % 2 else 'sell', 101.0 if i % 2 else 99.0, 1) for i in range(n)]
+
+
+def bench_add_passive(impl, depth):
+    def setup():
+        book = make_book(impl, depth)
+        orders = passive_orders(N_ORDERS)
+
+        def run():
+            for o in orders:
+                book.add_order(o)
+        return run
+    return setup
+
+
+def bench_add_crossing(impl, depth):
+    def setup():
+        book = make_book(impl, depth)
+        orders = crossing_orders(N_ORDERS)
+
+        def run():
+            for o in orders:
+                book.add_order(o)
+        return run
+    return setup
+
+
+def bench_match_orders(impl, depth):
+    # a batch of crossing orders queued unmatched, then matched in one call
+    def setup():
+        book = make_book(impl, depth)
+        for o in crossing_orders(N_ORDERS):
+            book.add_order(o, match=False)
+        return book.match_orders
+    return setup
+
+
+def bench_cancel(impl, depth):
+    def setup():
+        book = make_book(impl, depth)
+
+        def run():
+            for agent_id in range(1, N_AGENTS + 1):
+                book.cancel_orders_for_agent(agent_id)
+        return run
+    return setup
+
+
+for impl in ORDER_BOOK_IMPLS:
+    for depth in DEPTHS:
+        register(f"book.add_order.passive[{impl},{depth}]", bench_add_passive(impl, depth), ops=N_ORDERS)
+        register(f"book.add_order.crossing[{impl},{depth}]", bench_add_crossing(impl, depth), ops=N_ORDERS)
+        register(f"book.match_orders[{impl},{depth}]", bench_match_orders(impl, depth), ops=N_ORDERS)
+        register(f"book.cancel_orders_for_agent[{impl},{depth}]", bench_cancel(impl, depth), ops=N_AGENTS)
+
+
+N_PRICES = 2000
+
+
+def option_inputs(n=N_PRICES, seed=2):
+    rng = np.random.default_rng(seed)
+    S = 100 * np.exp(0.05 * rng.standard_normal(n))
+    K = rng.choice(cfg.OPTION_STRIKES, size=n).astype(float)
+    sigma = 0.2 * np.exp(0.3 * rng.standard_normal(n))
+    types = np.where(rng.random(n) < 0.5, 'call', 'put')
+    return S.tolist(), K.tolist(), sigma.tolist(), types.tolist()
+
+
+def bench_bs_price():
+    S, K, sigma, types = option_inputs()
+    r, q, T = cfg.OPTION_R, cfg.OPTION_Q, cfg.OPTION_TAU
+
+    def run():
+        for i in range(N_PRICES):
+            bs_utils.bs_price(S[i], K[i], r, q, sigma[i], T, option_type=types[i])
+    return run
+
+
+def bench_implied_volatility():
+    S, K, sigma, types = option_inputs()
+    r, q, T = cfg.OPTION_R, cfg.OPTION_Q, cfg.OPTION_TAU
+    prices = [bs_utils.bs_price(S[i], K[i], r, q, sigma[i], T, option_type=types[i]) for i in range(N_PRICES)]
+
+    def run():
+        for i in range(N_PRICES):
+            bs_utils.implied_volatility(prices[i], S[i], K[i], r, q, T, option_type=types[i])
+    return run
+
+
+register("bs_price", bench_bs_price, ops=N_PRICES)
+register("implied_volatility", bench_implied_volatility, ops=N_PRICES)
+
+
+def price_path(n, seed=3):
+    rng = np.random.default_rng(seed)
+    return (100 * np.exp(np.cumsum(0.001 * rng.standard_normal(n)))).tolist()
+
+
+def bench_realised_vol_last(n_calls=200):
+    prices = price_path(1000)
+
+    def run():
+        for _ in range(n_calls):
+            realised_vol_last(prices, lookback=200)
+    return run
+
+
+def bench_trend_trader_act(n_steps=2000):
+    # private indicator (not subscribed to a market), so act() also updates it
+    def setup():
+        trader = TrendTrader(id=1, threshold=0.0005)
+        states = [{'mid_price': p, 'news': 0.0, 'fundamental_price': 100.0} for p in price_path(n_steps)]
+        for s in states[:trader.lookback + 1]:
+            trader.act(s)
+
+        def run():
+            for s in states:
+                trader.act(s)
+        return run
+    return setup
+
+
+register("realised_vol_last", bench_realised_vol_last, ops=200)
+register("TrendTrader.act", bench_trend_trader_act(), ops=2000)
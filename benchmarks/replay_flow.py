@@ -0,0 +1,64 @@
+# python -m benchmarks.replay_flow FLOW [--impl list heap] [--repeat 5]
+#
+# Replays an order flow recorded with main.py --record-flow through fresh
+# books for each implementation: orders per second (best of --repeat untimed
+# passes), per-call latency percentiles for adds and cancels, and whether
+# the trades are identical to the recorded ones. Exits with status 1 on a
+# trade mismatch.
+import argparse
+import sys
+import numpy as np
+from utils import order_flow
+from benchmarks.harness import format_time
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded order flow through the order books")
+    parser.add_argument("flow")
+    parser.add_argument("--impl", nargs="+", choices=order_flow.IMPLS, default=list(order_flow.IMPLS))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    flow = order_flow.load_flow(args.flow)
+    counts = flow.counts()
+    ops = order_flow.decode(flow.events)
+    n_orders = counts['add'] + counts['queue']
+    print(f"{args.flow}: {len(flow.books)} books, {len(flow.events)} events "
+          + " ".join(f"{k}={v}" for k, v in counts.items() if v))
+    if flow.trades is None:
+        print("no recorded trades (recorder not closed); checking implementations against each other")
+
+    expected = flow.trades
+    mismatches = []
+    header = f"{'impl':<6}{'orders/s':>12}{'events/s':>12}" + "".join(f"{'p' + format(p, 'g'):>11}" for p in PERCENTILES)
+    print(header + f"{'max':>11}  trades")
+    for impl in args.impl:
+        best = None
+        trades = None
+        for _ in range(args.repeat):
+            trades, seconds, _ = order_flow.replay(flow, impl, ops=ops)
+            best = seconds if best is None else min(best, seconds)
+        _, _, lat = order_flow.replay(flow, impl, latencies=True, ops=ops)
+
+        if expected is None:
+            expected = trades
+        same = order_flow.same_trades(trades, expected)
+        if not same:
+            mismatches.append(impl)
+        n_timed = len(ops) - len(flow.books) - counts['seed']
+        pct = np.percentile(lat, PERCENTILES) if len(lat) else [float('nan')] * len(PERCENTILES)
+        print(f"{impl:<6}{n_orders / best:>12.0f}{n_timed / best:>12.0f}"
+              + "".join(f"{format_time(v):>11}" for v in pct)
+              + f"{format_time(lat.max()) if len(lat) else '-':>11}"
+              + f"  {len(trades)} {'identical' if same else 'MISMATCH'}")
+
+    if mismatches:
+        print("trades differ for: " + ", ".join(mismatches))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# python -m benchmarks.run [--suite micro|macro|all] [-k PATTERN] [--save PATH] [--compare PATH]
+#
+# Runs the registered micro- and macro-benchmarks and prints seconds per
+# operation (min and median over the repeats). --save writes the results as
+# a JSON baseline; --compare checks them against an earlier baseline and
+# exits with status 1 when a benchmark is slower than baseline * (1 +
+# threshold). Baselines are machine-specific: compare runs from the same
+# machine and environment.
+import argparse
+import sys
+from benchmarks import harness
+from benchmarks import micro, macro, bench_implied_vol     # noqa: F401  (registers the benchmarks)
+
+
+def parse_thresholds(items):
+    # ["name=0.5", ...] -> {name: 0.5}
+    out = {}
+    for item in items:
+        name, sep, value = item.rpartition("=")
+        if not sep:
+            raise SystemExit(f"--threshold-for expects NAME=FRACTION, got {item!r}")
+        out[name] = float(value)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Engine micro- and macro-benchmarks")
+    parser.add_argument("--suite", choices=("micro", "macro", "all"), default="all")
+    parser.add_argument("-k", dest="pattern", default=None, help="only benchmarks whose name contains PATTERN")
+    parser.add_argument("--repeat", type=int, default=None, help="override every benchmark's repeat count")
+    parser.add_argument("--list", action="store_true", help="list the benchmark names and exit")
+    parser.add_argument("--save", default=None, metavar="PATH", help="write the results to PATH as a baseline")
+    parser.add_argument("--compare", default=None, metavar="PATH", help="compare against the baseline in PATH")
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="allowed slow-down as a fraction of the baseline (default 0.5)")
+    parser.add_argument("--threshold-for", action="append", default=[], metavar="NAME=FRACTION",
+                        help="per-benchmark threshold; may be repeated")
+    args = parser.parse_args(argv)
+
+    benchmarks = harness.select(args.suite, args.pattern)
+    if args.list:
+        for b in benchmarks:
+            print(f"{b.suite:<6} {b.name}")
+        return 0
+    if not benchmarks:
+        raise SystemExit("no benchmarks selected")
+
+    print(f"{'benchmark':<48}{'min/op':>12}{'median/op':>12}")
+    report = harness.run_all(benchmarks, repeat=args.repeat, stream=sys.stdout)
+    if args.save:
+        harness.save(args.save, report)
+        print(f"saved {len(report['results'])} results to {args.save}")
+
+    if args.compare:
+        baseline = harness.load(args.compare)
+        rows = harness.compare(baseline, report, args.threshold, parse_thresholds(args.threshold_for))
+        print()
+        print(harness.comparison_table(rows))
+        regressions = [row[0] for row in rows if row[4] == 'regression']
+        if regressions:
+            print(f"{len(regressions)} regression(s): " + ", ".join(regressions))
+            return 1
+        print(f"no regressions ({len(rows)} compared)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
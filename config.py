@@ -2,12 +2,24 @@
 NUM_STEPS = 8000
 INITIAL_PRICE = 100
 WARMUP_STEPS = 50
+# Root seed for utils.random_utils; None draws fresh entropy each run
+SEED = None
+
+# Order book implementation: 'heap' (price-time heaps) or 'list' (reference)
+ORDER_BOOK_IMPL = 'heap'
+# One step is one trading day (vols are annualised with 252); used by DAY orders
+STEPS_PER_DAY = 1
+# Spot matching: 'continuous' (on arrival) or 'auction' (one call auction per step)
+MATCHING_MODE = 'continuous'
 
 # Agents settings
 NUM_NOISE_TRADERS = 5
 NUM_MARKET_MAKERS = 6
 NUM_INFORMED_TRADERS = 8
 NUM_FUNDAMENTAL_TRADERS = 12
+# Run the noise, informed and fundamental traders as vectorised populations
+# (agents/populations.py) instead of one object per agent
+USE_POPULATIONS = False
 
 NUM_TREND_TRADERS = 5
 TREND_TRADER_LOOKBACK = 50
@@ -15,6 +27,12 @@ TREND_TRADER_THRESHOLD = 0.2
 TREND_TRADER_AGGRESSIVENESS = 3.0
 TREND_TRADER_MAX_QTY = 5
 
+# Resting time (steps) for spot orders of non-quoting agents; None = good till cancelled
+NOISE_ORDER_TTL = None
+INFORMED_ORDER_TTL = None
+FUNDAMENTAL_ORDER_TTL = None
+TREND_ORDER_TTL = None
+
 NOISE_TRADER_NOISE_LEVEL = 0.05
 NOISE_ORDER_PROB = 0.3
 INFORMED_TRADER_SENSITIVITY = 0.2
@@ -1,18 +1,22 @@
-import random
-import config as cfg
+from utils import random_utils as ru
+from sim_config import resolve
 
 class FundamentalPriceProcess:
-    def __init__(self, initial_price=100, drift=cfg.FUNDAMENTAL_DRIFT, step_interval=cfg.FUNDAMENTAL_INTERVAL):
+    # settings left as None come from `config`
+    def __init__(self, initial_price=100, drift=None, step_interval=None, sigma=None, config=None, rngs=None):
+        c = resolve(config)
         self.fundamental_price = initial_price
-        self.drift = drift
-        self.step_interval = step_interval
+        self.drift = c.FUNDAMENTAL_DRIFT if drift is None else drift
+        self.sigma = c.FUNDAMENTAL_SIGMA if sigma is None else sigma
+        self.step_interval = c.FUNDAMENTAL_INTERVAL if step_interval is None else step_interval
         self.counter = 0
+        self.rng = ru.manager(rngs, c.SEED).stream('fundamental')
 
     def step(self):
         self.counter += 1
 
         if self.counter >= self.step_interval:
             self.counter = 0
-            self.fundamental_price += random.gauss(self.drift, cfg.FUNDAMENTAL_SIGMA)
+            self.fundamental_price += self.rng.gauss(self.drift, self.sigma)
 
         return self.fundamental_price
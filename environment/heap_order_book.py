@@ -0,0 +1,7 @@
+from environment.order_book import OrderBook
+
+
+class HeapOrderBook(OrderBook):
+    # spot book on binary heaps: O(log n) insert, O(1) best price
+    def __init__(self, initial_price=100, steps_per_day=None, config=None):
+        super().__init__(initial_price, impl='heap', steps_per_day=steps_per_day, config=config)
@@ -1,28 +1,94 @@
+from environment.matching_engine import BOOK_SIDES
 from environment.order_book import OrderBook
 from environment.news_process import NewsProcess
-import config as cfg
-from utils.logger import Logger
+from sim_config import resolve
+from utils.logger import Logger, DEBUG, INFO
+from utils import checkpoint
+from utils import random_utils as ru
 from environment.fundamentalistpriceprocess import FundamentalPriceProcess
+from environment.trend_indicators import TrendIndicators
+
+ORDER_BOOK_IMPLS = tuple(BOOK_SIDES)     # 'list' (sorted reference) and 'heap'
+
+# 'continuous': every order is matched on arrival
+# 'auction': a step's orders are collected and uncrossed at one clearing price
+MATCHING_MODES = ('continuous', 'auction')
 
 class Market:
-    def __init__(self, initial_price=100.0,
-                 news_probability = cfg.NEWS_PROBABILITY,
-                 news_volatility=cfg.NEWS_VOLATILITY,
-                 fundamental_drift=cfg.FUNDAMENTAL_DRIFT,
-                 fundamental_interval=cfg.FUNDAMENTAL_INTERVAL
+    # settings left as None come from `config` (a SimConfig; None means the
+    # config module as it is now)
+    profiler = None     # a utils.profiler.StepProfiler while profiling
+
+    def __init__(self, initial_price=None,
+                 news_probability=None,
+                 news_volatility=None,
+                 fundamental_drift=None,
+                 fundamental_interval=None,
+                 order_book_impl=None,
+                 matching_mode=None,
+                 logger=None,
+                 config=None,
+                 rngs=None
                  ):
+        c = self.config = resolve(config)
+        # the run's RNGManager; kept so objects added after a restore draw
+        # from the same root seed
+        self.rngs = ru.manager(rngs, c.SEED)
+        initial_price = c.INITIAL_PRICE if initial_price is None else initial_price
+        news_probability = c.NEWS_PROBABILITY if news_probability is None else news_probability
+        news_volatility = c.NEWS_VOLATILITY if news_volatility is None else news_volatility
+        fundamental_drift = c.FUNDAMENTAL_DRIFT if fundamental_drift is None else fundamental_drift
+        fundamental_interval = c.FUNDAMENTAL_INTERVAL if fundamental_interval is None else fundamental_interval
+        order_book_impl = c.ORDER_BOOK_IMPL if order_book_impl is None else order_book_impl
+        matching_mode = c.MATCHING_MODE if matching_mode is None else matching_mode
+        if order_book_impl not in ORDER_BOOK_IMPLS:
+            raise ValueError(f"unknown order book implementation: {order_book_impl!r}")
+        if matching_mode not in MATCHING_MODES:
+            raise ValueError(f"unknown matching mode: {matching_mode!r}")
+
         self.fundamental_price = initial_price
         self.mid_price = initial_price
-        self.order_book = OrderBook(initial_price=initial_price)
+        self.order_book = OrderBook(initial_price=initial_price, impl=order_book_impl, config=c)
+        # the book carries the mode, so whoever else sends it orders (option
+        # hedges) matches the way this market does
+        self.order_book.continuous = matching_mode == 'continuous'
         self.news_process = NewsProcess(probability=news_probability,
-                                        volatility=news_volatility)
+                                        volatility=news_volatility,
+                                        config=c,
+                                        rngs=self.rngs)
         self.news = 0.0
 
         self.fundamental_process = FundamentalPriceProcess(
             initial_price=initial_price,
             drift=fundamental_drift,
-            step_interval=fundamental_interval)
-        self.logger = Logger()
+            step_interval=fundamental_interval,
+            config=c,
+            rngs=self.rngs)
+        self.indicators = TrendIndicators()
+        self.logger = logger if logger is not None else Logger()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['logger'] = None      # open files; restore() attaches one
+        return state
+
+    def snapshot(self, agents=()):
+        # the whole spot simulation (book, processes, indicators, agents and
+        # RNG state) as bytes
+        return checkpoint.dumps(market=self, agents=list(agents))
+
+    @staticmethod
+    def restore(blob, logger=None):
+        # -> (market, agents); restoring the same blob twice gives two
+        # independent simulations
+        state = checkpoint.loads(blob)
+        market = state['market']
+        market.logger = logger if logger is not None else Logger()
+        return market, state['agents']
+
+    @property
+    def matching_mode(self):
+        return 'continuous' if self.order_book.continuous else 'auction'
 
     def update_news(self):
         self.news_process.step()
@@ -32,31 +98,80 @@ class Market:
         return {'mid_price': self.mid_price, 'news': self.news, 'fundamental_price': self.fundamental_price}
 
     def set_agents(self, agents):
-        self.order_book.agents = {a.id: a for a in agents}
+        book_agents = {}
+        for a in agents:
+            if hasattr(a, 'ids'):
+                # population: every member id resolves to the population object
+                book_agents.update(dict.fromkeys(a.ids.tolist(), a))
+            else:
+                book_agents[a.id] = a
+        self.order_book.agents = book_agents
+        for a in agents:
+            if hasattr(a, 'subscribe_indicators'):
+                a.subscribe_indicators(self.indicators)
 
     def step(self, t, agents):
+        prof = self.profiler
+        if prof is not None:
+            clock = prof.clock
+            t0 = clock()
+        self.order_book.advance_time(t)
         self.update_news()
         self.fundamental_price = self.fundamental_process.step()
 
-        self.logger.log(f"[FUNDAMENTAL t={t}] F={self.fundamental_price:.2f}")
+        logger = self.logger
+        logger.log("[FUNDAMENTAL t=%s] F=%.2f", t, self.fundamental_price, level=DEBUG, category='fundamental')
         state = self.get_state()
-        self.logger.log_news(t, self.news)
+        self.indicators.update(self.mid_price)
+        logger.log_news(t, self.news)
 
+        log_orders = logger.is_enabled(DEBUG, 'order')
         trades = []
+        continuous = self.order_book.continuous
+        if prof is not None:
+            t1 = clock()
+            prof.add('spot.processes', t1 - t0)
+            act_time = 0.0
         for agent in agents:
             # если у агента есть inventory — считаем его маркетмейкером и снимаем старые заявки
             if hasattr(agent, "inventory"):
                 self.order_book.cancel_orders_for_agent(agent.id)
 
-            orders = agent.act(state)
+            if prof is None:
+                orders = agent.act(state)
+            else:
+                ta = clock()
+                orders = agent.act(state)
+                dt = clock() - ta
+                act_time += dt
+                prof.act('spot.act', 'orders', agent, dt, len(orders))
             for o in orders:
-                self.logger.log_order(t, o, agent=agent)
-                trades += self.order_book.add_order(o)
+                if log_orders:
+                    logger.log_order(t, o, agent=agent)
+                trades += self.order_book.add_order(o, match=continuous)
+
+        if prof is not None:
+            t2 = clock()
+            prof.add('spot.orders', t2 - t1 - act_time)
+        if not continuous:
+            trades += self.order_book.uncross()
+            if prof is not None:
+                t3 = clock()
+                prof.add('spot.uncross', t3 - t2)
+                t2 = t3
 
         self.mid_price = self.order_book.get_mid_price(last_price=self.mid_price)
-        self.logger.log_mid_price(t, self.mid_price)
+        logger.log_mid_price(t, self.mid_price)
 
-        for tr in trades:
-            self.logger.log_trade(t, tr)
+        if logger.is_enabled(INFO, 'trade'):
+            for tr in trades:
+                logger.log_trade(t, tr)
 
+        if prof is not None:
+            prof.add('spot.logging', clock() - t2)
+            prof.count('trades', len(trades))
+            book = self.order_book
+            bid, ask = book.best_bid(), book.best_ask()
+            prof.gauge('live_orders', book.live_orders)
+            prof.gauge('spread', ask - bid if bid is not None and ask is not None else None)
         return trades
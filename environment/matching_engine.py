@@ -0,0 +1,402 @@
+import heapq
+import numpy as np
+from bisect import insort
+from itertools import count
+from environment.orders import Trade, as_order
+from sim_config import resolve
+from environment.time_in_force import ExpiryWheel, order_tif, expiry_time, GTC, IOC
+
+# resting order entry: [key, seq, price, qty, agent_id, live]
+# key is -price for bids so both sides pop their best price first,
+# seq keeps FIFO among equal prices
+KEY, SEQ, PRICE, QTY, AGENT, LIVE = range(6)
+
+
+class HeapSide:
+    def __init__(self):
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def push(self, e):
+        heapq.heappush(self.entries, e)
+
+    def peek(self):
+        entries = self.entries
+        while entries and not entries[0][LIVE]:
+            heapq.heappop(entries)
+        return entries[0] if entries else None
+
+    def pop(self):
+        return heapq.heappop(self.entries)
+
+    def compact(self):
+        self.entries = [e for e in self.entries if e[LIVE]]
+        heapq.heapify(self.entries)
+
+    def ordered(self):
+        return [e for e in sorted(self.entries) if e[LIVE]]
+
+
+class ListSide:
+    # sorted list, kept as the reference implementation of the original book
+    def __init__(self):
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def push(self, e):
+        insort(self.entries, e)
+
+    def peek(self):
+        entries = self.entries
+        while entries and not entries[0][LIVE]:
+            entries.pop(0)
+        return entries[0] if entries else None
+
+    def pop(self):
+        return self.entries.pop(0)
+
+    def compact(self):
+        self.entries = [e for e in self.entries if e[LIVE]]
+
+    def ordered(self):
+        return [e for e in self.entries if e[LIVE]]
+
+
+BOOK_SIDES = {
+    'list': ListSide,
+    'heap': HeapSide,
+}
+SIDE_IMPLS = {side: impl for impl, side in BOOK_SIDES.items()}
+
+
+class MatchingEngine:
+    # price-time priority matching shared by the spot and option books.
+    # Books customise fills through fill_handler_for(agent), which returns a
+    # callable(delta, price) or None; it is resolved once when agents are set
+    # instead of inspecting agents on every fill.
+    recorder = None     # a utils.order_flow channel while the order flow is recorded
+    # False when the owning market runs one call auction per step: orders
+    # from outside the market then go in with add_order(match=False)
+    continuous = True
+
+    def __init__(self, initial_price, impl=None, steps_per_day=None, config=None):
+        # impl and steps_per_day left as None come from `config`
+        if impl is None or steps_per_day is None:
+            c = resolve(config)
+            impl = c.ORDER_BOOK_IMPL if impl is None else impl
+            steps_per_day = c.STEPS_PER_DAY if steps_per_day is None else steps_per_day
+        if impl not in BOOK_SIDES:
+            raise ValueError(f"unknown order book implementation: {impl!r}")
+        self._bids = BOOK_SIDES[impl]()
+        self._asks = BOOK_SIDES[impl]()
+        self._seq = count()
+        self._by_agent = {}     # agent_id -> {seq: entry}, live orders only
+        self._live = 0
+        self._expiry = ExpiryWheel()
+        self._fill_handlers = {}
+        self._agents = {}
+        self._pending = []      # (entry, tif, expire_at) collected for the next uncross
+        self.last_price = initial_price
+        self.steps_per_day = steps_per_day
+        self.trades = []
+
+    def __getstate__(self):
+        # fill handlers are closures over the agents and are rebuilt on load
+        state = self.__dict__.copy()
+        del state['_fill_handlers']
+        state.pop('recorder', None)
+        seq = next(self._seq)
+        self._seq = count(seq)
+        state['_seq'] = seq
+        return state
+
+    def __setstate__(self, state):
+        state['_seq'] = count(state['_seq'])
+        self.__dict__.update(state)
+        self.agents = self._agents
+
+    @property
+    def agents(self):
+        return self._agents
+
+    @agents.setter
+    def agents(self, agents):
+        self._agents = agents
+        self._fill_handlers = {}
+        for agent_id, agent in agents.items():
+            handler = self.fill_handler_for(agent)
+            if handler is not None:
+                self._fill_handlers[agent_id] = handler
+
+    def fill_handler_for(self, agent):
+        return None
+
+    def set_fill_handler(self, agent_id, handler):
+        if handler is None:
+            self._fill_handlers.pop(agent_id, None)
+        else:
+            self._fill_handlers[agent_id] = handler
+
+    @property
+    def bids(self):
+        return [(e[PRICE], e[QTY], e[AGENT]) for e in self._bids.ordered()]
+
+    @property
+    def asks(self):
+        return [(e[PRICE], e[QTY], e[AGENT]) for e in self._asks.ordered()]
+
+    @property
+    def impl(self):
+        return SIDE_IMPLS[type(self._bids)]
+
+    def resting_orders(self):
+        # live orders in arrival order as (side, price, qty, agent_id,
+        # expire_at), expire_at None for orders that do not expire
+        expiry = {id(e): k for k, bucket in self._expiry.buckets.items() for e in bucket}
+        rows = []
+        for side_name, side in (('buy', self._bids), ('sell', self._asks)):
+            rows += [(e[SEQ], side_name, e) for e in side.entries if e[LIVE]]
+        rows.sort(key=lambda row: row[0])
+        return [(side, e[PRICE], e[QTY], e[AGENT], expiry.get(id(e))) for _, side, e in rows]
+
+    @property
+    def live_orders(self):
+        # resting orders on both sides (cancelled and expired ones excluded)
+        return self._live
+
+    @property
+    def time(self):
+        return self._expiry.t
+
+    def best_bid(self):
+        e = self._bids.peek()
+        return e[PRICE] if e is not None else None
+
+    def best_ask(self):
+        e = self._asks.peek()
+        return e[PRICE] if e is not None else None
+
+    def advance_time(self, t):
+        if self.recorder is not None:
+            self.recorder.advance(t)
+        for e in self._expiry.advance(t):
+            if e[LIVE]:
+                self._cancel(e)
+        self._maybe_compact()
+
+    def _cancel(self, e):
+        e[LIVE] = False
+        self._live -= 1
+        del self._by_agent[e[AGENT]][e[SEQ]]
+
+    def _maybe_compact(self):
+        # lazily deleted entries are dropped when they surface; rebuild once
+        # they outnumber the live ones so the sides stay O(live)
+        if len(self._bids) + len(self._asks) > 2 * self._live:
+            self._bids.compact()
+            self._asks.compact()
+
+    def _remove_filled(self, side):
+        e = side.pop()
+        e[LIVE] = False
+        self._live -= 1
+        del self._by_agent[e[AGENT]][e[SEQ]]
+
+    def cancel_orders_for_agent(self, agent_id):
+        if self.recorder is not None:
+            self.recorder.cancel(agent_id)
+        orders = self._by_agent.pop(agent_id, None)
+        if not orders:
+            return
+        for e in orders.values():
+            e[LIVE] = False
+        self._live -= len(orders)
+        self._maybe_compact()
+
+    def add_order(self, order, match=True):
+        order = as_order(order)
+        # time in force is checked before the order touches the book, so a
+        # bad order is rejected without side effects
+        tif = order_tif(order)
+        expire_at = expiry_time(order, tif, self.time, self.steps_per_day)
+        if self.recorder is not None:
+            self.recorder.add(order, match)
+        price = order.price
+        agent = order.agent_id
+        seq = next(self._seq)
+
+        if order.side == 'buy':
+            e = [-price, seq, price, order.qty, agent, True]
+            self._bids.push(e)
+        else:
+            e = [price, seq, price, order.qty, agent, True]
+            self._asks.push(e)
+        self._by_agent.setdefault(agent, {})[seq] = e
+        self._live += 1
+
+        if not match:
+            self._pending.append((e, tif, expire_at))
+            return []
+
+        trades = self.match_orders()
+        self._apply_tif(e, tif, expire_at)
+        return trades
+
+    def _apply_tif(self, e, tif, expire_at):
+        if e[LIVE] and tif != GTC:
+            if tif == IOC or expire_at <= self.time:
+                self._cancel(e)
+            else:
+                self._expiry.schedule(expire_at, e)
+
+    def match_orders(self):
+        trades = []
+        bids = self._bids
+        asks = self._asks
+        handlers = self._fill_handlers
+
+        while True:
+            bid = bids.peek()
+            ask = asks.peek()
+            if bid is None or ask is None or bid[PRICE] < ask[PRICE]:
+                break
+
+            bid_price, bid_qty, bid_agent = bid[PRICE], bid[QTY], bid[AGENT]
+            ask_price, ask_qty, ask_agent = ask[PRICE], ask[QTY], ask[AGENT]
+
+            if bid_agent == ask_agent:
+                # self-cross: the bid gives way
+                if bid_qty <= ask_qty:
+                    self._remove_filled(bids)
+                else:
+                    bid[QTY] = bid_qty - ask_qty
+                continue
+
+            trade_qty = min(bid_qty, ask_qty)
+            trade_price = (bid_price + ask_price) / 2
+
+            handler = handlers.get(bid_agent)
+            if handler is not None:
+                handler(trade_qty, trade_price)
+            handler = handlers.get(ask_agent)
+            if handler is not None:
+                handler(-trade_qty, trade_price)
+
+            trades.append(Trade(trade_price, trade_qty, bid_agent, ask_agent))
+
+            if bid_qty > trade_qty:
+                bid[QTY] = bid_qty - trade_qty
+            else:
+                self._remove_filled(bids)
+
+            if ask_qty > trade_qty:
+                ask[QTY] = ask_qty - trade_qty
+            else:
+                self._remove_filled(asks)
+
+            self.last_price = trade_price
+
+        self.trades.extend(trades)
+        return trades
+
+    def clearing_price(self):
+        # single price maximising executable volume from cumulative demand
+        # (bids at or above p) and supply (asks at or below p); ties go to the
+        # smallest imbalance, then to the middle of the remaining price range
+        bids = self._bids.ordered()
+        asks = self._asks.ordered()
+        if not bids or not asks or bids[0][PRICE] < asks[0][PRICE]:
+            return None, 0
+
+        bid_px = np.fromiter((e[PRICE] for e in reversed(bids)), float, len(bids))
+        bid_cum = np.cumsum(np.fromiter((e[QTY] for e in reversed(bids)), float, len(bids))[::-1])
+        ask_px = np.fromiter((e[PRICE] for e in asks), float, len(asks))
+        ask_cum = np.cumsum(np.fromiter((e[QTY] for e in asks), float, len(asks)))
+
+        grid = np.unique(np.concatenate((bid_px, ask_px)))
+        grid = grid[(grid >= ask_px[0]) & (grid <= bid_px[-1])]
+
+        n_bids = len(bid_px) - np.searchsorted(bid_px, grid, side='left')
+        n_asks = np.searchsorted(ask_px, grid, side='right')
+        demand = np.where(n_bids > 0, bid_cum[np.maximum(n_bids - 1, 0)], 0.0)
+        supply = np.where(n_asks > 0, ask_cum[np.maximum(n_asks - 1, 0)], 0.0)
+
+        volume = np.minimum(demand, supply)
+        best = volume == volume.max()
+        imbalance = np.abs(demand - supply)
+        best &= imbalance == imbalance[best].min()
+        tied = grid[best]
+        return float(tied[0] + tied[-1]) / 2, float(volume.max())
+
+    def uncross(self):
+        if self.recorder is not None:
+            self.recorder.uncross()
+        price, volume = self.clearing_price()
+        trades = []
+        bids = self._bids
+        asks = self._asks
+        handlers = self._fill_handlers
+
+        while price is not None and volume > 0:
+            bid = bids.peek()
+            ask = asks.peek()
+            if bid is None or ask is None or bid[PRICE] < price or ask[PRICE] > price:
+                break
+
+            bid_qty, bid_agent = bid[QTY], bid[AGENT]
+            ask_qty, ask_agent = ask[QTY], ask[AGENT]
+
+            if bid_agent == ask_agent:
+                if bid_qty <= ask_qty:
+                    self._remove_filled(bids)
+                else:
+                    bid[QTY] = bid_qty - ask_qty
+                continue
+
+            trade_qty = min(bid_qty, ask_qty, volume)
+            volume -= trade_qty
+
+            handler = handlers.get(bid_agent)
+            if handler is not None:
+                handler(trade_qty, price)
+            handler = handlers.get(ask_agent)
+            if handler is not None:
+                handler(-trade_qty, price)
+
+            trades.append(Trade(price, trade_qty, bid_agent, ask_agent))
+
+            if bid_qty > trade_qty:
+                bid[QTY] = bid_qty - trade_qty
+            else:
+                self._remove_filled(bids)
+
+            if ask_qty > trade_qty:
+                ask[QTY] = ask_qty - trade_qty
+            else:
+                self._remove_filled(asks)
+
+            self.last_price = price
+
+        self.trades.extend(trades)
+        # self-cross give-way can leave a residual cross; clear it continuously
+        trades += self.match_orders()
+
+        pending, self._pending = self._pending, []
+        for e, tif, expire_at in pending:
+            self._apply_tif(e, tif, expire_at)
+        return trades
+
+    def raw_mid_price(self, last_price):
+        best_bid = self.best_bid()
+        best_ask = self.best_ask()
+        if best_bid is not None and best_ask is not None:
+            return (best_bid + best_ask) / 2
+        if best_bid is not None:
+            return best_bid
+        if best_ask is not None:
+            return best_ask
+        return last_price
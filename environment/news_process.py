@@ -1,14 +1,18 @@
-import random
+from utils import random_utils as ru
+from sim_config import resolve
 
 class NewsProcess:
-    def __init__(self, probability=0.1, volatility=1.0):
-        self.probability = probability
-        self.volatility = volatility
+    # settings left as None come from `config`
+    def __init__(self, probability=None, volatility=None, config=None, rngs=None):
+        c = resolve(config)
+        self.probability = c.NEWS_PROBABILITY if probability is None else probability
+        self.volatility = c.NEWS_VOLATILITY if volatility is None else volatility
         self.current_news = 0.0
+        self.rng = ru.manager(rngs, c.SEED).stream('news')
 
     def step(self):
-        if random.random() < self.probability:
-            self.current_news = random.uniform(-self.volatility, self.volatility)
+        if self.rng.random() < self.probability:
+            self.current_news = self.rng.uniform(-self.volatility, self.volatility)
         else:
             self.current_news = 0.0
 
@@ -1,14 +1,21 @@
 from environment.options_order_book import OptionsOrderBook
-from utils.bs_utils import bs_price, bs_delta
-import config as cfg
+from environment.orders import Order, as_order
+from utils.bs_utils import bs_price, chain_snapshot
+from utils.logger import DEBUG, INFO
+from utils import checkpoint
+from sim_config import resolve
 
 class OptionsMarket:
-    def __init__(self, strikes=None, tau=cfg.OPTION_TAU, r=cfg.OPTION_R, q=cfg.OPTION_Q, vol=cfg.OPTION_VOL, option_type = 'call'):
-        self.strikes = strikes or cfg.OPTION_STRIKES
-        self.tau = tau
-        self.r = r
-        self.q = q
-        self.vol = vol
+    profiler = None     # a utils.profiler.StepProfiler while profiling
+
+    def __init__(self, strikes=None, tau=None, r=None, q=None, vol=None, option_type = 'call', config=None):
+        c = self.config = resolve(config)
+        self.strikes = list(strikes or c.OPTION_STRIKES)
+        self.tau = c.OPTION_TAU if tau is None else tau
+        self.r = c.OPTION_R if r is None else r
+        self.q = c.OPTION_Q if q is None else q
+        self.vol = c.OPTION_VOL if vol is None else vol
+        self.delta_hedge_interval = c.DELTA_HEDGE_INTERVAL
         self.option_type = option_type
         self.logger = None
 
@@ -17,12 +24,16 @@ class OptionsMarket:
                 'call': OptionsOrderBook(
                     strike=K,
                     option_type='call',
-                    initial_price=bs_price(cfg.INITIAL_PRICE, K, self.r, self.q, self.vol, self.tau, option_type='call')
+                    initial_price=bs_price(c.INITIAL_PRICE, K, self.r, self.q, self.vol, self.tau, option_type='call'),
+                    impl=c.ORDER_BOOK_IMPL,
+                    steps_per_day=c.STEPS_PER_DAY
                 ),
                 'put': OptionsOrderBook(
                     strike=K,
                     option_type='put',
-                    initial_price=bs_price(cfg.INITIAL_PRICE, K, self.r, self.q, self.vol, self.tau, option_type='put')
+                    initial_price=bs_price(c.INITIAL_PRICE, K, self.r, self.q, self.vol, self.tau, option_type='put'),
+                    impl=c.ORDER_BOOK_IMPL,
+                    steps_per_day=c.STEPS_PER_DAY
                 )
             }
             for K in self.strikes
@@ -30,6 +41,23 @@ class OptionsMarket:
         self.mid_prices_call = {K: self.order_books[K]['call'].last_price for K in self.strikes}
         self.mid_prices_put = {K: self.order_books[K]['put'].last_price for K in self.strikes}
         self.agents = {}
+        self.chain = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['logger'] = None
+        return state
+
+    def snapshot(self, agents=()):
+        return checkpoint.dumps(options_market=self, agents=list(agents))
+
+    @staticmethod
+    def restore(blob, logger=None):
+        # -> (options_market, agents)
+        state = checkpoint.loads(blob)
+        options_market = state['options_market']
+        options_market.logger = logger
+        return options_market, state['agents']
 
     def set_agents(self, agents):
         self.agents = {a.id: a for a in agents}
@@ -42,21 +70,40 @@ class OptionsMarket:
 
     def step(self, t, S, agents, vol=None, spot_order_book=None):
 
+        prof = self.profiler
+        if prof is not None:
+            clock = prof.clock
+            t0 = clock()
+        for K_books in self.order_books.values():
+            for ob in K_books.values():
+                ob.advance_time(t)
         trades = []
         if vol is not None:
             vol = float(vol)
             self.vol = vol
 
-        for K in self.strikes:
-            for opt_type in ['call', 'put']:
-                theo = self.theoretical_price(S, K, option_type=opt_type)
-                ob = self.order_books[K][opt_type]
+        logger = self.logger
+        log_orders = logger is not None and logger.is_enabled(DEBUG, 'order')
+        log_option_orders = logger is not None and logger.is_enabled(DEBUG, 'option_order')
+        log_trades = logger is not None and logger.is_enabled(INFO, 'trade')
+        # when the spot market runs call auctions, spot orders (hedges
+        # included) are queued for its next uncross instead of trading mid-step
+        spot_match = spot_order_book is None or spot_order_book.continuous
+
+        # priced once per step and shared by every agent
+        self.chain = chain_snapshot(S, self.strikes, self.r, self.q, self.vol, self.tau)
+        if prof is not None:
+            t1 = clock()
+            prof.add('options.pricing', t1 - t0)
+            act_time = 0.0
 
         for agent in agents:
             for K_books in self.order_books.values():
                 for ob in K_books.values():
                     ob.cancel_orders_for_agent(agent.id)
 
+            if prof is not None:
+                ta = clock()
             orders = agent.act({
                 'spot': S,
                 'tau': self.tau,
@@ -65,35 +112,44 @@ class OptionsMarket:
                 'vol': self.vol,
                 'strikes': self.strikes,
                 'mid_prices_call': self.mid_prices_call,
-                'mid_prices_put': self.mid_prices_put
+                'mid_prices_put': self.mid_prices_put,
+                'chain': self.chain
             })
+            if prof is not None:
+                dt = clock() - ta
+                act_time += dt
+                prof.act('options.act', 'option_orders', agent, dt, len(orders))
             for o in orders:
-                if o.get('instrument') == 'spot':
+                o = as_order(o)
+                if o.instrument == 'spot':
                     if spot_order_book is not None:
-                        if hasattr(self, 'logger') and self.logger:
-                            self.logger.log_order(t, o, agent=agent)
-                        new_trades = spot_order_book.add_order(o)
+                        if log_orders:
+                            logger.log_order(t, o, agent=agent)
+                        new_trades = spot_order_book.add_order(o, match=spot_match)
                         for tr in new_trades:
-                            tr['time'] = t
-                            if hasattr(self, 'logger') and self.logger:
-                                self.logger.log_trade(t, tr)
+                            tr.time = t
+                            if log_trades:
+                                logger.log_trade(t, tr)
                     continue
 
-                K = o.get('strike')
-                opt_type = o.get('option_type', 'call')
+                K = o.strike
+                opt_type = o.option_type or 'call'
                 if K not in self.order_books or opt_type not in ['call', 'put']:
                     continue
-                if hasattr(self, 'logger') and self.logger:
-                    self.logger.log_option_order(t, o, agent=agent)
+                if log_option_orders:
+                    logger.log_option_order(t, o, agent=agent)
 
                 new_trades = self.order_books[K][opt_type].add_order(o)
                 for tr in new_trades:
-                    tr['time'] = t
-                    tr['instrument'] = 'option'
-                    tr['strike'] = K
-                    tr['option_type'] = opt_type
+                    tr.time = t
+                    tr.instrument = 'option'
+                    tr.strike = K
+                    tr.option_type = opt_type
                 trades += new_trades
 
+        if prof is not None:
+            t2 = clock()
+            prof.add('options.orders', t2 - t1 - act_time)
         for K in self.strikes:
             self.mid_prices_call[K] = self.order_books[K]['call'].get_mid_price(self.mid_prices_call[K])
             self.mid_prices_put[K] = self.order_books[K]['put'].get_mid_price(self.mid_prices_put[K])
@@ -101,18 +157,21 @@ class OptionsMarket:
             self.mid_prices_call[K] = max(self.mid_prices_call[K], 0.0001)
             self.mid_prices_put[K] = max(self.mid_prices_put[K], 0.0001)
 
-        if spot_order_book is not None and t % cfg.DELTA_HEDGE_INTERVAL == 0:
+        if prof is not None:
+            t3 = clock()
+            prof.add('options.mids', t3 - t2)
+        if spot_order_book is not None and t % self.delta_hedge_interval == 0:
             for agent in agents:
                 inv_map = getattr(agent, "inventory_by_option", None)
                 if not inv_map:
                     continue
 
+                deltas = self.chain['delta']
                 delta_exposure = 0.0
-                for (K, opt_type), qty in inv_map.items():
+                for key, qty in inv_map.items():
                     if qty == 0:
                         continue
-                    d = bs_delta(S, K, self.r, self.q, self.vol, self.tau, option_type=opt_type)
-                    delta_exposure += qty * d
+                    delta_exposure += qty * deltas[key]
 
                 hedge_qty = int(round(abs(delta_exposure)))
 
@@ -126,21 +185,19 @@ class OptionsMarket:
                     side = 'buy'
                     price = S + 0.0001
 
-                spot_order = {
-                    'agent_id': agent.id,
-                    'instrument': 'spot',
-                    'order_type': 'limit',
-                    'side': side,
-                    'price': float(price),
-                    'qty': hedge_qty
-                }
-
-                if hasattr(self, 'logger') and self.logger:
-                    self.logger.log_order(t, spot_order, agent=agent)
-                spot_trades = spot_order_book.add_order(spot_order)
-                for tr in spot_trades:
-                    tr['time'] = t
-                    if hasattr(self, 'logger') and self.logger:
-                        self.logger.log_trade(t, tr)
+                spot_order = Order(agent.id, side, float(price), hedge_qty)
 
+                if log_orders:
+                    logger.log_order(t, spot_order, agent=agent)
+                spot_trades = spot_order_book.add_order(spot_order, match=spot_match)
+                for tr in spot_trades:
+                    tr.time = t
+                    if log_trades:
+                        logger.log_trade(t, tr)
+
+        if prof is not None:
+            prof.add('options.hedge', clock() - t3)
+            prof.count('option_trades', len(trades))
+            prof.gauge('option_live_orders',
+                       sum(ob.live_orders for K_books in self.order_books.values() for ob in K_books.values()))
         return trades
@@ -1,85 +1,17 @@
-class OrderBook:
-    def __init__(self, initial_price=100):
-        self.bids = []      # (price, qty, agent_id)
-        self.asks = []      # (price, qty, agent_id)
-        self.last_price = initial_price
-        self.trades = []
-        self.agents = {}
+from environment.matching_engine import MatchingEngine
 
-    def cancel_orders_for_agent(self, agent_id):
-        self.bids = [b for b in self.bids if b[2] != agent_id]
-        self.asks = [a for a in self.asks if a[2] != agent_id]
 
-    def add_order(self, order):
-        price = order['price']
-        qty = order['qty']
-        agent = order['agent_id']
+class OrderBook(MatchingEngine):
+    def __init__(self, initial_price=100, impl=None, steps_per_day=None, config=None):
+        super().__init__(initial_price, impl=impl, steps_per_day=steps_per_day, config=config)
 
-        if order['side'] == 'buy':
-            self.bids.append((price, qty, agent))
-            self.bids.sort(key=lambda x: x[0], reverse=True)
-        else:
-            self.asks.append((price, qty, agent))
-            self.asks.sort(key=lambda x: x[0])
+    def fill_handler_for(self, agent):
+        if not hasattr(agent, "inventory"):
+            return None
 
-        return self.match_orders()
-
-    def match_orders(self):
-        trades = []
-
-        while self.bids and self.asks and self.bids[0][0] >= self.asks[0][0]:
-            bid_price, bid_qty, bid_agent = self.bids[0]
-            ask_price, ask_qty, ask_agent = self.asks[0]
-
-            if bid_agent == ask_agent:
-                if bid_qty <= ask_qty:
-                    self.bids.pop(0)
-                else:
-                    self.bids[0] = (bid_price, bid_qty - ask_qty, bid_agent)
-                continue
-
-            trade_qty = min(bid_qty, ask_qty)
-            trade_price = (bid_price + ask_price) / 2
-
-            for agent_id, delta in [(bid_agent, +trade_qty), (ask_agent, -trade_qty)]:
-                agent = self.agents.get(agent_id)
-                if agent and hasattr(agent, "inventory"):
-                    agent.inventory += delta
-
-            trades.append({
-                'price': trade_price,
-                'qty': trade_qty,
-                'buyer': bid_agent,
-                'seller': ask_agent
-            })
-
-            # обновляем заявки
-            if bid_qty > trade_qty:
-                self.bids[0] = (bid_price, bid_qty - trade_qty, bid_agent)
-            else:
-                self.bids.pop(0)
-
-            if ask_qty > trade_qty:
-                self.asks[0] = (ask_price, ask_qty - trade_qty, ask_agent)
-            else:
-                self.asks.pop(0)
-
-        self.trades.extend(trades)
-        return trades
+        def on_fill(delta, price):
+            agent.inventory += delta
+        return on_fill
 
     def get_mid_price(self, last_price=100):
-        if self.bids and self.asks:
-            best_bid = self.bids[0][0]
-            best_ask = self.asks[0][0]
-            mid = (best_bid + best_ask) / 2
-
-        elif self.bids:
-            mid = self.bids[0][0]
-
-        elif self.asks:
-            mid = self.asks[0][0]
-
-        else:
-            mid = last_price
-
-        return max(mid, 1.0)
+        return max(self.raw_mid_price(last_price), 1.0)
@@ -0,0 +1,90 @@
+class _Record:
+    # dict-style access so code written against order/trade dicts keeps
+    # working; a field set to None reads as missing, like an absent key
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            value = getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return getattr(self, key, None) is not None
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def as_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__ if getattr(self, k) is not None}
+
+    def keys(self):
+        return self.as_dict().keys()
+
+    def items(self):
+        return self.as_dict().items()
+
+    def __eq__(self, other):
+        if isinstance(other, _Record):
+            other = other.as_dict()
+        return self.as_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.as_dict()})"
+
+    @classmethod
+    def from_dict(cls, d):
+        rec = cls.__new__(cls)
+        for k in cls.__slots__:
+            setattr(rec, k, d.get(k))
+        return rec
+
+
+class Order(_Record):
+    __slots__ = ('agent_id', 'instrument', 'order_type', 'side', 'price', 'qty',
+                 'strike', 'option_type', 'tif', 'ttl', 'expire_at')
+
+    def __init__(self, agent_id, side, price, qty, instrument='spot', order_type='limit',
+                 strike=None, option_type=None, tif=None, ttl=None, expire_at=None):
+        self.agent_id = agent_id
+        self.instrument = instrument
+        self.order_type = order_type
+        self.side = side
+        self.price = price
+        self.qty = qty
+        self.strike = strike
+        self.option_type = option_type
+        self.tif = tif
+        self.ttl = ttl
+        self.expire_at = expire_at
+
+
+class Trade(_Record):
+    __slots__ = ('time', 'price', 'qty', 'buyer', 'seller', 'instrument', 'strike', 'option_type')
+
+    def __init__(self, price, qty, buyer, seller, time=None,
+                 instrument=None, strike=None, option_type=None):
+        self.time = time
+        self.price = price
+        self.qty = qty
+        self.buyer = buyer
+        self.seller = seller
+        self.instrument = instrument
+        self.strike = strike
+        self.option_type = option_type
+
+
+def as_order(order):
+    return order if order.__class__ is Order else Order.from_dict(order)
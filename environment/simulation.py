@@ -0,0 +1,239 @@
+import numpy as np
+from agents.noise_trader import NoiseTrader
+from agents.market_maker import MarketMaker
+from agents.informed_trader import InformedTrader
+from agents.fundamental import FundamentalTrader
+from agents.trend_trader import TrendTrader
+from agents.populations import (NoiseTraderPopulation, InformedTraderPopulation,
+                                FundamentalTraderPopulation)
+from agents.options_market_maker import OptionsMarketMaker
+from agents.options_noise_trader import OptionsNoiseTrader
+from agents.options_arbitrageur import OptionsArbitrageur
+from environment.market import Market
+from environment.options_market import OptionsMarket
+from sim_config import resolve
+from utils import bs_utils
+from utils import random_utils as ru
+from utils.logger import INFO
+from utils.vol_utils import RollingRealisedVol
+
+
+def build_spot(c, logger=None, rngs=None):
+    # spot market and its agents for SimConfig c -> (market, agents). With
+    # c.USE_POPULATIONS the noise, informed and fundamental traders are one
+    # population each, with the same ids and the same place in the step order.
+    # rngs: the RNGManager every agent and process draws from (default: a new
+    # one for c.SEED)
+    rngs = ru.manager(rngs, c.SEED)
+    n_noise = c.NUM_NOISE_TRADERS
+    mm_start = n_noise + 1
+    informed_start = mm_start + c.NUM_MARKET_MAKERS
+    trend_start = informed_start + c.NUM_INFORMED_TRADERS
+    fundamental_start = trend_start + c.NUM_TREND_TRADERS
+
+    agents = []
+    if c.USE_POPULATIONS:
+        agents.append(NoiseTraderPopulation(np.arange(1, n_noise + 1), config=c, rngs=rngs))
+    else:
+        for i in range(n_noise):
+            agents.append(NoiseTrader(id=i+1, config=c, rngs=rngs))
+    for i in range(c.NUM_MARKET_MAKERS):
+        agents.append(MarketMaker(id=mm_start + i, config=c, rngs=rngs))
+    if c.USE_POPULATIONS:
+        agents.append(InformedTraderPopulation(np.arange(informed_start, trend_start), config=c,
+                                               rngs=rngs))
+    else:
+        for i in range(c.NUM_INFORMED_TRADERS):
+            agents.append(InformedTrader(id=informed_start + i, config=c, rngs=rngs))
+    for i in range(c.NUM_TREND_TRADERS):
+        agents.append(TrendTrader(id=trend_start + i, config=c, rngs=rngs))
+    if c.USE_POPULATIONS:
+        agents.append(FundamentalTraderPopulation(
+            np.arange(fundamental_start, fundamental_start + c.NUM_FUNDAMENTAL_TRADERS),
+            fundamental_price=c.INITIAL_PRICE,
+            config=c,
+            rngs=rngs
+        ))
+    else:
+        for i in range(c.NUM_FUNDAMENTAL_TRADERS):
+            agents.append(FundamentalTrader(
+                id=fundamental_start + i,
+                fundamental_price=c.INITIAL_PRICE,
+                config=c,
+                rngs=rngs
+            ))
+
+    market = Market(logger=logger, config=c, rngs=rngs)
+    market.set_agents(agents)
+    return market, agents
+
+
+def build_options(c, include_arbitrage=True, logger=None, rngs=None):
+    # -> (options_market, options_agents)
+    rngs = ru.manager(rngs, c.SEED)
+    options_market = OptionsMarket(config=c)
+    options_market.logger = logger
+
+    options_agents = []
+    for i in range(c.NUM_OPTION_MARKET_MAKERS):
+        options_agents.append(OptionsMarketMaker(id=1000 + i + 1, config=c, rngs=rngs))
+    for i in range(c.NUM_OPTION_NOISE_TRADERS):
+        options_agents.append(OptionsNoiseTrader(id=2000 + i + 1, rngs=rngs))
+    if include_arbitrage:
+        for i in range(c.NUM_OPTION_ARB):
+            options_agents.append(OptionsArbitrageur(id=3000 + i + 1, config=c, rngs=rngs))
+
+    options_market.set_agents(options_agents)
+    return options_market, options_agents
+
+
+class Simulation:
+    # One spot + options run for a SimConfig. The run owns an RNGManager
+    # seeded from config.SEED that every agent and process draws from, so
+    # simulations built in one process do not share random state.
+    # steps() runs the warm-up and then yields (t, snapshot) per measured
+    # step; run(*sinks) hands every snapshot to each sink's on_step(t, snap)
+    # and closes them at the end. Option mids and IVs in a snapshot are
+    # arrays in `strikes` order (IV NaN where the solver failed); snapshots
+    # are built fresh every step, so sinks may keep them. The whole object
+    # pickles (loggers excluded), which is how checkpoints save a run part
+    # way through. With a StepProfiler as `profiler` the measured steps are
+    # profiled (the warm-up is not); callers driving step() by hand call
+    # profiler.end_step(t) themselves.
+    profiler = None
+
+    def __init__(self, config=None, include_arbitrage=True, logger=None, warm_state=None, profiler=None):
+        c = self.config = resolve(config)
+        self.t = 0
+        if warm_state is None:
+            self.rngs = ru.RNGManager(c.SEED)
+            self.market, self.agents = build_spot(c, logger, self.rngs)
+        else:
+            self.market, self.agents = Market.restore(warm_state, logger)
+            self.rngs = self.market.rngs
+            self.t = c.WARMUP_STEPS
+        self.options_market, self.options_agents = build_options(c, include_arbitrage, logger, self.rngs)
+        self.iv_solver = bs_utils.ImpliedVolSolver(c.OPTION_STRIKES, r=c.OPTION_R, q=c.OPTION_Q, T=c.OPTION_TAU)
+        self.rv_tracker = RollingRealisedVol(lookback=200, annualization=252)
+        self.logger = logger
+        self.profiler = profiler
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['logger'] = None
+        return state
+
+    def set_logger(self, logger):
+        self.logger = logger
+        self.market.logger = logger
+        self.options_market.logger = logger
+
+    @property
+    def strikes(self):
+        return self.options_market.strikes
+
+    @property
+    def end(self):
+        return self.config.WARMUP_STEPS + self.config.NUM_STEPS
+
+    def warm_up(self, cache=None):
+        # runs what is left of the warm-up; with a WarmupCache the warmed
+        # spot market is loaded from disk when an earlier run built it
+        c = self.config
+        if self.t >= c.WARMUP_STEPS:
+            return
+        if cache is None or self.t > 0:
+            while self.t < c.WARMUP_STEPS:
+                self.market.step(self.t, self.agents)
+                self.t += 1
+            return
+
+        def build():
+            for t in range(c.WARMUP_STEPS):
+                self.market.step(t, self.agents)
+            return self.market.snapshot(self.agents)
+
+        blob = cache.get_or_build(c, c.SEED, build)
+        self.market, self.agents = Market.restore(blob, self.market.logger)
+        self.rngs = self.market.rngs
+        self.t = c.WARMUP_STEPS
+
+    def step(self):
+        # one measured step -> snapshot dict
+        t = self.t
+        market = self.market
+        options_market = self.options_market
+        prof = self.profiler
+
+        trades = market.step(t, self.agents)
+        for tr in trades:
+            tr.time = t
+        S = market.mid_price
+        if prof is not None:
+            t0 = prof.clock()
+        rv = self.rv_tracker.update(S)
+        vol_for_options = rv if rv is not None else self.config.OPTION_VOL
+        if prof is not None:
+            prof.add('rv', prof.clock() - t0)
+
+        option_trades = options_market.step(t=t, S=S, agents=self.options_agents, vol=vol_for_options,
+                                            spot_order_book=market.order_book)
+        mid_call = options_market.mid_prices_call
+        mid_put = options_market.mid_prices_put
+        if prof is not None:
+            t0 = prof.clock()
+        iv_call, iv_put = self.iv_solver.solve_arrays(S, mid_call, mid_put)
+        if prof is not None:
+            t1 = prof.clock()
+            prof.add('iv', t1 - t0)
+
+        logger = self.logger
+        if logger is not None and logger.is_enabled(INFO, 'option_trade'):
+            for tr in option_trades:
+                logger.log_option_trade(t, tr)
+
+        self.t = t + 1
+        snap = {
+            'mid_price': S,
+            'news': float(market.news),
+            'fundamental_price': market.fundamental_price,
+            'rv': rv,
+            'trades': trades,
+            'option_trades': option_trades,
+            'mid_call': np.array([mid_call[K] for K in self.strikes]),
+            'mid_put': np.array([mid_put[K] for K in self.strikes]),
+            'iv_call': iv_call,
+            'iv_put': iv_put,
+        }
+        if prof is not None:
+            prof.add('snapshot', prof.clock() - t1)
+        return snap
+
+    def steps(self):
+        self.warm_up()
+        prof = self.profiler
+        self.market.profiler = self.options_market.profiler = prof
+        end = self.end
+        while self.t < end:
+            t = self.t
+            if prof is not None:
+                prof.begin_step()
+            snap = self.step()
+            if prof is None:
+                yield t, snap
+                continue
+            t0 = prof.clock()
+            yield t, snap
+            prof.add('sinks', prof.clock() - t0)
+            prof.end_step(t)
+
+    def run(self, *sinks):
+        # drives steps() through the sinks; returns the sinks
+        try:
+            for t, snap in self.steps():
+                for sink in sinks:
+                    sink.on_step(t, snap)
+        finally:
+            for sink in sinks:
+                sink.close()
+        return sinks
@@ -0,0 +1,54 @@
+GTC = 'GTC'     # good till cancelled (default)
+GTT = 'GTT'     # good till time: order['ttl'] steps or absolute order['expire_at']
+IOC = 'IOC'     # immediate or cancel: unfilled remainder never rests
+DAY = 'DAY'     # expires at the next day boundary (the book's steps_per_day)
+
+TIME_IN_FORCE = (GTC, GTT, IOC, DAY)
+
+
+def order_tif(order):
+    tif = order.get('tif')
+    if tif is None:
+        return GTT if order.get('ttl') is not None or order.get('expire_at') is not None else GTC
+    if tif not in TIME_IN_FORCE:
+        raise ValueError(f"unknown time in force: {tif!r}")
+    return tif
+
+
+def expiry_time(order, tif, t, steps_per_day):
+    if tif == GTT:
+        if order.get('expire_at') is not None:
+            return int(order['expire_at'])
+        ttl = order.get('ttl')
+        if ttl is None or ttl < 1:
+            raise ValueError(f"GTT order needs ttl >= 1 or expire_at, got ttl={ttl!r}")
+        return t + int(ttl)
+    if tif == DAY:
+        return (t // steps_per_day + 1) * steps_per_day
+    return None
+
+
+class ExpiryWheel:
+    # one bucket per expiry step; advancing the clock pops whole buckets, so
+    # each order is touched once when it is scheduled and once when it expires
+    def __init__(self, t=0):
+        self.t = t
+        self.buckets = {}
+
+    def schedule(self, expire_at, entry):
+        self.buckets.setdefault(expire_at, []).append(entry)
+
+    def advance(self, t):
+        expired = []
+        if t <= self.t:
+            return expired
+        if t - self.t <= len(self.buckets):
+            due = range(self.t + 1, t + 1)
+        else:
+            due = sorted(k for k in self.buckets if k <= t)
+        for k in due:
+            bucket = self.buckets.pop(k, None)
+            if bucket:
+                expired.extend(bucket)
+        self.t = t
+        return expired
@@ -0,0 +1,100 @@
+import math
+from collections import deque
+from utils.vol_utils import SlidingWindow
+
+
+class TrendIndicator:
+    # trend statistics over the last `lookback` mid prices, updated in O(1)
+    # per tick: OLS slope of log price on 0..n-1, population std of the log
+    # returns and ATR (mean absolute price change) inside the window
+    def __init__(self, lookback):
+        self.lookback = lookback
+        self._prices = deque()
+        self._logs = deque()
+        self._returns = SlidingWindow(max(lookback - 1, 0))
+        self._ranges = SlidingWindow(max(lookback - 1, 0))
+        self._moves = 0     # price changes in the window; zero means a flat window
+        self._sum_y = 0.0
+        self._sum_xy = 0.0
+        self._slides = 0
+
+    def __len__(self):
+        return len(self._prices)
+
+    def update(self, price):
+        y = math.log(price)
+        logs = self._logs
+        if logs:
+            r = y - logs[-1]
+            self._returns.push(r)
+            self._ranges.push(abs(price - self._prices[-1]))
+            if price != self._prices[-1]:
+                self._moves += 1
+
+        n = len(logs)
+        if n < self.lookback:
+            self._sum_xy += n * y
+            self._sum_y += y
+        else:
+            y0 = logs.popleft()
+            p0 = self._prices.popleft()
+            if (self._prices[0] if self._prices else price) != p0:
+                self._moves -= 1
+            # shifting x down by one drops sum_y - y0 from sum_xy
+            self._sum_xy += (n - 1) * y - (self._sum_y - y0)
+            self._sum_y += y - y0
+            self._slides += 1
+        logs.append(y)
+        self._prices.append(price)
+
+        if self._slides >= self.lookback:
+            self._sum_y = math.fsum(logs)
+            self._sum_xy = math.fsum(i * v for i, v in enumerate(logs))
+            self._slides = 0
+
+    def slope(self):
+        n = len(self._logs)
+        if n < 2:
+            return 0.0
+        sx = n * (n - 1) / 2
+        sxx = (n - 1) * n * (2 * n - 1) / 6
+        return (n * self._sum_xy - sx * self._sum_y) / (n * sxx - sx * sx)
+
+    def return_vol(self):
+        stats = self._returns.stats
+        if stats.n < 2 or self._moves == 0:
+            return 0.0
+        return math.sqrt(max(stats.m2, 0.0) / stats.n)
+
+    def trend(self):
+        if len(self._logs) < 10:
+            return 0
+        vol = self.return_vol()
+        if vol == 0:
+            return 0
+        return self.slope() / vol
+
+    def atr(self):
+        if len(self._prices) < 20:
+            return None
+        if self._moves == 0:
+            return None
+        atr = self._ranges.stats.mean
+        return atr if atr > 0 else None
+
+
+class TrendIndicators:
+    # one TrendIndicator per lookback, shared by every subscriber and fed
+    # once per tick by the market
+    def __init__(self):
+        self._by_lookback = {}
+
+    def subscribe(self, lookback):
+        indicator = self._by_lookback.get(lookback)
+        if indicator is None:
+            indicator = self._by_lookback[lookback] = TrendIndicator(lookback)
+        return indicator
+
+    def update(self, price):
+        for indicator in self._by_lookback.values():
+            indicator.update(price)
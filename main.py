@@ -1,198 +1,177 @@
-from agents.noise_trader import NoiseTrader
-from agents.market_maker import MarketMaker
-from agents.informed_trader import InformedTrader
-from agents.fundamental import FundamentalTrader
-from utils.plotting import plot_price_series
-from utils.plotting import plot_options_prices
+import argparse
+import os
+import time
 import config as cfg
 from utils import file_io
-from environment.market import Market
-from agents.trend_trader import TrendTrader
-from environment.options_market import OptionsMarket
-from agents.options_market_maker import OptionsMarketMaker
-from agents.options_noise_trader import OptionsNoiseTrader
-from agents.options_arbitrageur import OptionsArbitrageur
-from utils.logger import Logger
-from utils.vol_utils import rolling_mean, realised_vol_last
-from utils.plotting import plot_realised_vol
-from utils import bs_utils
-from utils import plotting
+from environment.simulation import Simulation
+from utils.logger import Logger, LEVELS
+from utils.vol_utils import rolling_mean
+from utils.trade_tape import TradeTapeWriter
+from utils import checkpoint
+from utils.sinks import HistorySink, TapeSink, ConsoleSink, ProgressSink, CheckpointSink
+from utils.warmup_cache import WarmupCache
+from utils.profiler import StepProfiler
+from utils.order_flow import FlowRecorder
 from utils.bs_utils import print_iv_rv_summary
-
-
-def main():
-    agents = []
-
-    for i in range(cfg.NUM_NOISE_TRADERS):
-        agents.append(NoiseTrader(id=i+1,
-                                  noise_level=cfg.NOISE_TRADER_NOISE_LEVEL))
-
-    for i in range(cfg.NUM_MARKET_MAKERS):
-        agents.append(MarketMaker(
-            id=cfg.NUM_NOISE_TRADERS + i + 1,
-            base_spread=cfg.MM_BASE_SPREAD,
-            inventory_risk_aversion=cfg.MM_INV_RISK,
-            max_inventory=cfg.MM_MAX_INVENTORY,
-            base_size=cfg.MM_BASE_SIZE
-        ))
-
-    for i in range(cfg.NUM_INFORMED_TRADERS):
-        agents.append(InformedTrader(
-            id=cfg.NUM_NOISE_TRADERS + cfg.NUM_MARKET_MAKERS + i + 1,
-            sensitivity=cfg.INFORMED_TRADER_SENSITIVITY,
-            aggressiveness=cfg.INFORMED_TRADER_AGGRESSIVENESS
-        ))
-
-    for i in range(cfg.NUM_TREND_TRADERS):
-        agents.append(TrendTrader(
-            id=cfg.NUM_NOISE_TRADERS
-               + cfg.NUM_MARKET_MAKERS
-               + cfg.NUM_INFORMED_TRADERS
-               + i + 1
-        ))
-
-    for i in range(cfg.NUM_FUNDAMENTAL_TRADERS):
-        agents.append(FundamentalTrader(
-            id=cfg.NUM_NOISE_TRADERS
-               + cfg.NUM_MARKET_MAKERS
-               + cfg.NUM_INFORMED_TRADERS
-               + cfg.NUM_TREND_TRADERS
-               + i + 1,
-            fundamental_price=cfg.INITIAL_PRICE,
-            aggressiveness=cfg.FUNDAMENTAL_TRADER_AGGRESSIVENESS
-        ))
-
-    market = Market(initial_price=cfg.INITIAL_PRICE)
-    market.set_agents(agents)
-
-    logger = Logger(enable_console=True)
-
-
-    options_market = OptionsMarket(
-        strikes=cfg.OPTION_STRIKES,
-        tau=cfg.OPTION_TAU,
-        r=cfg.OPTION_R,
-        q=cfg.OPTION_Q,
-        vol=cfg.OPTION_VOL
-    )
-    options_market.logger = logger
-
-    options_agents = []
-    for i in range(cfg.NUM_OPTION_MARKET_MAKERS):
-        options_agents.append(OptionsMarketMaker(
-            id=1000 + i + 1,
-        ))
-
-    for i in range(cfg.NUM_OPTION_NOISE_TRADERS):
-        options_agents.append(OptionsNoiseTrader(
-            id=2000 + i + 1,
-        ))
-
-    for i in range(cfg.NUM_OPTION_ARB):
-        options_agents.append(OptionsArbitrageur(
-            id=3000 + i + 1,
-        ))
-
-    options_market.set_agents(options_agents)
-
-    price_history = []
-    trades = []
-    option_trades = []
-    option_price_history_call = []
-    option_price_history_put = []
-    rv_history = []
-    iv_history_call = []
-    iv_history_put = []
-    news_history = []
-
-    for t in range(cfg.WARMUP_STEPS):
-        market.step(t, agents)
-
-    for t in range(cfg.WARMUP_STEPS, cfg.WARMUP_STEPS + cfg.NUM_STEPS):
-        step_trades = market.step(t, agents)
-
-        print(f"[Time {t}] News: {market.news:.2f}")
-        print(f"Mid price: {market.mid_price:.2f}\n")
-
-        for tr in step_trades:
-            tr['time'] = t
-        trades.extend(step_trades)
-
-        S = market.mid_price
-        price_history.append(S)
-        news_history.append(float(market.news))
-
-        rv = realised_vol_last(price_history, lookback=200, annualization=252)
-        rv_history.append(rv)
-
-        vol_for_options = rv if rv is not None else cfg.OPTION_VOL
-
-        opt_trades = options_market.step(
-            t=t,
-            S=S,
-            agents=options_agents,
-            vol=vol_for_options,
-            spot_order_book = market.order_book
-        )
-
-        option_price_history_call.append(options_market.mid_prices_call.copy())
-        option_price_history_put.append(options_market.mid_prices_put.copy())
-
-        iv_step_call = {}
-        iv_step_put = {}
-
-        for K in cfg.OPTION_STRIKES:
-            C_mid = options_market.mid_prices_call.get(K)
-            P_mid = options_market.mid_prices_put.get(K)
-
-            iv_step_call[K] = bs_utils.implied_volatility(
-                price=C_mid, S=S, K=K,
-                r=cfg.OPTION_R, q=cfg.OPTION_Q, T=cfg.OPTION_TAU,
-                option_type='call'
-            )
-            iv_step_put[K] = bs_utils.implied_volatility(
-                price=P_mid, S=S, K=K,
-                r=cfg.OPTION_R, q=cfg.OPTION_Q, T=cfg.OPTION_TAU,
-                option_type='put'
-            )
-
-        iv_history_call.append(iv_step_call)
-        iv_history_put.append(iv_step_put)
-
-        option_trades.extend(opt_trades)
-
-        for tr in opt_trades:
-            logger.log_option_trade(t, tr)
+from sim_config import SimConfig
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Spot + options agent-based market simulation")
+    parser.add_argument("--steps", type=int, default=cfg.NUM_STEPS)
+    parser.add_argument("--warmup", type=int, default=cfg.WARMUP_STEPS)
+    parser.add_argument("--seed", type=int, default=cfg.SEED)
+    parser.add_argument("--headless", action="store_true",
+                        help="no console echo; plots are saved instead of shown unless --plots says otherwise")
+    parser.add_argument("--plots", choices=("show", "save", "none"), default=None,
+                        help="default: 'save' when headless, otherwise 'show'")
+    parser.add_argument("--plot-dir", default="plots")
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--trades-format", choices=("csv", "tape", "both"), default="csv",
+                        help="'tape' streams spot and option trades to a columnar trades.npy during the run")
+    parser.add_argument("--log-level", choices=tuple(LEVELS), default="debug",
+                        help="'info' drops per-order/news/mid events and keeps trades")
+    parser.add_argument("--log-thread", action="store_true", help="write log batches from a background thread")
+    parser.add_argument("--checkpoint", default=None, metavar="PATH",
+                        help="save the full simulation state to PATH every --checkpoint-every steps")
+    parser.add_argument("--checkpoint-every", type=int, default=1000)
+    parser.add_argument("--resume", action="store_true", help="continue from --checkpoint if it exists")
+    parser.add_argument("--progress", type=int, default=0, metavar="N",
+                        help="headless runs: print a status line every N steps")
+    parser.add_argument("--warmup-cache", default=None, metavar="DIR",
+                        help="load the post-warm-up spot market from DIR, or save it there (needs --seed)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time the measured steps by phase and agent class; writes profile.json and "
+                             "profile_steps.csv to --out-dir and prints a summary table")
+    parser.add_argument("--record-flow", default=None, metavar="PATH",
+                        help="record every order, cancel and clock tick the books receive after the warm-up "
+                             "to PATH (replay with python -m benchmarks.replay_flow)")
+    args = parser.parse_args(argv)
+    if args.plots is None:
+        args.plots = "save" if args.headless else "show"
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    echo = not args.headless
+    c = SimConfig.from_module(NUM_STEPS=args.steps, WARMUP_STEPS=args.warmup, SEED=args.seed)
+    logger = Logger(enable_console=echo, level=args.log_level, background=args.log_thread)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    def out_path(name):
+        return os.path.join(args.out_dir, name)
+
+    keep_csv = args.trades_format in ("csv", "both")
+
+    tape_mark = None
+    if args.resume and args.checkpoint and os.path.exists(args.checkpoint):
+        state = checkpoint.load(args.checkpoint)
+        if state['config'] != c:
+            raise SystemExit(f"{args.checkpoint} was written with different settings")
+        sim, history, tape_mark = state['sim'], state['history'], state['tape_mark']
+        sim.set_logger(logger)
+        print(f"resuming from {args.checkpoint} at t={sim.t}")
+    else:
+        sim = Simulation(c, logger=logger)
+        history = HistorySink(sim.strikes, keep_trades=keep_csv)
+
+    if args.profile:
+        sim.profiler = StepProfiler()
+
+    sinks = [history]
+    tape = None
+    if args.trades_format != "csv":
+        tape = TradeTapeWriter(out_path("trades.npy"), resume_at=tape_mark)
+        sinks.append(TapeSink(tape))
+    if echo:
+        sinks.append(ConsoleSink())
+    elif args.progress:
+        sinks.append(ProgressSink(args.progress, total=c.NUM_STEPS))
+    if args.checkpoint:
+        # last, so the saved history includes the step just taken
+        sinks.append(CheckpointSink(args.checkpoint, args.checkpoint_every, lambda: dict(
+            config=c, sim=sim, history=history, tape_mark=tape.mark() if tape is not None else None)))
+
+    t_start = time.perf_counter()
+    sim.warm_up(WarmupCache(args.warmup_cache) if args.warmup_cache else None)
+    warmup_elapsed = time.perf_counter() - t_start
+    start = sim.t
+    t_start = time.perf_counter()
+    flow = None
+    if args.record_flow:
+        flow = FlowRecorder(args.record_flow)
+        flow.attach_markets(sim.market, sim.options_market)
+    sim.run(*sinks)
+    logger.close()
+    if flow is not None:
+        flow.close()
+    elapsed = time.perf_counter() - t_start
+
+    strikes = sim.strikes
+    price_history = history.price_history
+    rv_history = history.rv_history
+    iv_history_call = history.iv_history_call
+    iv_history_put = history.iv_history_put
+    option_price_history_call = history.option_price_history_call
+    option_price_history_put = history.option_price_history_put
 
     print_iv_rv_summary(
         rv_history=rv_history,
         iv_history_call=iv_history_call,
         iv_history_put=iv_history_put,
-        strikes=cfg.OPTION_STRIKES
+        strikes=strikes
     )
 
-    rv_avg = rolling_mean(rv_history, window=200)
-    plot_realised_vol(rv_history, rv_avg, title="Spot realised vol + rolling average")
+    if args.plots != "none":
+        if args.plots == "save":
+            import matplotlib
+            matplotlib.use("Agg")
+            os.makedirs(args.plot_dir, exist_ok=True)
+        # imported here so --plots none runs without matplotlib
+        from utils import plotting
+        from utils.plotting import plot_price_series, plot_options_prices, plot_realised_vol
+
+        def plot_path(name):
+            return os.path.join(args.plot_dir, name) if args.plots == "save" else None
+
+        rv_avg = rolling_mean(rv_history, window=200)
+        plot_realised_vol(rv_history, rv_avg, title="Spot realised vol + rolling average",
+                          save_path=plot_path("realised_vol.png"))
+
+        plotting.plot_implied_vol_series(iv_history_call, strikes=strikes, title="Implied Vol (Calls)",
+                                         save_path=plot_path("iv_call.png"))
+        plotting.plot_implied_vol_series(iv_history_put, strikes=strikes, title="Implied Vol (Puts)",
+                                         save_path=plot_path("iv_put.png"))
+
+        plot_price_series(price_history, save_path=plot_path("price.png"))
+        plot_options_prices(option_price_history_call, strikes=strikes, title='Call Options Prices',
+                            save_path=plot_path("option_prices_call.png"))
+        plot_options_prices(option_price_history_put, strikes=strikes, title='Put Options Prices',
+                            save_path=plot_path("option_prices_put.png"))
 
-    plotting.plot_implied_vol_series(iv_history_call, strikes=cfg.OPTION_STRIKES, title="Implied Vol (Calls)")
-    plotting.plot_implied_vol_series(iv_history_put, strikes=cfg.OPTION_STRIKES, title="Implied Vol (Puts)")
 
-    plot_price_series(price_history)
-    plot_options_prices(option_price_history_call, strikes=cfg.OPTION_STRIKES, title='Call Options Prices')
-    plot_options_prices(option_price_history_put, strikes=cfg.OPTION_STRIKES, title='Put Options Prices')
+    file_io.save_price_history(out_path('price_history.csv'), price_history)
+    if keep_csv:
+        file_io.save_trades(out_path('trades.csv'), history.trades)
+        file_io.save_trades(out_path('option_trades.csv'), history.option_trades)
 
+    file_io.save_columns_csv(out_path('option_mid_call.csv'), option_price_history_call, strikes, index_name='t')
+    file_io.save_columns_csv(out_path('option_mid_put.csv'), option_price_history_put, strikes, index_name='t')
 
-    file_io.save_price_history('price_history.csv', price_history)
-    file_io.save_trades('trades.csv', trades)
-    file_io.save_trades('option_trades.csv', option_trades)
+    file_io.save_columns_csv(out_path('iv_call.csv'), iv_history_call, strikes, index_name='t')
+    file_io.save_columns_csv(out_path('iv_put.csv'), iv_history_put, strikes, index_name='t')
 
-    file_io.save_wide_series_csv('option_mid_call.csv', option_price_history_call, index_name='t')
-    file_io.save_wide_series_csv('option_mid_put.csv', option_price_history_put, index_name='t')
+    file_io.save_series_csv(out_path("news_history.csv"), history.news_history, colname="news")
 
-    file_io.save_wide_series_csv('iv_call.csv', iv_history_call, index_name='t')
-    file_io.save_wide_series_csv('iv_put.csv', iv_history_put, index_name='t')
+    n_steps = sim.end - start
+    print(f"{n_steps} measured steps in {elapsed:.2f}s "
+          f"({n_steps / elapsed if elapsed > 0 else float('inf'):.1f} steps/s; warm-up {warmup_elapsed:.2f}s)")
 
-    file_io.save_series_csv("news_history.csv", news_history, colname="news")
+    if sim.profiler is not None:
+        sim.profiler.to_json(out_path("profile.json"))
+        sim.profiler.to_csv(out_path("profile_steps.csv"))
+        print(sim.profiler.summary_table())
 
 
 if __name__ == "__main__":
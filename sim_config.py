@@ -0,0 +1,99 @@
+import dataclasses
+from dataclasses import dataclass
+import config as cfg
+
+
+@dataclass(frozen=True)
+class SimConfig:
+    # Immutable per-simulation settings. Field names and defaults mirror the
+    # constants in config.py, which stays the place to edit defaults; a run
+    # builds one SimConfig and hands it to the markets, books, processes and
+    # agents, so simulations with different settings can share a process.
+
+    # Simulation settings
+    NUM_STEPS: int = cfg.NUM_STEPS
+    INITIAL_PRICE: float = cfg.INITIAL_PRICE
+    WARMUP_STEPS: int = cfg.WARMUP_STEPS
+    SEED: object = cfg.SEED
+
+    ORDER_BOOK_IMPL: str = cfg.ORDER_BOOK_IMPL
+    STEPS_PER_DAY: int = cfg.STEPS_PER_DAY
+    MATCHING_MODE: str = cfg.MATCHING_MODE
+
+    # Agents settings
+    NUM_NOISE_TRADERS: int = cfg.NUM_NOISE_TRADERS
+    NUM_MARKET_MAKERS: int = cfg.NUM_MARKET_MAKERS
+    NUM_INFORMED_TRADERS: int = cfg.NUM_INFORMED_TRADERS
+    NUM_FUNDAMENTAL_TRADERS: int = cfg.NUM_FUNDAMENTAL_TRADERS
+    USE_POPULATIONS: bool = cfg.USE_POPULATIONS
+
+    NUM_TREND_TRADERS: int = cfg.NUM_TREND_TRADERS
+    TREND_TRADER_LOOKBACK: int = cfg.TREND_TRADER_LOOKBACK
+    TREND_TRADER_THRESHOLD: float = cfg.TREND_TRADER_THRESHOLD
+    TREND_TRADER_AGGRESSIVENESS: float = cfg.TREND_TRADER_AGGRESSIVENESS
+    TREND_TRADER_MAX_QTY: int = cfg.TREND_TRADER_MAX_QTY
+
+    NOISE_ORDER_TTL: object = cfg.NOISE_ORDER_TTL
+    INFORMED_ORDER_TTL: object = cfg.INFORMED_ORDER_TTL
+    FUNDAMENTAL_ORDER_TTL: object = cfg.FUNDAMENTAL_ORDER_TTL
+    TREND_ORDER_TTL: object = cfg.TREND_ORDER_TTL
+
+    NOISE_TRADER_NOISE_LEVEL: float = cfg.NOISE_TRADER_NOISE_LEVEL
+    NOISE_ORDER_PROB: float = cfg.NOISE_ORDER_PROB
+    INFORMED_TRADER_SENSITIVITY: float = cfg.INFORMED_TRADER_SENSITIVITY
+    INFORMED_TRADER_AGGRESSIVENESS: float = cfg.INFORMED_TRADER_AGGRESSIVENESS
+    FUNDAMENTAL_TRADER_AGGRESSIVENESS: float = cfg.FUNDAMENTAL_TRADER_AGGRESSIVENESS
+    FUNDAMENTAL_DRIFT: float = cfg.FUNDAMENTAL_DRIFT
+    FUNDAMENTAL_INTERVAL: int = cfg.FUNDAMENTAL_INTERVAL
+    FUNDAMENTAL_SIGMA: float = cfg.FUNDAMENTAL_SIGMA
+    FUNDAMENTAL_TRADER_ORDER_PROB: float = cfg.FUNDAMENTAL_TRADER_ORDER_PROB
+
+    MM_BASE_SPREAD: float = cfg.MM_BASE_SPREAD
+    MM_INV_RISK: float = cfg.MM_INV_RISK
+    MM_MAX_INVENTORY: int = cfg.MM_MAX_INVENTORY
+    MM_BASE_SIZE: int = cfg.MM_BASE_SIZE
+    MM_VOL_SENS: float = cfg.MM_VOL_SENS
+
+    # News settings
+    NEWS_PROBABILITY: float = cfg.NEWS_PROBABILITY
+    NEWS_VOLATILITY: float = cfg.NEWS_VOLATILITY
+
+    NUM_OPTION_MARKET_MAKERS: int = cfg.NUM_OPTION_MARKET_MAKERS
+    NUM_OPTION_NOISE_TRADERS: int = cfg.NUM_OPTION_NOISE_TRADERS
+    NUM_OPTION_ARB: int = cfg.NUM_OPTION_ARB
+    OPTION_STRIKES: tuple = tuple(cfg.OPTION_STRIKES)
+    OPTION_TAU: float = cfg.OPTION_TAU
+    OPTION_R: float = cfg.OPTION_R
+    OPTION_Q: float = cfg.OPTION_Q
+    OPTION_VOL: float = cfg.OPTION_VOL
+    OPTION_SPREAD_FACTOR: float = cfg.OPTION_SPREAD_FACTOR
+    OPTION_ARB_THRESHOLD: float = cfg.OPTION_ARB_THRESHOLD
+    MIN_OPTION_PRICE: float = cfg.MIN_OPTION_PRICE
+    DELTA_HEDGE_THRESHOLD: float = cfg.DELTA_HEDGE_THRESHOLD
+    DELTA_HEDGE_INTERVAL: int = cfg.DELTA_HEDGE_INTERVAL
+
+    def __post_init__(self):
+        # lists would make a frozen config mutable through the back door
+        if not isinstance(self.OPTION_STRIKES, tuple):
+            object.__setattr__(self, 'OPTION_STRIKES', tuple(self.OPTION_STRIKES))
+
+    @classmethod
+    def from_module(cls, module=cfg, **overrides):
+        # snapshot of the module's current values, e.g. after a script has
+        # edited config at run time
+        values = {f.name: getattr(module, f.name) for f in dataclasses.fields(cls) if hasattr(module, f.name)}
+        return cls(**values).replace(**overrides)
+
+    def replace(self, **overrides):
+        unknown = set(overrides) - {f.name for f in dataclasses.fields(self)}
+        if unknown:
+            raise ValueError(f"unknown config parameters: {sorted(unknown)}")
+        return dataclasses.replace(self, **overrides)
+
+    def as_dict(self):
+        return dataclasses.asdict(self)
+
+
+def resolve(config):
+    # config=None means "the config module as it is now"
+    return config if config is not None else SimConfig.from_module()
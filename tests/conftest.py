@@ -0,0 +1,8 @@
+import os
+import sys
+
+# the repo is run from its root (python main.py); make the same imports work
+# when pytest is started from anywhere
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
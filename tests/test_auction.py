@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+from environment.matching_engine import MatchingEngine
+from environment.orders import Order
+
+
+def queued_book(bids, asks, impl='heap'):
+    # bids/asks: [(price, qty)], one agent per order
+    book = MatchingEngine(100.0, impl=impl)
+    agent = 0
+    for side, orders in (('buy', bids), ('sell', asks)):
+        for price, qty in orders:
+            agent += 1
+            book.add_order(Order(agent, side, price, qty), match=False)
+    return book
+
+
+def reference_clearing_price(bids, asks):
+    # the rule spelled out over every order price: most volume, then the
+    # smallest imbalance, then the middle of the tied prices
+    best = None
+    for p in sorted({price for price, _ in bids + asks}):
+        demand = sum(q for price, q in bids if price >= p)
+        supply = sum(q for price, q in asks if price <= p)
+        if demand == 0 or supply == 0:
+            continue
+        row = (min(demand, supply), -abs(demand - supply))
+        if best is None or row > best[0]:
+            best = (row, [p])
+        elif row == best[0]:
+            best[1].append(p)
+    if best is None:
+        return None, 0
+    (volume, _), tied = best
+    return (tied[0] + tied[-1]) / 2, volume
+
+
+def test_clearing_price_maximises_volume():
+    book = queued_book([(101.0, 5), (100.0, 5)], [(99.0, 4), (100.0, 4)])
+    assert book.clearing_price() == (100.0, 8)
+
+
+def test_volume_tie_goes_to_smallest_imbalance():
+    # every price clears 5; 99 and 100 leave 3 unfilled against 4 at 101 and 102
+    book = queued_book([(102.0, 5), (100.0, 3)], [(99.0, 5), (101.0, 4)])
+    assert book.clearing_price() == (99.5, 5)
+
+
+def test_remaining_tie_goes_to_the_middle_of_the_range():
+    book = queued_book([(101.0, 5)], [(99.0, 5)])
+    assert book.clearing_price() == (100.0, 5)
+
+
+def test_uncrossed_book_has_no_clearing_price():
+    assert queued_book([(99.0, 5)], [(101.0, 5)]).clearing_price() == (None, 0)
+    assert queued_book([(99.0, 5)], []).clearing_price() == (None, 0)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_clearing_price_matches_reference(seed):
+    rng = np.random.default_rng(seed)
+    prices = np.round(100 + rng.normal(0, 1, 40), 1)
+    qtys = rng.integers(1, 10, 40)
+    bids = [(float(p), int(q)) for p, q in zip(prices[:20], qtys[:20])]
+    asks = [(float(p), int(q)) for p, q in zip(prices[20:], qtys[20:])]
+    price, volume = queued_book(bids, asks).clearing_price()
+    ref_price, ref_volume = reference_clearing_price(bids, asks)
+    assert ref_price is not None
+    assert (price, volume) == (pytest.approx(ref_price), ref_volume)
+
+
+@pytest.mark.parametrize("impl", ['list', 'heap'])
+def test_uncross_trades_everything_at_one_price(impl):
+    rng = np.random.default_rng(5)
+    prices = np.round(100 + rng.normal(0, 1, 60), 1)
+    qtys = rng.integers(1, 10, 60)
+    bids = [(float(p), int(q)) for p, q in zip(prices[:30], qtys[:30])]
+    asks = [(float(p), int(q)) for p, q in zip(prices[30:], qtys[30:])]
+    book = queued_book(bids, asks, impl)
+    price, volume = book.clearing_price()
+
+    trades = book.uncross()
+    assert {tr.price for tr in trades} == {price}
+    assert sum(tr.qty for tr in trades) == volume
+    assert book.last_price == price
+    assert book.best_bid() < book.best_ask()
+
+
+def test_list_and_heap_uncross_identically():
+    rng = np.random.default_rng(9)
+    prices = np.round(100 + rng.normal(0, 1, 60), 1)
+    qtys = rng.integers(1, 10, 60)
+    bids = [(float(p), int(q)) for p, q in zip(prices[:30], qtys[:30])]
+    asks = [(float(p), int(q)) for p, q in zip(prices[30:], qtys[30:])]
+    books = [queued_book(bids, asks, impl) for impl in ('list', 'heap')]
+    trades = [[(tr.price, tr.qty, tr.buyer, tr.seller) for tr in book.uncross()] for book in books]
+    assert trades[0] == trades[1]
+    assert books[0].resting_orders() == books[1].resting_orders()
+
+
+def test_time_in_force_applies_after_the_uncross():
+    book = MatchingEngine(100.0)
+    book.add_order(Order(1, 'sell', 100.0, 2), match=False)
+    book.add_order(Order(2, 'buy', 100.0, 5, tif='IOC'), match=False)
+    book.add_order(Order(3, 'buy', 99.0, 1, ttl=2), match=False)
+    # queued orders rest untouched until the auction
+    assert book.live_orders == 3
+
+    trades = book.uncross()
+    assert [(tr.price, tr.qty, tr.buyer) for tr in trades] == [(100.0, 2, 2)]
+    assert book.bids == [(99.0, 1, 3)]
+    book.advance_time(2)
+    assert book.live_orders == 0
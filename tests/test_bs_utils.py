@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from utils.bs_utils import bs_delta, bs_gamma, bs_greeks_vec, bs_price, bs_theta, bs_vega
+
+S, R, Q = 100.0, 0.03, 0.01
+STRIKES = [80.0, 95.0, 100.0, 105.0, 120.0]
+GREEKS = ('price', 'delta', 'gamma', 'vega', 'theta')
+
+
+def scalar_greeks(K, sigma, T, option_type):
+    return (bs_price(S, K, R, Q, sigma, T, option_type), bs_delta(S, K, R, Q, sigma, T, option_type),
+            bs_gamma(S, K, R, Q, sigma, T), bs_vega(S, K, R, Q, sigma, T),
+            bs_theta(S, K, R, Q, sigma, T, option_type))
+
+
+@pytest.mark.parametrize("sigma, T", [(0.2, 0.0), (0.2, -0.1), (0.0, 0.5), (0.0, 0.0), (-0.1, 0.5), (0.2, 0.5)])
+@pytest.mark.parametrize("option_type", ['call', 'put'])
+def test_vector_greeks_match_scalar_on_edge_legs(sigma, T, option_type):
+    K = np.array(STRIKES)
+    with np.errstate(all='raise'):
+        vec = bs_greeks_vec(S, K, R, Q, sigma, T, option_type)
+    for i, k in enumerate(STRIKES):
+        expected = scalar_greeks(k, sigma, T, option_type)
+        got = tuple(float(vec[g][i]) for g in GREEKS)
+        assert got == pytest.approx(expected, abs=1e-12)
+
+
+@pytest.mark.parametrize("option_type", ['call', 'put'])
+def test_zero_vol_is_the_small_vol_limit(option_type):
+    # away from the money on the forward, a tiny sigma is already at the limit
+    for k in [80.0, 120.0]:
+        flat = scalar_greeks(k, 0.0, 0.5, option_type)
+        tiny = scalar_greeks(k, 1e-6, 0.5, option_type)
+        assert flat == pytest.approx(tiny, abs=1e-9)
+
+
+def test_expired_legs_pay_intrinsic_with_step_delta():
+    g = bs_greeks_vec(S, [90.0, 110.0], R, Q, 0.2, 0.0, ['call', 'put'])
+    assert list(g['price']) == [10.0, 10.0]
+    assert list(g['delta']) == [1.0, -1.0]
+    assert not g['gamma'].any() and not g['vega'].any() and not g['theta'].any()
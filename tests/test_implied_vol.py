@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from utils.bs_utils import (ImpliedVolSolver, bs_price, bs_price_vec, bs_vega, implied_volatility,
+                            implied_volatility_vec)
+
+S, R, Q = 100.0, 0.01, 0.0
+STRIKES = [70.0, 80.0, 90.0, 95.0, 100.0, 105.0, 110.0, 120.0, 140.0]
+
+
+def chain(sigma, T):
+    calls = {K: bs_price(S, K, R, Q, sigma, T, 'call') for K in STRIKES}
+    puts = {K: bs_price(S, K, R, Q, sigma, T, 'put') for K in STRIKES}
+    return calls, puts
+
+
+@pytest.mark.parametrize("sigma", [0.1, 0.25, 0.6, 1.5])
+@pytest.mark.parametrize("T", [0.05, 0.5, 2.0])
+@pytest.mark.parametrize("option_type", ['call', 'put'])
+def test_halley_matches_bisection(sigma, T, option_type):
+    K = np.array(STRIKES)
+    prices = bs_price_vec(S, K, R, Q, sigma, T, option_type)
+    iv = implied_volatility_vec(prices, S, K, R, Q, T, option_type)
+    iv_bisect = np.array([implied_volatility(p, S, k, R, Q, T, option_type) for p, k in zip(prices, K)])
+
+    # both stop on a price tolerance of 1e-6, so they agree to that in price
+    # everywhere, and in volatility wherever vega is not negligible
+    assert np.all(np.abs(bs_price_vec(S, K, R, Q, iv, T, option_type) - prices) < 2e-6)
+    vega = np.array([bs_vega(S, k, R, Q, sigma, T) for k in K])
+    sensitive = vega > 1e-2
+    assert sensitive.any()
+    assert np.allclose(iv[sensitive], iv_bisect[sensitive], atol=1e-4)
+    assert np.allclose(iv[sensitive], sigma, atol=1e-4)
+
+
+def test_invalid_inputs_give_nan():
+    iv = implied_volatility_vec([0.0, -1.0, 5.0, 5.0], S, [100.0, 100.0, -1.0, 100.0], R, Q,
+                                [1.0, 1.0, 1.0, 0.0])
+    assert np.isnan(iv).all()
+
+
+def test_out_of_bracket_prices_clamp_like_bisection():
+    T = 0.5
+    for price in (1e-9, 99.0):
+        iv = implied_volatility_vec(price, S, 100.0, R, Q, T, 'call')[()]
+        assert iv == pytest.approx(implied_volatility(price, S, 100.0, R, Q, T, 'call'), abs=1e-4)
+
+
+@pytest.mark.parametrize("vector_min", [1, 1000])
+def test_solver_warm_starts_and_matches_bisection(vector_min):
+    # vector_min picks the vectorised or the element-by-element path
+    T = 0.25
+    solver = ImpliedVolSolver(STRIKES, R, Q, T, vector_min=vector_min)
+    for sigma in (0.2, 0.22, 0.3):
+        calls, puts = chain(sigma, T)
+        iv_calls, iv_puts = solver.solve(S, calls, puts)
+        for K in STRIKES:
+            if bs_vega(S, K, R, Q, sigma, T) < 1e-2:
+                continue
+            assert iv_calls[K] == pytest.approx(implied_volatility(calls[K], S, K, R, Q, T, 'call'), abs=1e-4)
+            assert iv_puts[K] == pytest.approx(implied_volatility(puts[K], S, K, R, Q, T, 'put'), abs=1e-4)
+
+
+def test_solver_reports_missing_quotes_as_none():
+    T = 0.25
+    calls, puts = chain(0.2, T)
+    del calls[100.0]
+    puts[90.0] = None
+    iv_calls, iv_puts = ImpliedVolSolver(STRIKES, R, Q, T).solve(S, calls, puts)
+    assert iv_calls[100.0] is None
+    assert iv_puts[90.0] is None
+    assert iv_puts[100.0] == pytest.approx(0.2, abs=1e-4)
@@ -0,0 +1,53 @@
+from utils.logger import Logger, OPTION_TRADE_HEADER
+
+HEADER = ",".join(OPTION_TRADE_HEADER)
+
+
+def option_trade(price):
+    return {'price': price, 'qty': 1, 'buyer': 1, 'seller': 2, 'instrument': 'option', 'strike': 100,
+            'option_type': 'call'}
+
+
+def make_logger(tmp_path):
+    return Logger(trades_file=str(tmp_path / "trades.csv"), events_file=str(tmp_path / "events.log"),
+                  enable_console=False)
+
+
+def lines(path):
+    return path.read_text().splitlines()
+
+
+def test_option_trades_survive_close_and_reopen(tmp_path):
+    logger = make_logger(tmp_path)
+    logger.log_option_trade(1, option_trade(1.5))
+    logger.close()
+    logger.log_option_trade(2, option_trade(2.5))
+    logger.close()
+    assert lines(tmp_path / "trades_options.csv") == [HEADER, "1,1.5,1,1,2,option,100,call",
+                                                      "2,2.5,1,1,2,option,100,call"]
+
+
+def test_used_logger_replaces_a_stale_option_trades_file(tmp_path):
+    (tmp_path / "trades_options.csv").write_text("stale\n")
+    logger = make_logger(tmp_path)
+    logger.log("nothing but events")
+    logger.close()
+    assert lines(tmp_path / "trades_options.csv") == [HEADER]
+
+
+def test_unused_logger_touches_no_files(tmp_path):
+    (tmp_path / "trades_options.csv").write_text("kept\n")
+    make_logger(tmp_path).close()
+    assert lines(tmp_path / "trades_options.csv") == ["kept"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["trades_options.csv"]
+
+
+def test_background_writer_keeps_rows_across_closes(tmp_path):
+    logger = Logger(trades_file=str(tmp_path / "trades.csv"), events_file=None, enable_console=False,
+                    background=True)
+    for t in range(3):
+        logger.log_trade(t, {'price': 1.0, 'qty': 1, 'buyer': 1, 'seller': 2})
+        logger.log_option_trade(t, option_trade(1.0))
+        logger.close()
+    assert len(lines(tmp_path / "trades.csv")) == 3
+    assert len(lines(tmp_path / "trades_options.csv")) == 4
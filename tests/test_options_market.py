@@ -0,0 +1,68 @@
+import pytest
+from environment.market import Market
+from environment.options_market import OptionsMarket
+from environment.orders import Order
+from sim_config import SimConfig
+from utils.logger import Logger
+
+
+def quiet_logger():
+    return Logger(trades_file=None, events_file=None, enable_console=False, level='warning')
+
+
+class Hedger:
+    # holds calls and only ever sends its delta hedge
+    id = 1001
+
+    def __init__(self, inventory_by_option):
+        self.inventory_by_option = inventory_by_option
+
+    def act(self, state):
+        return []
+
+
+def hedge_step(config_mode, market_mode):
+    # one hedging step against a resting bid the sell hedge crosses -> the spot book
+    c = SimConfig.from_module(SEED=1, MATCHING_MODE=config_mode)
+    market = Market(matching_mode=market_mode, logger=quiet_logger(), config=c)
+    book = market.order_book
+    book.add_order(Order(7, 'buy', 101.0, 50), match=book.continuous)
+    options_market = OptionsMarket(config=c)
+    K = options_market.strikes[0]
+    options_market.step(0, 100.0, [Hedger({(K, 'call'): 10})], spot_order_book=book)
+    return book
+
+
+@pytest.mark.parametrize("config_mode", ['continuous', 'auction'])
+def test_hedges_follow_the_spot_market_mode_not_the_config(config_mode):
+    book = hedge_step(config_mode, 'auction')
+    assert book.trades == []
+    assert [row[0] for row in book.resting_orders()] == ['buy', 'sell']
+    trades = book.uncross()
+    assert trades and {tr.seller for tr in trades} == {Hedger.id}
+
+    book = hedge_step(config_mode, 'continuous')
+    assert book.trades and {tr.seller for tr in book.trades} == {Hedger.id}
+
+
+def test_market_reports_its_book_mode():
+    c = SimConfig.from_module(MATCHING_MODE='continuous')
+    market = Market(matching_mode='auction', logger=quiet_logger(), config=c)
+    assert market.matching_mode == 'auction'
+    assert not market.order_book.continuous
+
+
+def test_option_book_orders_expire():
+    c = SimConfig.from_module(SEED=1, STEPS_PER_DAY=10)
+    options_market = OptionsMarket(config=c)
+    K = options_market.strikes[0]
+    book = options_market.order_books[K]['call']
+    book.add_order(Order(2001, 'buy', 0.5, 1, instrument='option', strike=K, option_type='call', ttl=2))
+    book.add_order(Order(2002, 'sell', 50.0, 1, instrument='option', strike=K, option_type='call', tif='DAY'))
+
+    options_market.step(1, 100.0, [])
+    assert book.live_orders == 2
+    options_market.step(2, 100.0, [])
+    assert book.bids == [] and book.live_orders == 1
+    options_market.step(10, 100.0, [])
+    assert book.live_orders == 0
@@ -0,0 +1,183 @@
+import numpy as np
+import pytest
+from environment.matching_engine import MatchingEngine
+from environment.options_order_book import OptionsOrderBook
+from environment.order_book import OrderBook
+from environment.orders import Order
+from sim_config import SimConfig
+
+
+class ReferenceOrderBook:
+    # the original sort-on-every-insert book, frozen here as the behaviour
+    # the matching engine has to reproduce
+    def __init__(self, initial_price=100):
+        self.bids = []      # (price, qty, agent_id)
+        self.asks = []      # (price, qty, agent_id)
+        self.last_price = initial_price
+        self.trades = []
+        self.agents = {}
+
+    def cancel_orders_for_agent(self, agent_id):
+        self.bids = [b for b in self.bids if b[2] != agent_id]
+        self.asks = [a for a in self.asks if a[2] != agent_id]
+
+    def add_order(self, order):
+        price = order['price']
+        qty = order['qty']
+        agent = order['agent_id']
+
+        if order['side'] == 'buy':
+            self.bids.append((price, qty, agent))
+            self.bids.sort(key=lambda x: x[0], reverse=True)
+        else:
+            self.asks.append((price, qty, agent))
+            self.asks.sort(key=lambda x: x[0])
+
+        return self.match_orders()
+
+    def match_orders(self):
+        trades = []
+
+        while self.bids and self.asks and self.bids[0][0] >= self.asks[0][0]:
+            bid_price, bid_qty, bid_agent = self.bids[0]
+            ask_price, ask_qty, ask_agent = self.asks[0]
+
+            if bid_agent == ask_agent:
+                if bid_qty <= ask_qty:
+                    self.bids.pop(0)
+                else:
+                    self.bids[0] = (bid_price, bid_qty - ask_qty, bid_agent)
+                continue
+
+            trade_qty = min(bid_qty, ask_qty)
+            trade_price = (bid_price + ask_price) / 2
+
+            for agent_id, delta in [(bid_agent, +trade_qty), (ask_agent, -trade_qty)]:
+                agent = self.agents.get(agent_id)
+                if agent and hasattr(agent, "inventory"):
+                    agent.inventory += delta
+
+            trades.append({
+                'price': trade_price,
+                'qty': trade_qty,
+                'buyer': bid_agent,
+                'seller': ask_agent
+            })
+
+            if bid_qty > trade_qty:
+                self.bids[0] = (bid_price, bid_qty - trade_qty, bid_agent)
+            else:
+                self.bids.pop(0)
+
+            if ask_qty > trade_qty:
+                self.asks[0] = (ask_price, ask_qty - trade_qty, ask_agent)
+            else:
+                self.asks.pop(0)
+
+        self.trades.extend(trades)
+        return trades
+
+    def get_mid_price(self, last_price=100):
+        if self.bids and self.asks:
+            mid = (self.bids[0][0] + self.asks[0][0]) / 2
+        elif self.bids:
+            mid = self.bids[0][0]
+        elif self.asks:
+            mid = self.asks[0][0]
+        else:
+            mid = last_price
+        return max(mid, 1.0)
+
+
+class Holder:
+    def __init__(self):
+        self.inventory = 0
+
+
+def random_flow(seed, n=3000, n_agents=12):
+    # -> [(op, arg)]: adds around a drifting mid with some crossing orders,
+    # and cancels of whole agents
+    rng = np.random.default_rng(seed)
+    mid = 100.0
+    flow = []
+    for _ in range(n):
+        mid *= np.exp(0.002 * rng.standard_normal())
+        agent = int(rng.integers(1, n_agents + 1))
+        if rng.random() < 0.15:
+            flow.append(('cancel', agent))
+            continue
+        side = 'buy' if rng.random() < 0.5 else 'sell'
+        offset = round(float(rng.normal(0.0, 0.5)), 2)
+        price = round(mid - offset if side == 'buy' else mid + offset, 2)
+        qty = int(rng.integers(1, 10))
+        flow.append(('add', Order(agent, side, price, qty)))
+    return flow
+
+
+def run_flow(impl, flow):
+    book = MatchingEngine(100.0, impl=impl)
+    trades = []
+    snapshots = []
+    for op, arg in flow:
+        if op == 'add':
+            trades += [(tr.price, tr.qty, tr.buyer, tr.seller) for tr in book.add_order(arg)]
+        else:
+            book.cancel_orders_for_agent(arg)
+        snapshots.append((book.best_bid(), book.best_ask(), book.live_orders))
+    return trades, snapshots, book
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_list_and_heap_books_match_on_random_flow(seed):
+    flow = random_flow(seed)
+    list_trades, list_snaps, list_book = run_flow('list', flow)
+    heap_trades, heap_snaps, heap_book = run_flow('heap', flow)
+
+    assert list_trades
+    assert heap_trades == list_trades
+    assert heap_snaps == list_snaps
+    assert heap_book.bids == list_book.bids
+    assert heap_book.asks == list_book.asks
+    assert heap_book.resting_orders() == list_book.resting_orders()
+    assert heap_book.last_price == list_book.last_price
+
+
+def run_books(books, flow, n_agents=12):
+    # -> per book: (trades, per-step (bids, asks, mid)), inventories
+    out = []
+    for book in books:
+        holders = {i: Holder() for i in range(1, n_agents + 1)}
+        book.agents = holders
+        trades = []
+        states = []
+        for op, arg in flow:
+            if op == 'add':
+                trades += [(tr['price'], tr['qty'], tr['buyer'], tr['seller']) for tr in book.add_order(arg)]
+            else:
+                book.cancel_orders_for_agent(arg)
+            states.append((list(book.bids), list(book.asks), book.get_mid_price(100)))
+        out.append((trades, states, [h.inventory for h in holders.values()]))
+    return out
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3, 4])
+def test_order_books_match_the_original_algorithm(seed):
+    flow = random_flow(seed)
+    reference, list_book, heap_book = run_books(
+        [ReferenceOrderBook(100.0), OrderBook(100.0, impl='list'), OrderBook(100.0, impl='heap')], flow)
+    assert reference[0]
+    assert list_book == reference
+    assert heap_book == reference
+
+
+def test_books_share_one_default_impl():
+    for impl in ('list', 'heap'):
+        c = SimConfig.from_module(ORDER_BOOK_IMPL=impl)
+        assert MatchingEngine(100.0, config=c).impl == impl
+        assert OrderBook(100.0, config=c).impl == impl
+        assert OptionsOrderBook(100, 'call', config=c).impl == impl
+
+
+def test_unknown_impl_is_rejected():
+    with pytest.raises(ValueError):
+        MatchingEngine(100.0, impl='tree')
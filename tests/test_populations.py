@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from agents.fundamental import FundamentalTrader
+from agents.informed_trader import InformedTrader
+from agents.noise_trader import NoiseTrader
+from agents.populations import FundamentalTraderPopulation, InformedTraderPopulation, NoiseTraderPopulation
+from environment.simulation import build_spot
+from sim_config import SimConfig
+from utils.logger import Logger
+
+N_DRAWS = 4000
+STATE = {'mid_price': 100.0, 'news': 0.35, 'fundamental_price': 103.0}
+
+
+def quiet_logger():
+    return Logger(trades_file=None, events_file=None, enable_console=False, level='warning')
+
+
+def build(use_populations):
+    c = SimConfig.from_module(SEED=21, USE_POPULATIONS=use_populations)
+    return c, build_spot(c, quiet_logger())[1]
+
+
+def group(agents, cls, population_cls):
+    # the per-agent members of one trader type, or its population
+    return [a for a in agents if isinstance(a, (cls, population_cls))]
+
+
+def draws(actors, state=STATE, n=N_DRAWS):
+    # -> (n_orders per member id, sides, prices, qtys) over n steps
+    per_id = {}
+    sides, prices, qtys = [], [], []
+    for _ in range(n):
+        for actor in actors:
+            for o in actor.act(state):
+                per_id[o['agent_id']] = per_id.get(o['agent_id'], 0) + 1
+                sides.append(o['side'])
+                prices.append(o['price'])
+                qtys.append(o['qty'])
+    return per_id, np.array(sides), np.array(prices), np.array(qtys)
+
+
+def test_switch_keeps_ids_and_step_order():
+    _, agents = build(False)
+    _, pop_agents = build(True)
+    ids = [a.id for a in agents]
+    pop_ids = []
+    for a in pop_agents:
+        pop_ids += a.ids.tolist() if hasattr(a, 'ids') else [a.id]
+    assert pop_ids == ids
+    assert [type(a) for a in pop_agents].count(NoiseTraderPopulation) == 1
+    assert not any(isinstance(a, (NoiseTrader, InformedTrader, FundamentalTrader)) for a in pop_agents)
+
+
+def test_noise_population_matches_noise_traders():
+    c, agents = build(False)
+    _, pop_agents = build(True)
+    per_id, sides, prices, qtys = draws(group(agents, NoiseTrader, NoiseTraderPopulation))
+    pop_per_id, pop_sides, pop_prices, pop_qtys = draws(group(pop_agents, NoiseTrader, NoiseTraderPopulation))
+
+    # each member orders with probability NOISE_ORDER_PROB
+    p = c.NOISE_ORDER_PROB
+    band = 5 * np.sqrt(p * (1 - p) / N_DRAWS)
+    assert sorted(pop_per_id) == sorted(per_id)
+    for counts in (per_id, pop_per_id):
+        rates = np.array(list(counts.values())) / N_DRAWS
+        assert np.all(np.abs(rates - p) < band)
+
+    for s in (sides, pop_sides):
+        assert abs(np.mean(s == 'buy') - 0.5) < 5 * np.sqrt(0.25 / len(s))
+
+    # prices uniform on mid * (1 +- noise), sizes uniform on 1..5
+    mid, noise = STATE['mid_price'], c.NOISE_TRADER_NOISE_LEVEL
+    for x in (prices, pop_prices):
+        assert mid * (1 - noise) <= x.min() and x.max() <= mid * (1 + noise)
+        assert abs(x.mean() - mid) < 5 * mid * noise / np.sqrt(3 * len(x))
+        assert x.std() == pytest.approx(mid * noise / np.sqrt(3), rel=0.05)
+    for q in (qtys, pop_qtys):
+        assert set(q.tolist()) == {1, 2, 3, 4, 5}
+        assert np.all(np.abs(np.bincount(q)[1:] / len(q) - 0.2) < 5 * np.sqrt(0.16 / len(q)))
+
+
+@pytest.mark.parametrize("news", [0.35, -0.8, 0.0, 3.0])
+def test_informed_population_matches_informed_traders(news):
+    state = dict(STATE, news=news)
+    _, agents = build(False)
+    _, pop_agents = build(True)
+    orders = [o.as_dict() for a in group(agents, InformedTrader, InformedTraderPopulation)
+              for o in a.act(state)]
+    pop_orders = [o.as_dict() for a in group(pop_agents, InformedTrader, InformedTraderPopulation)
+                  for o in a.act(state)]
+    assert len(pop_orders) == len(orders)
+    for o, pop_o in zip(orders, pop_orders):
+        assert pop_o == dict(o, price=pytest.approx(o['price']))
+
+
+def test_fundamental_population_matches_fundamental_traders():
+    c, agents = build(False)
+    _, pop_agents = build(True)
+    per_id, sides, prices, qtys = draws(group(agents, FundamentalTrader, FundamentalTraderPopulation))
+    pop_per_id, pop_sides, pop_prices, pop_qtys = draws(group(pop_agents, FundamentalTrader,
+                                                              FundamentalTraderPopulation))
+
+    p = c.FUNDAMENTAL_TRADER_ORDER_PROB
+    band = 5 * np.sqrt(p * (1 - p) / N_DRAWS)
+    assert sorted(pop_per_id) == sorted(per_id)
+    for counts in (per_id, pop_per_id):
+        rates = np.array(list(counts.values())) / N_DRAWS
+        assert np.all(np.abs(rates - p) < band)
+
+    # given participation the order is deterministic
+    assert set(pop_sides) == set(sides) == {'buy'}
+    assert set(pop_prices) == set(prices) == {101.5}
+    assert set(pop_qtys.tolist()) == set(qtys.tolist())
@@ -0,0 +1,96 @@
+import pytest
+from environment.matching_engine import MatchingEngine
+from environment.orders import Order
+
+
+@pytest.fixture(params=['list', 'heap'])
+def book(request):
+    return MatchingEngine(100.0, impl=request.param, steps_per_day=10)
+
+
+def test_gtt_order_expires_after_ttl(book):
+    book.add_order(Order(1, 'buy', 99.0, 5, tif='GTT', ttl=3))
+    book.advance_time(2)
+    assert book.best_bid() == 99.0
+    book.advance_time(3)
+    assert book.best_bid() is None
+    assert book.live_orders == 0
+
+
+def test_gtt_expire_at_and_ttl_without_tif(book):
+    book.add_order(Order(1, 'buy', 99.0, 5, expire_at=4))
+    book.add_order(Order(2, 'sell', 101.0, 5, ttl=2))
+    book.advance_time(2)
+    assert (book.best_bid(), book.best_ask()) == (99.0, None)
+    book.advance_time(4)
+    assert book.live_orders == 0
+
+
+def test_partly_filled_gtt_remainder_expires(book):
+    book.add_order(Order(1, 'sell', 100.0, 2))
+    trades = book.add_order(Order(2, 'buy', 100.0, 5, tif='GTT', ttl=1))
+    assert [tr.qty for tr in trades] == [2]
+    assert book.bids == [(100.0, 3, 2)]
+    book.advance_time(1)
+    assert book.bids == []
+
+
+def test_ioc_remainder_is_cancelled(book):
+    book.add_order(Order(1, 'sell', 100.0, 2))
+    trades = book.add_order(Order(2, 'buy', 100.5, 5, tif='IOC'))
+    assert [(tr.price, tr.qty) for tr in trades] == [(100.25, 2)]
+    assert book.best_bid() is None
+    assert book.live_orders == 0
+
+    assert book.add_order(Order(3, 'buy', 99.0, 1, tif='IOC')) == []
+    assert book.live_orders == 0
+
+
+def test_day_orders_roll_off_at_the_day_boundary(book):
+    book.advance_time(3)
+    book.add_order(Order(1, 'buy', 99.0, 1, tif='DAY'))
+    book.advance_time(9)
+    assert book.best_bid() == 99.0
+    book.advance_time(10)
+    assert book.best_bid() is None
+
+    # placed on the boundary, it lives for the whole next day
+    book.add_order(Order(2, 'sell', 101.0, 1, tif='DAY'))
+    book.advance_time(19)
+    assert book.best_ask() == 101.0
+    book.advance_time(20)
+    assert book.best_ask() is None
+
+
+def test_expiry_survives_clock_jumps(book):
+    book.add_order(Order(1, 'buy', 99.0, 1, ttl=5))
+    book.add_order(Order(2, 'buy', 98.0, 1, ttl=500))
+    book.advance_time(100)
+    assert book.bids == [(98.0, 1, 2)]
+    book.advance_time(1000)
+    assert book.bids == []
+
+
+def test_cancelled_order_is_not_expired_twice(book):
+    book.add_order(Order(1, 'buy', 99.0, 1, ttl=2))
+    book.add_order(Order(2, 'buy', 98.0, 1))
+    book.cancel_orders_for_agent(1)
+    book.advance_time(2)
+    assert book.live_orders == 1
+    assert book.bids == [(98.0, 1, 2)]
+
+
+@pytest.mark.parametrize("order", [
+    Order(1, 'buy', 99.0, 1, tif='GTT'),
+    Order(1, 'buy', 99.0, 1, tif='GTT', ttl=0),
+    Order(1, 'buy', 99.0, 1, tif='FOK'),
+])
+@pytest.mark.parametrize("match", [True, False])
+def test_bad_time_in_force_is_rejected_without_side_effects(book, order, match):
+    book.add_order(Order(2, 'sell', 99.0, 1))
+    with pytest.raises(ValueError):
+        book.add_order(order, match=match)
+    assert book.live_orders == 1
+    assert book.bids == []
+    assert book.trades == []
+    assert book.uncross() == []
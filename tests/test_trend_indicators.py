@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from environment.trend_indicators import TrendIndicator, TrendIndicators
+
+
+def windowed_stats(window):
+    # what TrendTrader used to compute from its own deque of mids
+    prices = np.array(window)
+    logp = np.log(prices)
+    slope = np.polyfit(np.arange(len(logp)), logp, 1)[0] if len(logp) >= 2 else 0.0
+    ret = np.diff(logp)
+    vol = np.std(ret) if len(ret) > 1 else 0.0
+    atr = np.mean(np.abs(np.diff(prices))) if len(prices) >= 20 else None
+    if len(prices) < 10 or vol == 0:
+        trend = 0
+    else:
+        trend = slope / vol
+    return slope, vol, trend, (atr if atr else None)
+
+
+def mids(seed, n=2000):
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(0.002 * rng.standard_normal(n) + 0.0002))
+    prices = np.round(prices, 2)
+    prices[500:650] = prices[500]      # a flat stretch longer than the windows
+    return prices.tolist()
+
+
+@pytest.mark.parametrize("lookback", [2, 10, 50, 120])
+def test_indicator_matches_polyfit_and_std(lookback):
+    prices = mids(lookback)
+    indicator = TrendIndicator(lookback)
+    for t, p in enumerate(prices):
+        indicator.update(p)
+        window = prices[max(0, t + 1 - lookback):t + 1]
+        slope, vol, trend, atr = windowed_stats(window)
+        assert len(indicator) == len(window)
+        assert indicator.slope() == pytest.approx(slope, rel=1e-6, abs=1e-12)
+        assert indicator.return_vol() == pytest.approx(vol, rel=1e-6, abs=1e-12)
+        assert indicator.atr() == (None if atr is None else pytest.approx(atr, rel=1e-9))
+        if trend == 0:
+            assert indicator.trend() == 0
+        else:
+            assert indicator.trend() == pytest.approx(trend, rel=1e-5)
+
+
+def test_flat_window_has_no_trend_or_atr():
+    indicator = TrendIndicator(30)
+    for _ in range(40):
+        indicator.update(101.25)
+    assert indicator.slope() == pytest.approx(0.0, abs=1e-12)
+    assert indicator.return_vol() == 0.0
+    assert indicator.trend() == 0
+    assert indicator.atr() is None
+
+
+def test_indicators_are_shared_per_lookback():
+    indicators = TrendIndicators()
+    a = indicators.subscribe(20)
+    assert indicators.subscribe(20) is a
+    b = indicators.subscribe(50)
+    for p in mids(7):
+        indicators.update(p)
+    assert (len(a), len(b)) == (20, 50)
@@ -0,0 +1,100 @@
+import math
+import numpy as np
+import pytest
+from utils.vol_utils import EwmaVol, RollingMean, RollingRealisedVol, realised_vol_last, rolling_mean
+
+
+def windowed_realised_vol(prices, lookback=200, annualization=252):
+    # the original from-scratch formula the trackers replace
+    n = len(prices)
+    if n < 3:
+        return None
+    rets = []
+    for i in range(max(1, n - lookback), n):
+        p0, p1 = prices[i - 1], prices[i]
+        if p0 is None or p1 is None or p0 <= 0 or p1 <= 0:
+            continue
+        rets.append(math.log(p1 / p0))
+    if len(rets) < 2:
+        return None
+    return float(np.std(rets, ddof=1)) * math.sqrt(annualization)
+
+
+def windowed_mean(series, window=200):
+    out = [None] * len(series)
+    for t in range(len(series)):
+        vals = [x for x in series[max(0, t - window + 1):t + 1] if x is not None]
+        if vals:
+            out[t] = sum(vals) / len(vals)
+    return out
+
+
+def price_path(seed, n=1500, gaps=True):
+    rng = np.random.default_rng(seed)
+    prices = (100 * np.exp(np.cumsum(0.01 * rng.standard_normal(n)))).tolist()
+    if gaps:
+        # missing and bad prints the trackers must skip
+        for i in rng.choice(n, n // 20, replace=False):
+            prices[i] = None if rng.random() < 0.5 else 0.0
+    return prices
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+@pytest.mark.parametrize("lookback", [2, 20, 200])
+def test_rolling_realised_vol_matches_windowed_formula(seed, lookback):
+    prices = price_path(seed)
+    got = RollingRealisedVol(lookback).series(prices)
+    for t in range(len(prices)):
+        want = windowed_realised_vol(prices[:t + 1], lookback)
+        if want is None:
+            assert got[t] is None
+        else:
+            assert got[t] == pytest.approx(want, rel=1e-9)
+
+
+def test_realised_vol_last_matches_windowed_formula():
+    prices = price_path(3)
+    for n in (0, 2, 3, 50, 201, 1500):
+        want = windowed_realised_vol(prices[:n])
+        got = realised_vol_last(prices[:n])
+        assert got == (None if want is None else pytest.approx(want, rel=1e-9))
+
+
+def test_realised_vol_of_a_flat_series_is_zero():
+    assert RollingRealisedVol(10).series([50.0] * 30)[-1] == 0.0
+
+
+@pytest.mark.parametrize("window", [1, 7, 200])
+def test_rolling_mean_matches_windowed_mean(window):
+    rng = np.random.default_rng(4)
+    series = [None if rng.random() < 0.1 else float(x) for x in rng.normal(0.2, 0.05, 1000)]
+    series[100:130] = [None] * 30
+    got = RollingMean(window).series(series)
+    want = windowed_mean(series, window)
+    assert rolling_mean(series, window) == got
+    for g, w in zip(got, want):
+        assert g == (None if w is None else pytest.approx(w, rel=1e-9))
+
+
+def test_rolling_mean_skips_nan():
+    assert RollingMean(3).series([1.0, float('nan'), 3.0]) == [1.0, 1.0, 2.0]
+
+
+@pytest.mark.parametrize("lam", [0.94, 0.5])
+def test_ewma_vol_matches_recursion(lam):
+    prices = price_path(5, n=500)
+    got = EwmaVol(lam).series(prices)
+
+    var = None
+    n_returns = 0
+    value = None
+    last = None
+    for t, p in enumerate(prices):
+        if last is not None and p is not None and last > 0 and p > 0:
+            r = math.log(p / last)
+            var = r * r if var is None else lam * var + (1 - lam) * r * r
+            n_returns += 1
+            if n_returns >= 2:
+                value = math.sqrt(var * 252)
+        last = p
+        assert got[t] == (None if value is None else pytest.approx(value, rel=1e-12))
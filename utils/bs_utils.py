@@ -1,5 +1,13 @@
 import math
-from scipy.stats import norm
+import numpy as np
+from scipy.special import ndtr
+
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+_INV_SQRT_2 = 1.0 / math.sqrt(2.0)
+
+
+def _pdf(x):
+    return _INV_SQRT_2PI * math.exp(-0.5 * x * x)
 
 def d1(S, K, r, q, sigma, T):
     return (math.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * math.sqrt(T))
@@ -22,9 +30,15 @@ def bs_price(S, K, r, q, sigma, T, option_type='call'):
     D1 = d1(S, K, r, q, sigma, T)
     D2 = D1 - sigma * math.sqrt(T)
     if option_type == 'call':
-        return S * math.exp(-q*T) * norm.cdf(D1) - K * math.exp(-r*T) * norm.cdf(D2)
+        return S * math.exp(-q*T) * ndtr(D1) - K * math.exp(-r*T) * ndtr(D2)
     else:
-        return K * math.exp(-r*T) * norm.cdf(-D2) - S * math.exp(-q*T) * norm.cdf(-D1)
+        return K * math.exp(-r*T) * ndtr(-D2) - S * math.exp(-q*T) * ndtr(-D1)
+
+def _in_the_money_forward(S, K, r, q, T, option_type):
+    # the zero-vol limit of N(d1) and N(d2) (N(-d1), N(-d2) for puts): 1 when
+    # the discounted forward is strictly in the money, else 0
+    fwd, strike = S * math.exp(-q*T), K * math.exp(-r*T)
+    return 1.0 if (fwd > strike if option_type == 'call' else fwd < strike) else 0.0
 
 def bs_delta(S, K, r, q, sigma, T, option_type='call'):
     if T <= 0:
@@ -32,38 +46,116 @@ def bs_delta(S, K, r, q, sigma, T, option_type='call'):
             return 1.0 if S > K else 0.0
         else:
             return -1.0 if S < K else 0.0
+    if sigma <= 0:
+        itm = _in_the_money_forward(S, K, r, q, T, option_type)
+        return math.exp(-q*T) * (itm if option_type == 'call' else -itm)
     D1 = d1(S, K, r, q, sigma, T)
     if option_type == 'call':
-        return math.exp(-q*T) * norm.cdf(D1)
+        return math.exp(-q*T) * ndtr(D1)
     else:
-        return math.exp(-q*T) * (norm.cdf(D1) - 1.0)
+        return math.exp(-q*T) * (ndtr(D1) - 1.0)
 
 def bs_vega(S, K, r, q, sigma, T):
     if T <= 0 or sigma <= 0:
         return 0.0
     D1 = d1(S, K, r, q, sigma, T)
-    return S * math.exp(-q*T) * norm.pdf(D1) * math.sqrt(T)
+    return S * math.exp(-q*T) * _pdf(D1) * math.sqrt(T)
 
 def bs_gamma(S, K, r, q, sigma, T):
     if T <= 0 or sigma <= 0:
         return 0.0
     D1 = d1(S, K, r, q, sigma, T)
-    return math.exp(-q*T) * norm.pdf(D1) / (S * sigma * math.sqrt(T))
+    return math.exp(-q*T) * _pdf(D1) / (S * sigma * math.sqrt(T))
 
 def bs_theta(S, K, r, q, sigma, T, option_type='call'):
     if T <= 0:
         return 0.0
+    if sigma <= 0:
+        # the sigma -> 0 limit: the pdf term vanishes
+        itm = _in_the_money_forward(S, K, r, q, T, option_type)
+        return itm * (q * S * math.exp(-q*T) - r * K * math.exp(-r*T))
     D1 = d1(S, K, r, q, sigma, T)
     D2 = D1 - sigma * math.sqrt(T)
-    term1 = - (S * norm.pdf(D1) * sigma * math.exp(-q*T)) / (2 * math.sqrt(T))
+    term1 = - (S * _pdf(D1) * sigma * math.exp(-q*T)) / (2 * math.sqrt(T))
     if option_type == 'call':
-        term2 = q * S * norm.cdf(D1) * math.exp(-q*T)
-        term3 = - r * K * math.exp(-r*T) * norm.cdf(D2)
+        term2 = q * S * ndtr(D1) * math.exp(-q*T)
+        term3 = - r * K * math.exp(-r*T) * ndtr(D2)
     else:
-        term2 = q * S * math.exp(-q*T) * norm.cdf(-D1)
-        term3 = - r * K * math.exp(-r*T) * norm.cdf(-D2)
+        term2 = q * S * math.exp(-q*T) * ndtr(-D1)
+        term3 = - r * K * math.exp(-r*T) * ndtr(-D2)
     return term1 + term2 + term3
 
+def _is_call(option_type):
+    if isinstance(option_type, str):
+        return option_type == 'call'
+    option_type = np.asarray(option_type)
+    if option_type.dtype.kind in 'US':
+        return option_type == 'call'
+    return option_type.astype(bool)
+
+
+def bs_greeks_vec(S, K, r, q, sigma, T, option_type='call'):
+    # whole-chain pricing: every argument broadcasts, option_type may be a
+    # string or an array of 'call'/'put' (or booleans, True = call).
+    # Expired (T <= 0) legs get the payoff and its step delta; zero-vol legs
+    # the sigma -> 0 limits (discounted forward intrinsic value, delta and
+    # theta from the forward's moneyness, zero gamma and vega), as the
+    # scalar functions above do.
+    S, K, r, q, sigma, T, is_call = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (S, K, r, q, sigma, T)), _is_call(option_type))
+
+    live = (T > 0) & (sigma > 0)
+    T_ = np.where(T > 0, T, 1.0)
+    sig_ = np.where(live, sigma, 1.0)
+    sqrt_t = np.sqrt(T_)
+    df_q = np.exp(-q * T_)
+    df_r = np.exp(-r * T_)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        D1 = (np.log(S / K) + (r - q + 0.5 * sig_ ** 2) * T_) / (sig_ * sqrt_t)
+        gamma_scale = 1.0 / (S * sig_ * sqrt_t)
+    D2 = D1 - sig_ * sqrt_t
+    N1 = ndtr(D1)
+    N2 = ndtr(D2)
+    Nm1 = ndtr(-D1)
+    Nm2 = ndtr(-D2)
+    n1 = np.exp(-0.5 * D1 * D1) * _INV_SQRT_2PI
+
+    call = S * df_q * N1 - K * df_r * N2
+    put = K * df_r * Nm2 - S * df_q * Nm1
+    price = np.where(is_call, call, put)
+    delta = np.where(is_call, df_q * N1, df_q * (N1 - 1.0))
+    gamma = df_q * n1 * gamma_scale
+    vega = S * df_q * n1 * sqrt_t
+    term1 = -(S * n1 * sig_ * df_q) / (2 * sqrt_t)
+    theta = np.where(is_call,
+                     term1 + q * S * N1 * df_q - r * K * df_r * N2,
+                     term1 + q * S * df_q * Nm1 - r * K * df_r * Nm2)
+
+    expired = T <= 0
+    flat = ~expired & ~live
+    intrinsic = np.where(is_call, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+    forward = np.where(is_call, np.maximum(S * df_q - K * df_r, 0.0), np.maximum(K * df_r - S * df_q, 0.0))
+    price = np.where(expired, intrinsic, np.where(flat, forward, price))
+    itm_fwd = np.where(is_call, S * df_q > K * df_r, S * df_q < K * df_r)
+    delta = np.where(flat, np.where(is_call, df_q, -df_q) * itm_fwd, delta)
+    delta = np.where(expired, np.where(is_call, (S > K).astype(float), -(S < K).astype(float)), delta)
+    gamma = np.where(live, gamma, 0.0)
+    vega = np.where(live, vega, 0.0)
+    theta = np.where(flat, itm_fwd * (q * S * df_q - r * K * df_r), theta)
+    theta = np.where(expired, 0.0, theta)
+
+    return {'price': price, 'delta': delta, 'gamma': gamma, 'vega': vega, 'theta': theta}
+
+
+def bs_price_vec(S, K, r, q, sigma, T, option_type='call'):
+    return bs_greeks_vec(S, K, r, q, sigma, T, option_type)['price']
+
+
+def bs_delta_vec(S, K, r, q, sigma, T, option_type='call'):
+    return bs_greeks_vec(S, K, r, q, sigma, T, option_type)['delta']
+
+
 def implied_volatility(price, S, K, r, q, T, option_type='call',
                        sigma_low=1e-4, sigma_high=5.0, tol=1e-6, max_iter=100):
     if price is None or price <= 0 or S <= 0 or K <= 0:
@@ -83,45 +175,213 @@ def implied_volatility(price, S, K, r, q, T, option_type='call',
             lo = mid
     return 0.5 * (lo + hi)
 
-# что б безопасно было считать mean
-def safe_mean(values):
-    xs = []
-    for v in values:
-        if v is None:
-            continue
-        try:
-            if isinstance(v, float) and math.isnan(v):
-                continue
-        except Exception:
+def chain_snapshot(S, strikes, r, q, sigma, T):
+    # theoretical prices and deltas for every (K, option_type) of a chain
+    g = bs_greeks_vec(S, np.asarray(strikes, dtype=float)[:, None], r, q, sigma, T, np.array(['call', 'put']))
+    theo = {}
+    delta = {}
+    for i, K in enumerate(strikes):
+        for j, option_type in enumerate(('call', 'put')):
+            theo[(K, option_type)] = float(g['price'][i, j])
+            delta[(K, option_type)] = float(g['delta'][i, j])
+    return {'spot': S, 'vol': sigma, 'theo': theo, 'delta': delta}
+
+
+def _price_vega_volga(fwd_s, disc_k, sigma, sqrt_t, is_call):
+    sig_t = sigma * sqrt_t
+    D1 = np.log(fwd_s / disc_k) / sig_t + 0.5 * sig_t
+    D2 = D1 - sig_t
+    call = fwd_s * ndtr(D1) - disc_k * ndtr(D2)
+    price = np.where(is_call, call, call - fwd_s + disc_k)
+    vega = fwd_s * np.exp(-0.5 * D1 * D1) * _INV_SQRT_2PI * sqrt_t
+    return price, vega, vega * D1 * D2 / sigma
+
+
+def _halley_iv(p, fwd_s, disc_k, sqrt_t, is_call, sigma0, sigma_low, sigma_high, tol, max_iter):
+    lo = np.full(p.shape, float(sigma_low))
+    hi = np.full(p.shape, float(sigma_high))
+    bounds = _price_vega_volga(fwd_s, disc_k, np.stack((lo, hi)), sqrt_t, is_call)[0]
+    below = p <= bounds[0]
+    above = p >= bounds[1]
+
+    # Corrado-Miller on the call price (puts through parity)
+    c = np.where(is_call, p, p + fwd_s - disc_k)
+    a = c - 0.5 * (fwd_s - disc_k)
+    root = np.sqrt(np.maximum(a * a - (fwd_s - disc_k) ** 2 / np.pi, 0.0))
+    guess = np.sqrt(2 * np.pi) / (sqrt_t * (fwd_s + disc_k)) * (a + root)
+    if sigma0 is not None:
+        guess = np.where(np.isfinite(sigma0), sigma0, guess)
+    sigma = np.clip(np.where(np.isfinite(guess) & (guess > 0), guess, 0.2), lo, hi)
+
+    active = ~(below | above)
+    for _ in range(max_iter):
+        model, vega, volga = _price_vega_volga(fwd_s, disc_k, sigma, sqrt_t, is_call)
+        f = model - p
+        active &= np.abs(f) >= tol
+        if not active.any():
+            break
+        lo = np.where(active & (f < 0), sigma, lo)
+        hi = np.where(active & (f > 0), sigma, hi)
+
+        newton = f / vega
+        # Halley correction; drop back to Newton where it is unreliable
+        # (tiny vega far from the root), the bracket catches the rest
+        corr = 1.0 - 0.5 * newton * volga / vega
+        nxt = sigma - newton / np.where((corr > 0.5) & (corr < 2.0), corr, 1.0)
+        bad = ~np.isfinite(nxt) | (nxt <= lo) | (nxt >= hi)
+        nxt = np.where(bad, 0.5 * (lo + hi), nxt)
+        sigma = np.where(active, nxt, sigma)
+
+    return np.where(below, lo, np.where(above, hi, sigma))
+
+
+def _halley_iv_scalar(p, fwd_s, disc_k, sqrt_t, is_call, sigma0, lo, hi, tol, max_iter):
+    # same iteration as _halley_iv on plain floats; per-element NumPy
+    # overhead dominates for a handful of strikes
+    def price_vega_volga(sigma):
+        sig_t = sigma * sqrt_t
+        D1 = math.log(fwd_s / disc_k) / sig_t + 0.5 * sig_t
+        D2 = D1 - sig_t
+        call = fwd_s * 0.5 * math.erfc(-D1 * _INV_SQRT_2) - disc_k * 0.5 * math.erfc(-D2 * _INV_SQRT_2)
+        vega = fwd_s * _pdf(D1) * sqrt_t
+        return (call if is_call else call - fwd_s + disc_k), vega, vega * D1 * D2 / sigma
+
+    sigma_low, sigma_high = lo, hi
+    if sigma0 is not None and math.isfinite(sigma0):
+        sigma = sigma0
+    else:
+        c = p if is_call else p + fwd_s - disc_k
+        a = c - 0.5 * (fwd_s - disc_k)
+        root = math.sqrt(max(a * a - (fwd_s - disc_k) ** 2 / math.pi, 0.0))
+        sigma = math.sqrt(2 * math.pi) / (sqrt_t * (fwd_s + disc_k)) * (a + root)
+        if not sigma > 0:
+            sigma = 0.2
+    sigma = min(max(sigma, lo), hi)
+
+    for _ in range(max_iter):
+        model, vega, volga = price_vega_volga(sigma)
+        f = model - p
+        if abs(f) < tol:
+            return sigma
+        if f < 0:
+            lo = sigma
+        else:
+            hi = sigma
+        nxt = None
+        if vega > 0:
+            newton = f / vega
+            corr = 1.0 - 0.5 * newton * volga / vega
+            nxt = sigma - (newton / corr if 0.5 < corr < 2.0 else newton)
+        if nxt is None or not lo < nxt < hi:
+            nxt = 0.5 * (lo + hi)
+        sigma = nxt
+
+    # unattainable prices clamp to the bounds, like the bisection
+    if p <= price_vega_volga(sigma_low)[0]:
+        return sigma_low
+    if p >= price_vega_volga(sigma_high)[0]:
+        return sigma_high
+    return sigma
+
+
+def implied_volatility_vec(price, S, K, r, q, T, option_type='call', sigma0=None,
+                           sigma_low=1e-4, sigma_high=5.0, tol=1e-6, max_iter=20):
+    # Halley (Householder order 2) iterations from a Corrado-Miller guess, or
+    # from sigma0 when given (e.g. last step's IVs), safeguarded by a bracket
+    # that falls back to bisection. tol is on price, as in implied_volatility.
+    # Invalid inputs (None, non-positive) give NaN; prices outside
+    # [BS(sigma_low), BS(sigma_high)] clamp to the bound the bisection
+    # would converge to.
+    price, S, K, r, q, T, is_call = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (price, S, K, r, q, T)), _is_call(option_type))
+    with np.errstate(invalid='ignore'):
+        ok = (price > 0) & (S > 0) & (K > 0) & (T > 0)
+    out = np.full(price.shape, np.nan)
+    if not ok.any():
+        return out
+
+    T = T[ok]
+    if sigma0 is not None:
+        sigma0 = np.broadcast_to(np.asarray(sigma0, dtype=float), price.shape)[ok]
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        out[ok] = _halley_iv(price[ok], S[ok] * np.exp(-q[ok] * T), K[ok] * np.exp(-r[ok] * T), np.sqrt(T),
+                             is_call[ok], sigma0, sigma_low, sigma_high, tol, max_iter)
+    return out
+
+
+class ImpliedVolSolver:
+    # per-chain solver that warm-starts every call from the previous IVs;
+    # the chain layout and discount factors are fixed at construction.
+    # Chains smaller than vector_min options are solved element by element.
+    def __init__(self, strikes, r, q, T, tol=1e-6, max_iter=20, sigma_low=1e-4, sigma_high=5.0,
+                 vector_min=32):
+        self.strikes = list(strikes)
+        self.vector_min = vector_min
+        self.tol = tol
+        self.max_iter = max_iter
+        self.sigma_low = sigma_low
+        self.sigma_high = sigma_high
+        # rows are strikes, columns are (call, put)
+        K = np.repeat(np.asarray(self.strikes, dtype=float)[:, None], 2, axis=1)
+        self._disc_k = K * math.exp(-r * T)
+        self._df_q = math.exp(-q * T)
+        self._sqrt_t = math.sqrt(T) if T > 0 else None
+        self._is_call = np.tile(np.array([True, False]), (len(self.strikes), 1))
+        self.last = np.full(K.shape, np.nan)
+
+    def solve_arrays(self, S, call_prices, put_prices):
+        prices = np.array([[call_prices.get(K), put_prices.get(K)] for K in self.strikes], dtype=float)
+        iv = np.full(prices.shape, np.nan)
+        if self._sqrt_t is None or S is None or not S > 0:
             pass
-        xs.append(float(v))
-    return (sum(xs) / len(xs)) if xs else None
+        elif prices.size < self.vector_min:
+            fwd_s = S * self._df_q
+            for idx in zip(*np.nonzero(prices > 0)):
+                iv[idx] = _halley_iv_scalar(float(prices[idx]), fwd_s, float(self._disc_k[idx]), self._sqrt_t,
+                                            bool(self._is_call[idx]), float(self.last[idx]), self.sigma_low,
+                                            self.sigma_high, self.tol, self.max_iter)
+        else:
+            with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                ok = prices > 0
+                iv[ok] = _halley_iv(prices[ok], S * self._df_q, self._disc_k[ok], self._sqrt_t, self._is_call[ok],
+                                    self.last[ok], self.sigma_low, self.sigma_high, self.tol, self.max_iter)
+        self.last = iv
+        return iv[:, 0], iv[:, 1]
+
+    def solve(self, S, call_prices, put_prices):
+        iv_call, iv_put = self.solve_arrays(S, call_prices, put_prices)
+        return self._as_dict(iv_call), self._as_dict(iv_put)
+
+    def _as_dict(self, ivs):
+        return {K: (None if np.isnan(v) else float(v)) for K, v in zip(self.strikes, ivs)}
+
+
+def mean_abs_iv_change(iv_t, iv_prev):
+    # IV arrays of two steps in strike order; strikes where the solver failed
+    # (NaN) on either step are left out
+    diffs = np.abs(iv_t - iv_prev)
+    diffs = diffs[~np.isnan(diffs)]
+    return float(diffs.sum() / len(diffs)) if len(diffs) else None
+
+
+def _nanmean(values):
+    values = np.asarray(values, dtype=float)     # None -> NaN
+    values = values[~np.isnan(values)]
+    return float(values.mean()) if values.size else None
 
 
 def mean_realised_vol(rv_history):
-    return safe_mean(rv_history)
+    return _nanmean(rv_history)
 
 
 def mean_implied_vol_overall(iv_history):
-    vals = []
-    for step in iv_history:
-        if not step:
-            continue
-        for iv in step.values():
-            vals.append(iv)
-    return safe_mean(vals)
+    # iv_history: steps x strikes array, NaN where the solver failed
+    return _nanmean(iv_history)
 
 
 def mean_implied_vol_by_strike(iv_history, strikes):
-    out = {}
-    for K in strikes:
-        vals = []
-        for step in iv_history:
-            if step is None:
-                continue
-            vals.append(step.get(K))
-        out[K] = safe_mean(vals)
-    return out
+    iv = np.asarray(iv_history, dtype=float).reshape(-1, len(strikes))
+    return {K: _nanmean(iv[:, j]) for j, K in enumerate(strikes)}
 
 
 def iv_rv_summary(rv_history, iv_history_call, iv_history_put, strikes=None):
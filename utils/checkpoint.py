@@ -0,0 +1,36 @@
+import os
+import pickle
+
+# Simulation checkpoints: one pickle holding the markets, their agents and
+# any runner state passed in. Everything goes into a single dump so
+# references the objects share (books -> agents, trend indicators -> traders)
+# survive the round trip. Every stream an agent or process draws from is an
+# attribute of that object and the run's RNGManager one of its Market and
+# Simulation, so all random state is saved with them and restoring touches
+# nothing process-wide.
+# Loggers and open files are left out; callers reattach them after a restore.
+
+
+def dumps(**state):
+    return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def loads(blob):
+    # each call returns an independent copy, so one blob can seed many forks
+    return pickle.loads(blob)
+
+
+def save(path, **state):
+    # written next to the target and renamed, so a crash mid-write leaves the
+    # previous checkpoint intact
+    blob = dumps(**state)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(blob)
+    os.replace(tmp, path)
+    return len(blob)
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
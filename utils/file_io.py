@@ -1,5 +1,6 @@
 import csv
 import math
+import numpy as np
 
 def save_price_history(filename, price_history):
     with open(filename, 'w', newline='') as f:
@@ -105,6 +106,18 @@ def save_wide_series_csv(path, history, index_name="t"):
             row = [t] + [step.get(k, "") for k in keys]
             w.writerow(row)
 
+def save_columns_csv(path, data, columns, index_name="t"):
+    # steps x columns array (e.g. ColumnStore.array) in the same layout as
+    # save_wide_series_csv; NaN is written as an empty cell
+    data = np.asarray(data, dtype=float).reshape(-1, len(columns))
+    rows = data.tolist()
+    for i, j in zip(*np.nonzero(np.isnan(data))):
+        rows[i][j] = ""
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow([index_name] + list(columns))
+        w.writerows([t] + row for t, row in enumerate(rows))
+
 def load_wide_series_csv(path, index_name="t"):
     out = []
     with open(path, "r", newline="") as f:
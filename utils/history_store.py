@@ -0,0 +1,51 @@
+import numpy as np
+
+# Per-step histories as preallocated float64 arrays: one row per step, one
+# column per series (e.g. per strike), NaN where a value is missing. The
+# buffer doubles when full, so appending stays amortised O(columns).
+
+
+class ColumnStore:
+    def __init__(self, columns, capacity=1024):
+        self.columns = list(columns)
+        self._col = {c: j for j, c in enumerate(self.columns)}
+        self._data = np.full((max(capacity, 1), len(self.columns)), np.nan)
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def _grow(self):
+        data = np.full((2 * len(self._data), len(self.columns)), np.nan)
+        data[:self.n] = self._data[:self.n]
+        self._data = data
+
+    def append(self, row):
+        # row: sequence or array in column order, NaN (or None) for missing
+        if self.n == len(self._data):
+            self._grow()
+        self._data[self.n] = row
+        self.n += 1
+
+    def append_dict(self, values):
+        # {column: value}; absent keys and None become NaN
+        self.append([np.nan if values.get(c) is None else values[c] for c in self.columns])
+
+    @property
+    def array(self):
+        # steps x columns view of the filled rows
+        return self._data[:self.n]
+
+    def column(self, name):
+        return self._data[:self.n, self._col[name]]
+
+    def __getstate__(self):
+        # pickles (checkpoints) carry the filled rows only
+        state = self.__dict__.copy()
+        state['_data'] = self._data[:self.n].copy()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if not len(self._data):
+            self._data = np.full((1, len(self.columns)), np.nan)
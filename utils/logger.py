@@ -1,92 +1,231 @@
+import atexit
 import csv
-from datetime import datetime
 import os
+import queue
+import threading
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+LEVELS = {'debug': DEBUG, 'info': INFO, 'warning': WARNING}
+
+# categories used by the markets: 'event', 'fundamental', 'news', 'mid',
+# 'order', 'option_order', 'trade', 'option_trade'
+
+OPTION_TRADE_HEADER = ["time", "price", "qty", "buyer", "seller", "instrument", "strike", "option_type"]
+
+
+def _render(fmt, args):
+    # records keep the format and its arguments; the string is only built
+    # when the record is written or echoed
+    if callable(fmt):
+        return fmt(*args)
+    return fmt % args if args else fmt
+
+
+def _format_order(t, trader_type, agent_id, side, price, qty, inventory, trend):
+    inv_str = f" inv={inventory}" if inventory is not None else ""
+    trend_str = f" trend={trend:+.4f}" if trend is not None else ""
+    return f"[ORDER t={t}] {trader_type}({agent_id}) {side} p={price:.4f} qty={qty}{inv_str}{trend_str}"
+
+
+def _format_option_order(t, trader_type, agent_id, side, price, qty, strike, order_type, option_type):
+    return (f"[OPTION ORDER t={t}] {trader_type}({agent_id}) "
+            f"{side} p={price:.4f} qty={qty} "
+            f"K={strike} "
+            f"order_type={order_type} option_type={option_type}")
 
 
 class Logger:
+    # Events and trade rows are buffered in memory and written in batches to
+    # file handles that stay open; with background=True batches are handed to
+    # a writer thread. A file set to None is not written (trades_file=None
+    # also drops the option trades file). Files are opened on their first
+    # write, and close() is registered to run at exit only once something has
+    # been logged, so unused loggers hold no files and can be collected. The
+    # option trades file is rewritten once per logger: on its first write,
+    # or at close() when the logger was used but saw no option trades.
+    # Calls below `level` or outside `categories` (None means all) return
+    # before building anything; callers in hot loops can hoist is_enabled()
+    # out of the loop.
     def __init__(self, trades_file="logs/trades.csv",
                  events_file="logs/events.log",
-                 enable_console=True):
+                 enable_console=True,
+                 level=DEBUG,
+                 categories=None,
+                 buffer_size=4096,
+                 background=False):
         self.trades_file = trades_file
         self.events_file = events_file
+        self.option_trades_file = trades_file.replace(".csv", "_options.csv") if trades_file else None
         self.enable_console = enable_console
-        os.makedirs(os.path.dirname(self.trades_file), exist_ok=True)
-
-        with open(self.trades_file.replace(".csv", "_options.csv"), "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["time", "price", "qty", "buyer", "seller", "instrument", "strike", "option_type"])
-
-    def log(self, message: str):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-
-        with open(self.events_file, "a") as f:
-            f.write(f"[{timestamp}] {message}\n")
-
-        if self.enable_console:
-            print(f"[{timestamp}] {message}")
+        self.level = LEVELS.get(level, level)
+        self.categories = None if categories is None else frozenset(categories)
+        self.buffer_size = buffer_size
+
+        self._events = []
+        self._trades = []
+        self._option_trades = []
+        self._pending = 0
+        self._files = {}
+        self._opened = set()        # paths this logger has opened, so "w" truncates once
+        self._clock = (None, "")
+        self._at_exit = False
+        self._used = False
+
+        self._queue = None
+        self._writer = None
+        if background:
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(target=self._drain, name="logger-writer", daemon=True)
+            self._writer.start()
+
+    def is_enabled(self, level, category=None):
+        return level >= self.level and (self.categories is None or category in self.categories)
+
+    def log(self, message, *args, level=INFO, category='event'):
+        if level < self.level or (self.categories is not None and category not in self.categories):
+            return
+        self._event(message, args)
 
     def log_trade(self, t, trade):
-        with open(self.trades_file, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                t,
-                trade["price"],
-                trade["qty"],
-                trade["buyer"],
-                trade["seller"]
-            ])
+        if not self.is_enabled(INFO, 'trade'):
+            return
+        row = [t, trade["price"], trade["qty"], trade["buyer"], trade["seller"]]
+        self._trades.append(row)
 
         if self.enable_console:
             print(f"[TRADE t={t}] "
-                  f"{trade['buyer']} -> {trade['seller']} | "
-                  f"qty={trade['qty']} price={trade['price']:.2f}")
+                  f"{row[3]} -> {row[4]} | "
+                  f"qty={row[2]} price={row[1]:.2f}")
+        self._count()
 
     def log_news(self, t, news):
-        self.log(f"[NEWS t={t}] news={news:.3f}")
+        self.log("[NEWS t=%s] news=%.3f", t, news, level=DEBUG, category='news')
 
     def log_mid_price(self, t, mid):
-        self.log(f"[MID t={t}] mid_price={mid:.2f}")
+        self.log("[MID t=%s] mid_price=%.2f", t, mid, level=DEBUG, category='mid')
 
     def log_order(self, t, order, agent=None):
+        if not self.is_enabled(DEBUG, 'order'):
+            return
         trader_type = agent.__class__.__name__ if agent is not None else "Unknown"
-
-        inventory = getattr(agent, 'inventory', None)
-        inv_str = f" inv={inventory}" if inventory is not None else ""
-
-        trend = getattr(agent, 'last_trend', None)
-        trend_str = f" trend={trend:+.4f}" if trend is not None else ""
-
-        self.log(
-            f"[ORDER t={t}] "
-            f"{trader_type}({order['agent_id']}) {order['side']} "
-            f"p={order['price']:.4f} qty={order['qty']}{inv_str}{trend_str}"
-        )
+        self._event(_format_order, (t, trader_type, order['agent_id'], order['side'], order['price'], order['qty'],
+                                    getattr(agent, 'inventory', None), getattr(agent, 'last_trend', None)))
 
     def log_option_trade(self, t, trade):
-        with open(self.trades_file.replace(".csv", "_options.csv"), "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                t,
-                trade.get("price", 0),
-                trade.get("qty", 0),
-                trade.get("buyer", ""),
-                trade.get("seller", ""),
-                trade.get("instrument", ""),
-                trade.get("strike", ""),
-                trade.get("option_type", "")
-            ])
+        if not self.is_enabled(INFO, 'option_trade'):
+            return
+        row = [t,
+               trade.get("price", 0),
+               trade.get("qty", 0),
+               trade.get("buyer", ""),
+               trade.get("seller", ""),
+               trade.get("instrument", ""),
+               trade.get("strike", ""),
+               trade.get("option_type", "")]
+        self._option_trades.append(row)
 
         if self.enable_console:
             print(f"[OPTION TRADE t={t}] "
                   f"{trade.get('buyer')} -> {trade.get('seller')} | "
                   f"{trade.get('instrument')} {trade.get('option_type')} "
                   f"K={trade.get('strike')} qty={trade.get('qty')} price={trade.get('price'):.2f}")
+        self._count()
 
     def log_option_order(self, t, order, agent=None):
+        if not self.is_enabled(DEBUG, 'option_order'):
+            return
         trader_type = agent.__class__.__name__ if agent else "Unknown"
-        self.log(
-            f"[OPTION ORDER t={t}] {trader_type}({order['agent_id']}) "
-            f"{order['side']} p={order['price']:.4f} qty={order['qty']} "
-            f"K={order.get('strike')} "
-            f"order_type={order.get('order_type')} option_type={order.get('option_type')}"
-        )
+        self._event(_format_option_order, (t, trader_type, order['agent_id'], order['side'], order['price'],
+                                           order['qty'], order.get('strike'), order.get('order_type'),
+                                           order.get('option_type')))
+
+    def _event(self, fmt, args):
+        ts = time.time()
+        self._events.append((ts, fmt, args))
+        if self.enable_console:
+            print(f"[{self._timestamp(ts)}] {_render(fmt, args)}")
+        self._count()
+
+    def _count(self):
+        if not self._at_exit:
+            atexit.register(self.close)
+            self._at_exit = True
+            self._used = True
+        self._pending += 1
+        if self._pending >= self.buffer_size:
+            self.flush()
+
+    def _timestamp(self, ts):
+        second = int(ts)
+        if self._clock[0] != second:
+            self._clock = (second, time.strftime("%H:%M:%S", time.localtime(second)))
+        return self._clock[1]
+
+    def flush(self):
+        batch = (self._events, self._trades, self._option_trades)
+        self._events, self._trades, self._option_trades = [], [], []
+        self._pending = 0
+        if self._queue is not None:
+            self._queue.put(batch)
+        else:
+            self._write(batch)
+
+    def _handle(self, path, mode="a", header=None):
+        f = self._files.get(path)
+        if f is None:
+            if path in self._opened:
+                # reopened after close(): keep what this logger wrote
+                mode, header = "a", None
+            elif os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            f = self._files[path] = open(path, mode, newline="")
+            self._opened.add(path)
+            if header is not None:
+                csv.writer(f).writerow(header)
+        return f
+
+    def _write(self, batch):
+        events, trades, option_trades = batch
+        if events and self.events_file:
+            stamp = self._timestamp
+            self._handle(self.events_file).write(
+                "".join(f"[{stamp(ts)}] {_render(fmt, args)}\n" for ts, fmt, args in events))
+        if trades and self.trades_file:
+            csv.writer(self._handle(self.trades_file)).writerows(trades)
+        if option_trades and self.option_trades_file:
+            f = self._handle(self.option_trades_file, "w", header=OPTION_TRADE_HEADER)
+            csv.writer(f).writerows(option_trades)
+
+    def _drain(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            self._write(batch)
+
+    def close(self):
+        # flushes and releases the files; also runs at interpreter exit
+        self.flush()
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+            self._queue = None
+        if self._used and self.option_trades_file and self.option_trades_file not in self._opened:
+            # a run without option trades still replaces the previous run's file
+            self._handle(self.option_trades_file, "w", header=OPTION_TRADE_HEADER)
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        if self._at_exit:
+            atexit.unregister(self.close)
+            self._at_exit = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
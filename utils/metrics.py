@@ -1,117 +1,123 @@
-import config as cfg
+import os
+import numpy as np
 import scipy.stats as stats
-from agents.noise_trader import NoiseTrader
-from agents.market_maker import MarketMaker
-from agents.informed_trader import InformedTrader
-from agents.fundamental import FundamentalTrader
-from agents.trend_trader import TrendTrader
-from environment.market import Market
-from environment.options_market import OptionsMarket
-from agents.options_market_maker import OptionsMarketMaker
-from agents.options_noise_trader import OptionsNoiseTrader
-from agents.options_arbitrageur import OptionsArbitrageur
-from utils.vol_utils import realised_vol_last
+from concurrent.futures import ProcessPoolExecutor
+from environment.simulation import Simulation
 from utils import bs_utils
-
-
-def compute_iv_roughness(iv_history_call, iv_history_put, strikes):
-    roughness_call = []
-    roughness_put = []
-    for t in range(1, len(iv_history_call)):
-        r_call = sum(abs(iv_history_call[t][K] - iv_history_call[t-1][K]) for K in strikes) / len(strikes)
-        r_put = sum(abs(iv_history_put[t][K] - iv_history_put[t-1][K]) for K in strikes) / len(strikes)
-        roughness_call.append(r_call)
-        roughness_put.append(r_put)
+from utils.sinks import HistorySink, TradeCountSink, RoughnessSink
+from sim_config import SimConfig
+from utils.warmup_cache import WarmupCache
+from utils.logger import Logger
+
+def _roughness_series(iv_history):
+    # per-step mean absolute IV change across strikes, for a steps x strikes
+    # array; NaN pairs are left out and steps with none valid are dropped
+    iv = np.asarray(iv_history, dtype=float)
+    if len(iv) < 2:
+        return []
+    diffs = np.abs(np.diff(iv, axis=0))
+    valid = ~np.isnan(diffs)
+    n = valid.sum(axis=1)
+    total = np.where(valid, diffs, 0.0).sum(axis=1)
+    return (total[n > 0] / n[n > 0]).tolist()
+
+
+def compute_iv_roughness(iv_history_call, iv_history_put):
+    roughness_call = _roughness_series(iv_history_call)
+    roughness_put = _roughness_series(iv_history_put)
     avg_rough_call = sum(roughness_call)/len(roughness_call) if roughness_call else 0
     avg_rough_put = sum(roughness_put)/len(roughness_put) if roughness_put else 0
     return avg_rough_call, avg_rough_put, roughness_call, roughness_put
 
 
-
-def run_simulation(include_arbitrage=True):
-    agents = []
-    for i in range(cfg.NUM_NOISE_TRADERS):
-        agents.append(NoiseTrader(id=i+1, noise_level=cfg.NOISE_TRADER_NOISE_LEVEL))
-    for i in range(cfg.NUM_MARKET_MAKERS):
-        agents.append(MarketMaker(
-            id=cfg.NUM_NOISE_TRADERS + i + 1,
-            base_spread=cfg.MM_BASE_SPREAD,
-            inventory_risk_aversion=cfg.MM_INV_RISK,
-            max_inventory=cfg.MM_MAX_INVENTORY,
-            base_size=cfg.MM_BASE_SIZE
-        ))
-    for i in range(cfg.NUM_INFORMED_TRADERS):
-        agents.append(InformedTrader(
-            id=cfg.NUM_NOISE_TRADERS + cfg.NUM_MARKET_MAKERS + i + 1,
-            sensitivity=cfg.INFORMED_TRADER_SENSITIVITY,
-            aggressiveness=cfg.INFORMED_TRADER_AGGRESSIVENESS
-        ))
-    for i in range(cfg.NUM_TREND_TRADERS):
-        agents.append(TrendTrader(
-            id=cfg.NUM_NOISE_TRADERS + cfg.NUM_MARKET_MAKERS + cfg.NUM_INFORMED_TRADERS + i + 1
-        ))
-    for i in range(cfg.NUM_FUNDAMENTAL_TRADERS):
-        agents.append(FundamentalTrader(
-            id=cfg.NUM_NOISE_TRADERS + cfg.NUM_MARKET_MAKERS + cfg.NUM_INFORMED_TRADERS + cfg.NUM_TREND_TRADERS + i + 1,
-            fundamental_price=cfg.INITIAL_PRICE,
-            aggressiveness=cfg.FUNDAMENTAL_TRADER_AGGRESSIVENESS
-        ))
-
-    market = Market(initial_price=cfg.INITIAL_PRICE)
-    market.set_agents(agents)
-
-    options_market = OptionsMarket(
-        strikes=cfg.OPTION_STRIKES,
-        tau=cfg.OPTION_TAU,
-        r=cfg.OPTION_R,
-        q=cfg.OPTION_Q,
-        vol=cfg.OPTION_VOL
-    )
-
-    options_agents = []
-    for i in range(cfg.NUM_OPTION_MARKET_MAKERS):
-        options_agents.append(OptionsMarketMaker(id=1000 + i + 1))
-    for i in range(cfg.NUM_OPTION_NOISE_TRADERS):
-        options_agents.append(OptionsNoiseTrader(id=2000 + i + 1))
-    if include_arbitrage:
-        for i in range(cfg.NUM_OPTION_ARB):
-            options_agents.append(OptionsArbitrageur(id=3000 + i + 1))
-
-    options_market.set_agents(options_agents)
-
-    price_history = []
-    iv_history_call = []
-    iv_history_put = []
-
-    for t in range(cfg.WARMUP_STEPS):
-        market.step(t, agents)
-
-    for t in range(cfg.WARMUP_STEPS, cfg.WARMUP_STEPS + cfg.NUM_STEPS):
-        market.step(t, agents)
-        S = market.mid_price
-        price_history.append(S)
-        rv = realised_vol_last(price_history, lookback=200, annualization=252)
-        vol_for_options = rv if rv is not None else cfg.OPTION_VOL
-
-        options_market.step(t=t, S=S, agents=options_agents, vol=vol_for_options, spot_order_book=market.order_book)
-
-        iv_step_call = {}
-        iv_step_put = {}
-        for K in cfg.OPTION_STRIKES:
-            C_mid = options_market.mid_prices_call.get(K)
-            P_mid = options_market.mid_prices_put.get(K)
-            iv_step_call[K] = bs_utils.implied_volatility(price=C_mid, S=S, K=K, r=cfg.OPTION_R, q=cfg.OPTION_Q, T=cfg.OPTION_TAU, option_type='call')
-            iv_step_put[K] = bs_utils.implied_volatility(price=P_mid, S=S, K=K, r=cfg.OPTION_R, q=cfg.OPTION_Q, T=cfg.OPTION_TAU, option_type='put')
-        iv_history_call.append(iv_step_call)
-        iv_history_put.append(iv_step_put)
-
-    avg_rough_call, avg_rough_put, rough_call, rough_put = compute_iv_roughness(iv_history_call, iv_history_put, cfg.OPTION_STRIKES)
-    return avg_rough_call, avg_rough_put, rough_call, rough_put
+def sim_settings(params=None, config=None, seed=None):
+    # SimConfig for one run: `config` (default: the config module as it is
+    # now) with per-run overrides on top; unknown names raise ValueError.
+    # seed=None keeps the config's SEED.
+    base = config if config is not None else SimConfig.from_module()
+    c = base.replace(**(params or {}))
+    return c if seed is None else c.replace(SEED=seed)
+
+
+def warm_up(seed=None, params=None, logger=None, config=None, cache=None):
+    # Market.snapshot() of the spot market after WARMUP_STEPS; simulate()
+    # can start any number of runs from it (warm_state=...) as long as they
+    # share its spot settings and seed. With a WarmupCache the state is
+    # loaded from disk when an earlier run already built it.
+    sim = Simulation(sim_settings(params, config, seed), logger=logger)
+    sim.warm_up(cache)
+    return sim.market.snapshot(sim.agents)
+
+
+def simulation(include_arbitrage=True, seed=None, params=None, logger=None, config=None, warm_state=None,
+               cache=None):
+    # Simulation for one run with per-run overrides; warm_state or cache skip
+    # re-simulating the spot warm-up
+    c = sim_settings(params, config, seed)
+    sim = Simulation(c, include_arbitrage=include_arbitrage, logger=logger, warm_state=warm_state)
+    sim.warm_up(cache)
+    return sim
+
+
+def simulate(include_arbitrage=True, seed=None, params=None, logger=None, config=None, warm_state=None,
+             cache=None):
+    # one spot + options run with full histories (arrays, IVs steps x
+    # strikes); the SimConfig is handed to every market and agent, so
+    # overrides reach them even in pool workers
+    sim = simulation(include_arbitrage, seed, params, logger, config, warm_state, cache)
+    history, counts = sim.run(HistorySink(sim.strikes, keep_trades=False), TradeCountSink())
+    return {
+        'strikes': list(sim.strikes),
+        'price_history': history.price_history,
+        'rv_history': history.rv_history,
+        'iv_history_call': history.iv_history_call,
+        'iv_history_put': history.iv_history_put,
+        'n_spot_trades': counts.n_spot_trades,
+        'n_option_trades': counts.n_option_trades,
+    }
+
+
+def summarize(result):
+    # scalar metrics of one simulate() result, one row of a sweep table
+    prices = np.asarray(result['price_history'], dtype=float)
+    log_ret = np.diff(np.log(prices)) if len(prices) > 1 else np.empty(0)
+    avg_rough_call, avg_rough_put, _, _ = compute_iv_roughness(result['iv_history_call'], result['iv_history_put'])
+    return {
+        'final_price': float(prices[-1]) if len(prices) else None,
+        'return_std': float(log_ret.std()) if len(log_ret) > 1 else None,
+        'mean_rv': bs_utils.mean_realised_vol(result['rv_history']),
+        'avg_rough_call': avg_rough_call,
+        'avg_rough_put': avg_rough_put,
+        'n_spot_trades': result['n_spot_trades'],
+        'n_option_trades': result['n_option_trades'],
+    }
+
+
+def run_simulation(include_arbitrage=True, seed=None, params=None, cache_dir=None, log_dir=None):
+    # log_dir: write this run's logs there with the console off, so runs in
+    # parallel workers do not share files; None keeps the default Logger
+    cache = WarmupCache(cache_dir) if cache_dir else None
+    logger = None
+    if log_dir is not None:
+        logger = Logger(trades_file=os.path.join(log_dir, "trades.csv"),
+                        events_file=os.path.join(log_dir, "events.log"),
+                        enable_console=False)
+    sim = simulation(include_arbitrage=include_arbitrage, seed=seed, params=params, logger=logger, cache=cache)
+    try:
+        rough, = sim.run(RoughnessSink())
+    finally:
+        # pool workers exit without running atexit hooks
+        if logger is not None:
+            logger.close()
+    return rough.avg_rough_call, rough.avg_rough_put, rough.roughness_call, rough.roughness_put
 
 
 def main():
-    avg_rough_call_arb, avg_rough_put_arb, rough_call_arb, rough_put_arb = run_simulation(include_arbitrage=True)
-    avg_rough_call_noarb, avg_rough_put_noarb, rough_call_noarb, rough_put_noarb = run_simulation(include_arbitrage=False)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        arb = pool.submit(run_simulation, include_arbitrage=True, log_dir=os.path.join("logs", "arb"))
+        noarb = pool.submit(run_simulation, include_arbitrage=False, log_dir=os.path.join("logs", "no_arb"))
+        avg_rough_call_arb, avg_rough_put_arb, rough_call_arb, rough_put_arb = arb.result()
+        avg_rough_call_noarb, avg_rough_put_noarb, rough_call_noarb, rough_put_noarb = noarb.result()
 
     t_stat_call, p_val_call = stats.ttest_ind(rough_call_arb, rough_call_noarb, equal_var=False)
     t_stat_put, p_val_put = stats.ttest_ind(rough_put_arb, rough_put_noarb, equal_var=False)
@@ -0,0 +1,299 @@
+import time
+import numpy as np
+from environment.matching_engine import BOOK_SIDES
+from environment.order_book import OrderBook
+from environment.options_order_book import OptionsOrderBook
+from environment.orders import Order
+from environment.time_in_force import TIME_IN_FORCE
+
+# Order-flow record and replay. A FlowRecorder attached to order books logs
+# every call the markets make on them (orders, cancels, clock ticks,
+# auction uncrosses) to a .npy file of structured-array chunks, the same
+# layout as the trade tape: a header chunk describing the books, event
+# chunks, and on close the trades each book produced while recorded.
+# replay() pushes the events through fresh books with no agents attached, so
+# matching can be timed on its own and a book implementation checked
+# against the recorded trades.
+
+ADD, QUEUE, CANCEL, ADVANCE, UNCROSS, SEED = range(6)
+EVENT_KINDS = ('add', 'queue', 'cancel', 'advance', 'uncross', 'seed')
+# QUEUE is add_order(match=False) (auction mode); SEED re-creates an order
+# that was resting when the recorder was attached
+
+SIDES = ('buy', 'sell')
+TIFS = (None,) + TIME_IN_FORCE
+IMPLS = tuple(BOOK_SIDES)
+BOOK_KINDS = ('spot', 'option')
+OPTION_TYPES = ('', 'call', 'put')
+NONE = -1       # missing ttl / expire_at / agent
+
+BOOK_DTYPE = np.dtype([
+    ('kind', 'u1'),             # index into BOOK_KINDS
+    ('impl', 'u1'),             # index into IMPLS
+    ('strike', 'f8'),           # NaN for the spot book
+    ('option_type', 'u1'),      # index into OPTION_TYPES
+    ('initial_price', 'f8'),
+    ('steps_per_day', 'i8'),
+])
+
+EVENT_DTYPE = np.dtype([
+    ('kind', 'u1'),             # index into EVENT_KINDS
+    ('book', 'u2'),             # row in the header
+    ('side', 'u1'),             # index into SIDES
+    ('tif', 'u1'),              # index into TIFS
+    ('agent', 'i8'),            # order owner, or the agent cancelled
+    ('price', 'f8'),
+    ('qty', 'f8'),
+    ('ttl', 'i8'),
+    ('expire_at', 'i8'),
+    ('t', 'i8'),                # book clock; the new time for ADVANCE
+])
+
+TRADE_DTYPE = np.dtype([
+    ('book', 'u2'),
+    ('price', 'f8'),
+    ('qty', 'f8'),
+    ('buyer', 'i8'),
+    ('seller', 'i8'),
+])
+
+_SIDE_CODE = {side: i for i, side in enumerate(SIDES)}
+_TIF_CODE = {tif: i for i, tif in enumerate(TIFS)}
+
+
+class _Channel:
+    # set as `recorder` on one book; MatchingEngine calls it on every entry point
+    __slots__ = ('rec', 'book_id', 'book')
+
+    def __init__(self, rec, book_id, book):
+        self.rec = rec
+        self.book_id = book_id
+        self.book = book
+
+    def add(self, order, match):
+        ttl = order.ttl
+        expire_at = order.expire_at
+        self.rec.event((ADD if match else QUEUE, self.book_id, _SIDE_CODE[order.side], _TIF_CODE[order.tif],
+                        order.agent_id, order.price, order.qty, NONE if ttl is None else ttl,
+                        NONE if expire_at is None else expire_at, self.book.time))
+
+    def cancel(self, agent_id):
+        self.rec.event((CANCEL, self.book_id, 0, 0, agent_id, np.nan, 0.0, NONE, NONE, self.book.time))
+
+    def advance(self, t):
+        self.rec.event((ADVANCE, self.book_id, 0, 0, NONE, np.nan, 0.0, NONE, NONE, t))
+
+    def uncross(self):
+        self.rec.event((UNCROSS, self.book_id, 0, 0, NONE, np.nan, 0.0, NONE, NONE, self.book.time))
+
+
+def book_info(book):
+    if isinstance(book, OptionsOrderBook):
+        return (1, IMPLS.index(book.impl), book.strike, OPTION_TYPES.index(book.option_type),
+                book.last_price, book.steps_per_day)
+    return (0, IMPLS.index(book.impl), np.nan, 0, book.last_price, book.steps_per_day)
+
+
+class FlowRecorder:
+    # attach() every book before the first recorded call; each book starts
+    # with an ADVANCE to its clock and a SEED per resting order, so
+    # recording can start after the warm-up
+    def __init__(self, path, chunk_size=65536):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.books = []
+        self.n_events = 0
+        self._info = []
+        self._trade_start = []
+        self._rows = []
+        self._f = open(path, 'wb')
+        self._header_written = False
+        self._started = False
+
+    def attach(self, book):
+        if self._started:
+            raise RuntimeError("attach every book before the first recorded call")
+        book_id = len(self.books)
+        self.books.append(book)
+        self._info.append(book_info(book))
+        self._trade_start.append(len(book.trades))
+        t = book.time
+        self.append((ADVANCE, book_id, 0, 0, NONE, np.nan, 0.0, NONE, NONE, t))
+        for side, price, qty, agent, expire_at in book.resting_orders():
+            tif = _TIF_CODE[None] if expire_at is None else _TIF_CODE['GTT']
+            self.append((SEED, book_id, _SIDE_CODE[side], tif, agent, price, qty, NONE,
+                         NONE if expire_at is None else expire_at, t))
+        book.recorder = _Channel(self, book_id, book)
+        return book_id
+
+    def attach_markets(self, market=None, options_market=None):
+        # the spot book first, then each strike's call and put book
+        if market is not None:
+            self.attach(market.order_book)
+        if options_market is not None:
+            for K in options_market.strikes:
+                for option_type in ('call', 'put'):
+                    self.attach(options_market.order_books[K][option_type])
+
+    def event(self, row):
+        self._started = True
+        self.append(row)
+
+    def append(self, row):
+        # the header goes out with the first chunk, so nothing is flushed
+        # while books can still be attached
+        self._rows.append(row)
+        if self._started and len(self._rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._header_written:
+            np.save(self._f, np.array(self._info, dtype=BOOK_DTYPE))
+            self._header_written = True
+        if not self._rows:
+            return
+        chunk = np.array(self._rows, dtype=EVENT_DTYPE)
+        np.save(self._f, chunk)
+        self.n_events += len(chunk)
+        self._rows = []
+
+    def close(self):
+        # writes the trades recorded books produced and detaches them
+        if self._f is None:
+            return
+        self.flush()
+        rows = []
+        for book_id, book in enumerate(self.books):
+            rows.extend((book_id, tr.price, tr.qty, tr.buyer, tr.seller)
+                        for tr in book.trades[self._trade_start[book_id]:])
+            book.recorder = None
+        np.save(self._f, np.array(rows, dtype=TRADE_DTYPE))
+        self._f.close()
+        self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class OrderFlow:
+    def __init__(self, books, events, trades):
+        self.books = books          # BOOK_DTYPE array
+        self.events = events        # EVENT_DTYPE array
+        self.trades = trades        # TRADE_DTYPE array; None if the recorder was not closed
+
+    def counts(self):
+        # {event kind: count}
+        n = np.bincount(self.events['kind'], minlength=len(EVENT_KINDS))
+        return dict(zip(EVENT_KINDS, n.tolist()))
+
+
+def load_flow(path):
+    books = None
+    events = []
+    trades = None
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                chunk = np.load(f)
+            except EOFError:
+                break
+            if books is None:
+                books = chunk
+            elif chunk.dtype == EVENT_DTYPE:
+                events.append(chunk)
+            else:
+                trades = chunk
+    if books is None:
+        raise ValueError(f"{path} holds no order flow")
+    events = np.concatenate(events) if events else np.empty(0, dtype=EVENT_DTYPE)
+    return OrderFlow(books, events, trades)
+
+
+def build_books(books, impl=None):
+    # fresh books for a header; impl overrides the recorded implementation
+    out = []
+    for b in books.tolist():
+        kind, impl_code, strike, option_type, initial_price, steps_per_day = b
+        name = IMPLS[impl_code] if impl is None else impl
+        if BOOK_KINDS[kind] == 'option':
+            out.append(OptionsOrderBook(strike, OPTION_TYPES[option_type], initial_price=initial_price,
+                                        impl=name, steps_per_day=steps_per_day))
+        else:
+            out.append(OrderBook(initial_price=initial_price, impl=name, steps_per_day=steps_per_day))
+    return out
+
+
+def _number(x):
+    return int(x) if x.is_integer() else x
+
+
+def decode(events):
+    # -> [(kind, book_id, arg)]: an Order for the add kinds, the agent id
+    # for CANCEL, the time for ADVANCE, None for UNCROSS
+    out = []
+    for kind, book, side, tif, agent, price, qty, ttl, expire_at, t in events.tolist():
+        if kind in (ADD, QUEUE, SEED):
+            arg = Order(agent, SIDES[side], price, _number(qty), tif=TIFS[tif],
+                        ttl=None if ttl == NONE else ttl, expire_at=None if expire_at == NONE else expire_at)
+        elif kind == CANCEL:
+            arg = agent
+        elif kind == ADVANCE:
+            arg = t
+        else:
+            arg = None
+        out.append((kind, book, arg))
+    return out
+
+
+def replay(flow, impl=None, latencies=False, ops=None):
+    # runs the flow through fresh books -> (trades, seconds, latencies).
+    # ops: decode(flow.events), to reuse across replays. The set-up rows
+    # (each book's first ADVANCE and the seed orders) are not timed. With
+    # latencies=True every add and cancel is timed on its own, which adds
+    # the timer's overhead to `seconds`; otherwise latencies is None.
+    books = build_books(flow.books, impl)
+    ops = decode(flow.events) if ops is None else ops
+    n_setup = len(flow.books) + int(np.count_nonzero(flow.events['kind'] == SEED))
+    for kind, book, arg in ops[:n_setup]:
+        if kind == SEED:
+            books[book].add_order(arg)
+        else:
+            books[book].advance_time(arg)
+
+    lat = [] if latencies else None
+    clock = time.perf_counter
+    t0 = clock()
+    for kind, book, arg in ops[n_setup:]:
+        ob = books[book]
+        if kind == ADD:
+            if lat is None:
+                ob.add_order(arg)
+            else:
+                s = clock()
+                ob.add_order(arg)
+                lat.append(clock() - s)
+        elif kind == CANCEL:
+            if lat is None:
+                ob.cancel_orders_for_agent(arg)
+            else:
+                s = clock()
+                ob.cancel_orders_for_agent(arg)
+                lat.append(clock() - s)
+        elif kind == ADVANCE:
+            ob.advance_time(arg)
+        elif kind == QUEUE:
+            ob.add_order(arg, match=False)
+        else:
+            ob.uncross()
+    seconds = clock() - t0
+    rows = [(book_id, tr.price, tr.qty, tr.buyer, tr.seller)
+            for book_id, ob in enumerate(books) for tr in ob.trades]
+    return np.array(rows, dtype=TRADE_DTYPE), seconds, None if lat is None else np.array(lat)
+
+
+def same_trades(a, b):
+    # exact, field by field; both are grouped by book in book order
+    return len(a) == len(b) and a.tobytes() == b.tobytes()
@@ -1,6 +1,15 @@
+import numpy as np
 import matplotlib.pyplot as plt
 
-def plot_price_series(price_history):
+def _finish(save_path=None):
+    # show interactively, or write the figure to save_path (headless runs)
+    if save_path is None:
+        plt.show()
+    else:
+        plt.savefig(save_path, bbox_inches="tight")
+        plt.close()
+
+def plot_price_series(price_history, save_path=None):
     plt.figure(figsize=(10, 5))
     plt.plot(price_history, label='Mid Price')
     plt.xlabel('Time')
@@ -8,24 +17,24 @@ def plot_price_series(price_history):
     plt.title('Price Evolution')
     plt.legend()
     plt.grid(True)
-    plt.show()
+    _finish(save_path)
 
-def plot_options_prices(option_price_history, strikes, title='Options Prices Evolution'):
+def plot_options_prices(option_price_history, strikes, title='Options Prices Evolution', save_path=None):
+    # option_price_history: steps x strikes array
+    prices = np.asarray(option_price_history, dtype=float).reshape(-1, len(strikes))
     plt.figure(figsize=(12, 6))
-    for K in strikes:
-        prices = [step[K] for step in option_price_history]
-        plt.plot(prices, label=f'Strike {K}')
+    for j, K in enumerate(strikes):
+        plt.plot(prices[:, j], label=f'Strike {K}')
     plt.xlabel('Time')
     plt.ylabel('Option Price')
     plt.title(title)
     plt.legend()
     plt.grid(True)
-    plt.show()
+    _finish(save_path)
 
-def plot_realised_vol(rv_history, rv_avg, title="Realised Vol"):
-    import matplotlib.pyplot as plt
-    rv_plot = [x if x is not None else float("nan") for x in rv_history]
-    avg_plot = [x if x is not None else float("nan") for x in rv_avg]
+def plot_realised_vol(rv_history, rv_avg, title="Realised Vol", save_path=None):
+    rv_plot = np.asarray(rv_history, dtype=float)     # None -> NaN
+    avg_plot = np.asarray(rv_avg, dtype=float)
 
     plt.figure(figsize=(12, 5))
     plt.plot(rv_plot, label="Realised vol")
@@ -35,25 +44,23 @@ def plot_realised_vol(rv_history, rv_avg, title="Realised Vol"):
     plt.title(title)
     plt.grid(True)
     plt.legend()
-    plt.show()
-
-def plot_implied_vol_series(iv_history, strikes, title="Implied Volatility"):
-    import matplotlib.pyplot as plt
+    _finish(save_path)
 
+def plot_implied_vol_series(iv_history, strikes, title="Implied Volatility", save_path=None):
+    # iv_history: steps x strikes array, NaN where the solver failed
+    iv = np.asarray(iv_history, dtype=float).reshape(-1, len(strikes))
     plt.figure(figsize=(12, 5))
-    for K in strikes:
-        series = [step.get(K, float("nan")) for step in iv_history]
-        series = [x if x is not None else float("nan") for x in series]
-        plt.plot(series, label=f"K={K}")
+    for j, K in enumerate(strikes):
+        plt.plot(iv[:, j], label=f"K={K}")
 
     plt.xlabel("Time")
     plt.ylabel("IV (annualized)")
     plt.title(title)
     plt.grid(True)
     plt.legend()
-    plt.show()
+    _finish(save_path)
 
-def plot_series(series, title="", ylabel="value"):
+def plot_series(series, title="", ylabel="value", save_path=None):
     xs = list(range(len(series)))
     ys = [v if v is not None else float("nan") for v in series]
     plt.figure()
@@ -62,9 +69,9 @@ def plot_series(series, title="", ylabel="value"):
     plt.xlabel("t")
     plt.ylabel(ylabel)
     plt.grid(True, alpha=0.3)
-    plt.show()
+    _finish(save_path)
 
-def plot_binary_regime(regime, title="Regime"):
+def plot_binary_regime(regime, title="Regime", save_path=None):
     xs = list(range(len(regime)))
     ys = [int(v) for v in regime]
     plt.figure()
@@ -74,9 +81,9 @@ def plot_binary_regime(regime, title="Regime"):
     plt.xlabel("t")
     plt.ylabel("active (0/1)")
     plt.grid(True, alpha=0.3)
-    plt.show()
+    _finish(save_path)
 
-def plot_scatter(x, y, title="", xlabel="x", ylabel="y", alpha=0.4):
+def plot_scatter(x, y, title="", xlabel="x", ylabel="y", alpha=0.4, save_path=None):
     xs, ys = [], []
     for a, b in zip(x, y):
         if a is None or b is None:
@@ -90,9 +97,9 @@ def plot_scatter(x, y, title="", xlabel="x", ylabel="y", alpha=0.4):
     plt.xlabel(xlabel)
     plt.ylabel(ylabel)
     plt.grid(alpha=0.3)
-    plt.show()
+    _finish(save_path)
 
-def plot_two_regimes(series, idx_high, idx_low, title="", ylabel="value"):
+def plot_two_regimes(series, idx_high, idx_low, title="", ylabel="value", save_path=None):
     high = [series[t] if t in idx_high else None for t in range(len(series))]
     low  = [series[t] if t in idx_low  else None for t in range(len(series))]
 
@@ -107,4 +114,4 @@ def plot_two_regimes(series, idx_high, idx_low, title="", ylabel="value"):
     plt.xlabel("t")
     plt.legend()
     plt.grid(alpha=0.3)
-    plt.show()
+    _finish(save_path)
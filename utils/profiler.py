@@ -0,0 +1,144 @@
+import json
+import time
+from utils.file_io import save_columns_csv
+from utils.history_store import ColumnStore
+
+# Step profiler for Market.step, OptionsMarket.step and Simulation. Attach
+# one as `profiler` on the markets (Simulation(profiler=...) does both for
+# the measured steps); the markets then add their phase timings,
+# per-agent-class act() timings, order / trade counts and book depth, and
+# whoever drives the steps calls end_step(t) once per step. With
+# profiler=None the markets only pay one attribute check per step.
+
+PHASES = (
+    'spot.processes',   # news, fundamental, indicators
+    'spot.act',         # agent.act() in the spot market
+    'spot.orders',      # cancels, order logging and matching
+    'spot.uncross',     # auction mode only
+    'spot.logging',     # mid price, mid and trade logging
+    'options.pricing',  # chain_snapshot
+    'options.act',
+    'options.orders',   # cancels and matching, hedge orders included
+    'options.mids',
+    'options.hedge',
+    'rv',
+    'iv',
+    'snapshot',         # option trade logging and snapshot dict
+    'sinks',            # whatever consumes Simulation.steps(), e.g. run()'s sinks
+)
+COUNTS = ('orders', 'trades', 'option_orders', 'option_trades')
+# book depth, sampled at the end of each market's step
+GAUGES = ('live_orders', 'spread', 'option_live_orders')
+
+
+class StepProfiler:
+    clock = staticmethod(time.perf_counter)
+
+    def __init__(self, per_step=True):
+        # per_step=False keeps the totals only (constant memory)
+        self.steps = 0
+        self.total_time = 0.0
+        self.phase_time = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(COUNTS, 0)
+        self.agents = {}        # class name -> [calls, seconds, orders]
+        self.history = ColumnStore(('t', 'total') + PHASES + COUNTS + GAUGES) if per_step else None
+        self._depth_sum = dict.fromkeys(GAUGES, 0.0)
+        self._depth_n = dict.fromkeys(GAUGES, 0)
+        self._reset()
+
+    def _reset(self):
+        self._phase = dict.fromkeys(PHASES, 0.0)
+        self._count = dict.fromkeys(COUNTS, 0)
+        self._gauge = dict.fromkeys(GAUGES)
+        self._start = self.clock()
+
+    def begin_step(self):
+        # optional: without it a step is timed from the previous end_step()
+        self._start = self.clock()
+
+    def add(self, phase, seconds):
+        self._phase[phase] += seconds
+
+    def act(self, phase, counter, agent, seconds, n_orders):
+        # one agent.act() call; populations count as one call
+        self._phase[phase] += seconds
+        self._count[counter] += n_orders
+        stats = self.agents.get(type(agent).__name__)
+        if stats is None:
+            stats = self.agents[type(agent).__name__] = [0, 0.0, 0]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] += n_orders
+
+    def count(self, counter, n):
+        self._count[counter] += n
+
+    def gauge(self, name, value):
+        self._gauge[name] = value
+
+    def end_step(self, t):
+        total = self.clock() - self._start
+        self.steps += 1
+        self.total_time += total
+        for phase, seconds in self._phase.items():
+            self.phase_time[phase] += seconds
+        for counter, n in self._count.items():
+            self.counts[counter] += n
+        for name, value in self._gauge.items():
+            if value is not None:
+                self._depth_sum[name] += value
+                self._depth_n[name] += 1
+        if self.history is not None:
+            self.history.append([t, total, *self._phase.values(), *self._count.values(),
+                                 *self._gauge.values()])
+        self._reset()
+
+    def mean_depth(self):
+        return {name: self._depth_sum[name] / self._depth_n[name] if self._depth_n[name] else None
+                for name in GAUGES}
+
+    def summary(self):
+        steps = self.steps or 1
+        return {
+            'steps': self.steps,
+            'total_time': self.total_time,
+            'time_per_step': self.total_time / steps,
+            'phases': {p: {'total': s, 'per_step': s / steps} for p, s in self.phase_time.items()},
+            'agents': {name: {'calls': calls, 'total': s, 'per_call': s / calls if calls else 0.0,
+                              'orders': n}
+                       for name, (calls, s, n) in sorted(self.agents.items())},
+            'counts': dict(self.counts),
+            'mean_depth': self.mean_depth(),
+        }
+
+    def summary_table(self):
+        total = self.total_time or 1.0
+        steps = self.steps or 1
+        lines = [f"profile: {self.steps} steps, {self.total_time:.3f} s "
+                 f"({1e3 * self.total_time / steps:.3f} ms/step)",
+                 f"{'phase':<18}{'total s':>10}{'%':>8}{'ms/step':>10}"]
+        other = self.total_time - sum(self.phase_time.values())
+        for phase, s in [*self.phase_time.items(), ('(other)', other)]:
+            if s or phase == '(other)':
+                lines.append(f"{phase:<18}{s:>10.3f}{100 * s / total:>8.1f}"
+                             f"{1e3 * s / steps:>10.4f}")
+        if self.agents:
+            lines.append(f"{'agent class':<24}{'calls':>10}{'total s':>10}"
+                         f"{'us/call':>10}{'orders':>10}")
+            for name, (calls, s, n) in sorted(self.agents.items(), key=lambda kv: -kv[1][1]):
+                lines.append(f"{name:<24}{calls:>10}{s:>10.3f}{1e6 * s / calls:>10.2f}{n:>10}")
+        lines.append("counts: " + " ".join(f"{k}={v}" for k, v in self.counts.items()))
+        depth = self.mean_depth()
+        lines.append("mean depth: " + " ".join(f"{k}={'-' if v is None else f'{v:.2f}'}"
+                                               for k, v in depth.items()))
+        return "\n".join(lines)
+
+    def to_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def to_csv(self, path):
+        # per-step rows; needs per_step=True
+        if self.history is None:
+            raise ValueError("per-step history was not kept (per_step=False)")
+        save_columns_csv(path, self.history.array, self.history.columns, index_name="step")
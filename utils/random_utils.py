@@ -1,11 +1,112 @@
 # utils/random_utils.py
-import random
+import zlib
+import numpy as np
+
+# Every consumer (agent, news, fundamental process, population) owns a stream
+# derived from one root seed. A stream's SeedSequence spawn_key comes from a
+# stable key such as ('agent', 17), so the draws an agent sees do not depend
+# on how many other streams exist or in which order they were created.
+
+BLOCK_SIZE = 1024
+
+
+def _spawn_key_part(k):
+    # SeedSequence only takes non-negative ints: other values are hashed and
+    # negative ints (e.g. an agent id of -1) are taken modulo 2**64
+    if isinstance(k, int):
+        return k if k >= 0 else k + (1 << 64)
+    return zlib.crc32(str(k).encode())
+
+
+def _spawn_key(key):
+    return tuple(_spawn_key_part(k) for k in key)
+
+
+class RandomStream:
+    # scalar draws served from pre-generated blocks of one numpy Generator
+    def __init__(self, seed_seq, block=BLOCK_SIZE):
+        self.generator = np.random.Generator(np.random.PCG64(seed_seq))
+        self.block = block
+        self._uniform = []
+        self._u_pos = 0
+        self._normal = []
+        self._n_pos = 0
+
+    def random(self):
+        i = self._u_pos
+        if i >= len(self._uniform):
+            self._uniform = self.generator.random(self.block).tolist()
+            i = 0
+        self._u_pos = i + 1
+        return self._uniform[i]
+
+    def normal(self):
+        i = self._n_pos
+        if i >= len(self._normal):
+            self._normal = self.generator.standard_normal(self.block).tolist()
+            i = 0
+        self._n_pos = i + 1
+        return self._normal[i]
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.random()
+
+    def gauss(self, mu, sigma):
+        return mu + sigma * self.normal()
+
+    def randint(self, a, b):
+        # inclusive on both ends, like random.randint
+        return a + min(int(self.random() * (b - a + 1)), b - a)
+
+    def choice(self, seq):
+        return seq[min(int(self.random() * len(seq)), len(seq) - 1)]
+
+
+class RNGManager:
+    def __init__(self, seed=None):
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        # seed=None draws fresh OS entropy; it is kept so the run can be repeated
+        self.root = np.random.SeedSequence(seed)
+        self.entropy = self.root.entropy
+
+    def set_entropy(self, entropy):
+        self.root = np.random.SeedSequence(entropy)
+        self.entropy = entropy
+
+    def seed_sequence(self, *key):
+        return np.random.SeedSequence(self.entropy, spawn_key=_spawn_key(key))
+
+    def stream(self, *key, block=BLOCK_SIZE):
+        return RandomStream(self.seed_sequence(*key), block=block)
+
+    def generator(self, *key):
+        return np.random.Generator(np.random.PCG64(self.seed_sequence(*key)))
+
+
+def manager(rngs=None, seed=None):
+    # the RNGManager a simulation object draws from: the run's own (rngs), or
+    # a new one for `seed`. Streams are keyed, so objects built separately
+    # with the same seed see the same draws as if they had shared a manager.
+    return rngs if rngs is not None else RNGManager(seed)
+
+
+# module-level helpers for scripts; simulation objects never draw from these
+_default = RNGManager().stream('default')
+
+
+def seed(value=None):
+    # reseeds the module-level helpers only
+    global _default
+    _default = RNGManager(value).stream('default')
+
 
 def uniform(a, b):
-    return random.uniform(a, b)
+    return _default.uniform(a, b)
 
 def randint(a, b):
-    return random.randint(a, b)
+    return _default.randint(a, b)
 
 def choice(seq):
-    return random.choice(seq)
+    return _default.choice(seq)
@@ -0,0 +1,214 @@
+import math
+import sys
+import time
+import numpy as np
+from utils.bs_utils import mean_abs_iv_change
+from utils import checkpoint
+from utils.history_store import ColumnStore
+
+# Consumers of Simulation.run(): each sink gets on_step(t, snapshot) for every
+# measured step and close() once at the end. Sinks that only keep aggregates
+# run in constant memory whatever the length of the run.
+
+SPOT_COLUMNS = ('mid_price', 'news', 'rv')
+
+
+class Sink:
+    def on_step(self, t, snap):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class HistorySink(Sink):
+    # full per-step histories in ColumnStores: `spot` has the mid, news and
+    # RV columns, the option stores one column per strike; the *_history
+    # properties are views of the filled rows (RV and IV NaN when missing)
+    def __init__(self, strikes, keep_trades=True):
+        self.strikes = list(strikes)
+        self.keep_trades = keep_trades
+        self.spot = ColumnStore(SPOT_COLUMNS)
+        self.mid_call = ColumnStore(self.strikes)
+        self.mid_put = ColumnStore(self.strikes)
+        self.iv_call = ColumnStore(self.strikes)
+        self.iv_put = ColumnStore(self.strikes)
+        self.trades = []
+        self.option_trades = []
+
+    def on_step(self, t, snap):
+        rv = snap['rv']
+        self.spot.append((snap['mid_price'], snap['news'], np.nan if rv is None else rv))
+        self.mid_call.append(snap['mid_call'])
+        self.mid_put.append(snap['mid_put'])
+        self.iv_call.append(snap['iv_call'])
+        self.iv_put.append(snap['iv_put'])
+        if self.keep_trades:
+            self.trades.extend(snap['trades'])
+            self.option_trades.extend(snap['option_trades'])
+
+    @property
+    def price_history(self):
+        return self.spot.column('mid_price')
+
+    @property
+    def news_history(self):
+        return self.spot.column('news')
+
+    @property
+    def rv_history(self):
+        return self.spot.column('rv')
+
+    @property
+    def option_price_history_call(self):
+        return self.mid_call.array
+
+    @property
+    def option_price_history_put(self):
+        return self.mid_put.array
+
+    @property
+    def iv_history_call(self):
+        return self.iv_call.array
+
+    @property
+    def iv_history_put(self):
+        return self.iv_put.array
+
+
+class TradeCountSink(Sink):
+    def __init__(self):
+        self.n_spot_trades = 0
+        self.n_option_trades = 0
+
+    def on_step(self, t, snap):
+        self.n_spot_trades += len(snap['trades'])
+        self.n_option_trades += len(snap['option_trades'])
+
+
+class TapeSink(Sink):
+    # streams spot and option trades into a TradeTapeWriter
+    def __init__(self, writer):
+        self.writer = writer
+
+    def on_step(self, t, snap):
+        self.writer.extend(snap['trades'])
+        self.writer.extend(snap['option_trades'])
+
+    def close(self):
+        self.writer.close()
+
+
+class RoughnessSink(Sink):
+    # online compute_iv_roughness: mean absolute step-to-step IV change
+    # across strikes, averaged over the run. keep_series keeps the per-step
+    # values (for the arb / no-arb t-test); without it memory is constant.
+    def __init__(self, keep_series=True):
+        self.keep_series = keep_series
+        self.roughness_call = []
+        self.roughness_put = []
+        self._sum = [0.0, 0.0]
+        self._count = [0, 0]
+        self._prev = None
+
+    def on_step(self, t, snap):
+        current = (snap['iv_call'], snap['iv_put'])
+        if self._prev is not None:
+            for i, series in enumerate((self.roughness_call, self.roughness_put)):
+                r = mean_abs_iv_change(current[i], self._prev[i])
+                if r is None:
+                    continue
+                self._sum[i] += r
+                self._count[i] += 1
+                if self.keep_series:
+                    series.append(r)
+        self._prev = current
+
+    @property
+    def avg_rough_call(self):
+        return self._sum[0] / self._count[0] if self._count[0] else 0
+
+    @property
+    def avg_rough_put(self):
+        return self._sum[1] / self._count[1] if self._count[1] else 0
+
+
+class SummarySink(Sink):
+    # the metrics.summarize() row, accumulated online
+    def __init__(self):
+        self.final_price = None
+        self._n = 0             # log returns, Welford mean / squared deviations
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._rv_sum = 0.0
+        self._rv_count = 0
+        self.roughness = RoughnessSink(keep_series=False)
+        self.counts = TradeCountSink()
+
+    def on_step(self, t, snap):
+        price = snap['mid_price']
+        if self.final_price is not None:
+            x = math.log(price / self.final_price)
+            self._n += 1
+            delta = x - self._mean
+            self._mean += delta / self._n
+            self._m2 += delta * (x - self._mean)
+        self.final_price = price
+        rv = snap['rv']
+        if rv is not None and not (isinstance(rv, float) and math.isnan(rv)):
+            self._rv_sum += rv
+            self._rv_count += 1
+        self.roughness.on_step(t, snap)
+        self.counts.on_step(t, snap)
+
+    def summary(self):
+        return {
+            'final_price': self.final_price,
+            'return_std': math.sqrt(max(self._m2, 0.0) / self._n) if self._n > 1 else None,
+            'mean_rv': self._rv_sum / self._rv_count if self._rv_count else None,
+            'avg_rough_call': self.roughness.avg_rough_call,
+            'avg_rough_put': self.roughness.avg_rough_put,
+            'n_spot_trades': self.counts.n_spot_trades,
+            'n_option_trades': self.counts.n_option_trades,
+        }
+
+
+class CheckpointSink(Sink):
+    # checkpoint.save(path, **state()) after every `every` steps; put it
+    # after the sinks whose state it saves
+    def __init__(self, path, every, state):
+        self.path = path
+        self.every = every
+        self.state = state
+
+    def on_step(self, t, snap):
+        if self.every and (t + 1) % self.every == 0:
+            checkpoint.save(self.path, **self.state())
+
+
+class ConsoleSink(Sink):
+    # the per-step echo of the interactive run
+    def on_step(self, t, snap):
+        print(f"[Time {t}] News: {snap['news']:.2f}")
+        print(f"Mid price: {snap['mid_price']:.2f}\n")
+
+
+class ProgressSink(Sink):
+    # one status line every `every` steps, for watching long headless runs
+    def __init__(self, every=1000, total=None, stream=None):
+        self.every = every
+        self.total = total
+        self.stream = stream if stream is not None else sys.stderr
+        self._n = 0
+        self._t0 = time.perf_counter()
+
+    def on_step(self, t, snap):
+        self._n += 1
+        if self._n % self.every:
+            return
+        elapsed = time.perf_counter() - self._t0
+        done = f"{self._n}/{self.total}" if self.total else str(self._n)
+        rv = snap['rv']
+        rv_str = f"{rv:.4f}" if rv is not None else "-"
+        print(f"[progress] step {done} t={t} mid={snap['mid_price']:.2f} rv={rv_str} "
+              f"{self._n / elapsed:.0f} steps/s", file=self.stream, flush=True)
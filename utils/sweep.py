@@ -0,0 +1,150 @@
+# python -m utils.sweep --grid MM_BASE_SPREAD=0.02,0.05 --grid NUM_OPTION_ARB=0,4 --replicates 3 --workers 4
+import argparse
+import ast
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from utils import metrics
+from utils.logger import Logger, WARNING
+from utils.warmup_cache import WarmupCache
+from utils.sinks import SummarySink
+
+
+def parse_grid(specs):
+    # ["NAME=v1,v2", ...] -> {NAME: [v1, v2]}; values are Python literals
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if not values:
+            raise ValueError(f"grid entry must look like NAME=v1,v2: {spec!r}")
+        grid[name.strip()] = [_literal(v) for v in values.split(",")]
+    return grid
+
+
+def _literal(text):
+    text = text.strip()
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def replicate_seed(base_seed, replicate):
+    # the same replicate gets the same seed in every cell (common random
+    # numbers across the grid); replicates are independent SeedSequence children
+    return int(np.random.SeedSequence(base_seed, spawn_key=(replicate,)).generate_state(1)[0])
+
+
+def grid_cells(grid, replicates, base_seed):
+    names = sorted(grid)
+    for values in itertools.product(*(grid[n] for n in names)):
+        params = dict(zip(names, values))
+        for rep in range(replicates):
+            yield params, rep, replicate_seed(base_seed, rep)
+
+
+def _cell_key(params, replicate, seed):
+    # the replicate's seed is part of the key, so rows written under another
+    # --seed are not taken for this sweep's
+    return tuple(sorted((k, repr(v)) for k, v in params.items())) + (("replicate", str(replicate)),
+                                                                    ("seed", str(seed)))
+
+
+def run_cell(params, replicate, seed, include_arbitrage=True, config=None, cache=None):
+    # one simulation, returns a results-table row
+    config = metrics.sim_settings(params, config)    # rejects unknown names before running
+    logger = Logger(trades_file=None, events_file=None, enable_console=False, level=WARNING)
+    t0 = time.perf_counter()
+    sim = metrics.simulation(include_arbitrage=include_arbitrage, seed=seed, logger=logger, config=config,
+                             cache=cache)
+    summary, = sim.run(SummarySink())
+    row = {k: repr(v) for k, v in params.items()}
+    row.update(replicate=replicate, seed=seed, seconds=round(time.perf_counter() - t0, 3))
+    row.update(summary.summary())
+    return row
+
+
+def run_batch(cells, include_arbitrage=True, cache_dir=None):
+    # pool worker: several cells back to back, so short runs pay the task
+    # round trip once per batch; each run builds its own SimConfig
+    base = metrics.sim_settings()
+    cache = WarmupCache(cache_dir) if cache_dir else None
+    return [run_cell(p, rep, seed, include_arbitrage, config=base, cache=cache) for p, rep, seed in cells]
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def run_sweep(grid, out_path, replicates=1, base_seed=0, workers=None, include_arbitrage=True, batch=1,
+              cache_dir=None):
+    # runs every (cell, replicate) missing from out_path and appends rows as
+    # soon as their batch finishes, so an interrupted sweep resumes where it
+    # stopped. With cache_dir, cells sharing spot settings and a replicate
+    # seed reuse one warm-up.
+    param_names = sorted(grid)
+    for name in param_names:
+        metrics.sim_settings({name: None})
+
+    done = {_cell_key({k: _literal(row[k]) for k in param_names}, row["replicate"], row["seed"])
+            for row in load_results(out_path) if all(k in row for k in param_names + ["seed"])}
+    todo = [(p, rep, seed) for p, rep, seed in grid_cells(grid, replicates, base_seed)
+            if _cell_key(p, rep, seed) not in done]
+    if not todo:
+        return load_results(out_path)
+
+    new_file = not os.path.exists(out_path) or os.path.getsize(out_path) == 0
+    with open(out_path, "a", newline="") as f, ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = None
+        futures = [pool.submit(run_batch, todo[i:i + batch], include_arbitrage, cache_dir)
+                   for i in range(0, len(todo), batch)]
+        n = 0
+        for fut in as_completed(futures):
+            rows = fut.result()
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+                if new_file:
+                    writer.writeheader()
+            writer.writerows(rows)
+            f.flush()
+            for row in rows:
+                n += 1
+                print(f"[{n}/{len(todo)}] " + " ".join(f"{k}={row[k]}" for k in param_names)
+                      + f" rep={row['replicate']} {row['seconds']}s")
+    return load_results(out_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parameter sweep over config values on a process pool")
+    parser.add_argument("--grid", action="append", required=True, metavar="NAME=v1,v2",
+                        help="config parameter and values; repeat for more dimensions")
+    parser.add_argument("--replicates", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--steps", type=int, default=None, help="shortcut for --grid NUM_STEPS=N")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch", type=int, default=1, help="cells run back to back per worker task")
+    parser.add_argument("--warmup-cache", default=None, metavar="DIR",
+                        help="reuse post-warm-up spot states across cells from this directory")
+    parser.add_argument("--no-arb", action="store_true", help="leave the option arbitrageurs out")
+    parser.add_argument("--out", default="sweep_results.csv")
+    args = parser.parse_args()
+
+    grid = parse_grid(args.grid)
+    if args.steps is not None:
+        grid["NUM_STEPS"] = [args.steps]
+
+    t0 = time.perf_counter()
+    rows = run_sweep(grid, args.out, replicates=args.replicates, base_seed=args.seed,
+                     workers=args.workers, include_arbitrage=not args.no_arb, batch=args.batch,
+                     cache_dir=args.warmup_cache)
+    print(f"{len(rows)} rows in {args.out} ({time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
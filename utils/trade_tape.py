@@ -0,0 +1,147 @@
+import csv
+import numpy as np
+
+# Columnar trade tape: a .npy file holding a sequence of structured-array
+# chunks written back to back with np.save, so the simulation can append as
+# it runs and the loader reads the whole tape with a handful of np.load calls.
+
+INSTRUMENTS = ('spot', 'option')
+OPTION_TYPES = ('', 'call', 'put')
+
+TAPE_DTYPE = np.dtype([
+    ('time', 'i8'),
+    ('price', 'f8'),
+    ('qty', 'f8'),
+    ('buyer', 'i8'),
+    ('seller', 'i8'),
+    ('instrument', 'u1'),    # index into INSTRUMENTS
+    ('strike', 'f8'),        # NaN for spot trades
+    ('option_type', 'u1'),   # index into OPTION_TYPES
+])
+
+COLUMNS = TAPE_DTYPE.names
+
+_INSTRUMENT_CODE = {None: 0, 'spot': 0, 'option': 1}
+_OPTION_TYPE_CODE = {None: 0, '': 0, 'call': 1, 'put': 2}
+
+
+def _row(trade):
+    time = trade.get('time')
+    strike = trade.get('strike')
+    return (-1 if time is None else time,
+            trade['price'],
+            trade['qty'],
+            trade['buyer'],
+            trade['seller'],
+            _INSTRUMENT_CODE[trade.get('instrument')],
+            np.nan if strike is None else strike,
+            _OPTION_TYPE_CODE[trade.get('option_type')])
+
+
+class TradeTapeWriter:
+    # buffers trades (Trade records or dicts) and writes a chunk every
+    # chunk_size rows; close() writes the remainder. resume_at takes a mark()
+    # from an earlier writer on the same file and continues from there,
+    # dropping anything written after the mark.
+    def __init__(self, path, chunk_size=65536, resume_at=None):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._rows = []
+        self.n_rows = 0
+        if resume_at is None:
+            self._f = open(path, 'wb')
+        else:
+            offset, self.n_rows = resume_at
+            self._f = open(path, 'r+b')
+            self._f.truncate(offset)
+            self._f.seek(offset)
+
+    def mark(self):
+        # (file offset, rows) after flushing; saved with a checkpoint
+        self.flush()
+        self._f.flush()
+        return self._f.tell(), self.n_rows
+
+    def append(self, trade):
+        self._rows.append(_row(trade))
+        if len(self._rows) >= self.chunk_size:
+            self.flush()
+
+    def extend(self, trades):
+        rows = self._rows
+        rows.extend(_row(tr) for tr in trades)
+        if len(rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        chunk = np.array(self._rows, dtype=TAPE_DTYPE)
+        np.save(self._f, chunk)
+        self.n_rows += len(chunk)
+        self._rows = []
+
+    def close(self):
+        if self._f is None:
+            return
+        self.flush()
+        self._f.close()
+        self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_tape(path, trades):
+    with TradeTapeWriter(path) as w:
+        w.extend(trades)
+
+
+def load_tape(path):
+    # whole tape as one structured array (dtype TAPE_DTYPE)
+    chunks = []
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                chunks.append(np.load(f))
+            except EOFError:
+                break
+    if not chunks:
+        return np.empty(0, dtype=TAPE_DTYPE)
+    return np.concatenate(chunks)
+
+
+def columns(tape):
+    # {column: ndarray}; instrument and option_type decoded to strings
+    out = {name: tape[name] for name in COLUMNS}
+    out['instrument'] = np.array(INSTRUMENTS, dtype=object)[tape['instrument']]
+    out['option_type'] = np.array(OPTION_TYPES, dtype=object)[tape['option_type']]
+    return out
+
+
+def to_dataframe(tape):
+    import pandas as pd
+
+    df = pd.DataFrame({name: tape[name] for name in COLUMNS})
+    df['instrument'] = pd.Categorical.from_codes(tape['instrument'], INSTRUMENTS)
+    df['option_type'] = pd.Categorical.from_codes(tape['option_type'], OPTION_TYPES)
+    return df
+
+
+def export_parquet(tape, path):
+    # needs pandas with pyarrow (or fastparquet)
+    to_dataframe(tape).to_parquet(path, index=False)
+
+
+def export_csv(tape, path):
+    cols = columns(tape)
+    strike = np.where(np.isnan(cols['strike']), None, cols['strike']).tolist()
+    with open(path, 'w', newline='') as f:
+        w = csv.writer(f)
+        w.writerow(COLUMNS)
+        w.writerows(zip(cols['time'].tolist(), cols['price'].tolist(), cols['qty'].tolist(),
+                        cols['buyer'].tolist(), cols['seller'].tolist(), cols['instrument'].tolist(),
+                        ['' if k is None else k for k in strike], cols['option_type'].tolist()))
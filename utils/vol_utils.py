@@ -1,32 +1,170 @@
 import math
+from collections import deque
+import numpy as np
+
+
+class _WindowStats:
+    # mean and sum of squared deviations over a sliding window, updated with
+    # Welford's recurrences for both the entering and the leaving value
+    __slots__ = ('n', 'mean', 'm2')
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x):
+        self.n -= 1
+        if self.n == 0:
+            self.mean = 0.0
+            self.m2 = 0.0
+            return
+        delta = x - self.mean
+        self.mean -= delta / self.n
+        self.m2 -= delta * (x - self.mean)
+
+    def reset(self, values):
+        self.__init__()
+        for x in values:
+            if x is not None:
+                self.add(x)
+
+    def variance(self):
+        return max(self.m2, 0.0) / (self.n - 1)
+
+
+class SlidingWindow:
+    # fixed-length window of values (None marks a missing slot); statistics
+    # cover the non-missing values and are rebuilt once per window length of
+    # removals so rounding from the remove step cannot accumulate
+    def __init__(self, window):
+        self.window = window
+        self.slots = deque()
+        self.stats = _WindowStats()
+        self._removed = 0
+
+    def push(self, x):
+        self.slots.append(x)
+        if x is not None:
+            self.stats.add(x)
+        if len(self.slots) > self.window:
+            old = self.slots.popleft()
+            if old is not None:
+                self.stats.remove(old)
+                self._removed += 1
+                if self._removed >= self.window:
+                    self.stats.reset(self.slots)
+                    self._removed = 0
+
+
+class RollingRealisedVol:
+    # annualised std of the last `lookback` log-returns, O(1) per new price.
+    # A return is skipped when either price is None or non-positive, as in
+    # realised_vol_last; the value is None until 3 prices and 2 valid returns.
+    def __init__(self, lookback=200, annualization=252):
+        self.lookback = lookback
+        self.annualization = annualization
+        self._returns = SlidingWindow(lookback)
+        self._last_price = None
+        self._n_prices = 0
+        self.value = None
+
+    def update(self, price):
+        if self._n_prices:
+            p0 = self._last_price
+            if p0 is None or price is None or p0 <= 0 or price <= 0:
+                self._returns.push(None)
+            else:
+                self._returns.push(math.log(price / p0))
+        self._last_price = price
+        self._n_prices += 1
+
+        stats = self._returns.stats
+        if self._n_prices < 3 or stats.n < 2:
+            self.value = None
+        else:
+            self.value = math.sqrt(stats.variance()) * math.sqrt(self.annualization)
+        return self.value
+
+    def series(self, prices):
+        return [self.update(p) for p in prices]
+
+
+class RollingMean:
+    # mean of the non-None (and non-NaN) values among the last `window`
+    # entries, None when there are none
+    def __init__(self, window=200):
+        self.window = window
+        self._values = SlidingWindow(window)
+        self.value = None
+
+    def update(self, x):
+        if x is not None and x != x:
+            x = None
+        self._values.push(x)
+        stats = self._values.stats
+        self.value = stats.mean if stats.n else None
+        return self.value
+
+    def series(self, values):
+        return [self.update(x) for x in values]
+
+
+class EwmaVol:
+    # RiskMetrics-style exponentially weighted vol of log-returns (zero mean),
+    # annualised; invalid prices are skipped and the value is None until 2
+    # valid returns have been seen
+    def __init__(self, lam=0.94, annualization=252):
+        self.lam = lam
+        self.annualization = annualization
+        self._last_price = None
+        self._var = None
+        self._n_returns = 0
+        self.value = None
+
+    def update(self, price):
+        p0 = self._last_price
+        self._last_price = price
+        if p0 is None or price is None or p0 <= 0 or price <= 0:
+            return self.value
+
+        r = math.log(price / p0)
+        if self._var is None:
+            self._var = r * r
+        else:
+            self._var = self.lam * self._var + (1 - self.lam) * r * r
+        self._n_returns += 1
+
+        if self._n_returns >= 2:
+            self.value = math.sqrt(self._var * self.annualization)
+        return self.value
+
+    def series(self, prices):
+        return [self.update(p) for p in prices]
+
 
 def realised_vol_last(prices, lookback=200, annualization=252):
+    # one-shot batch version of RollingRealisedVol over the last `lookback`
+    # returns; per-step callers should keep a tracker instead
     n = len(prices)
     if n < 3:
         return None
 
-    start = max(1, n - lookback)
-    rets = []
-    for i in range(start, n):
-        p0 = prices[i-1]
-        p1 = prices[i]
-        if p0 is None or p1 is None or p0 <= 0 or p1 <= 0:
-            continue
-        rets.append(math.log(p1 / p0))
-
-    if len(rets) < 2:
+    window = np.array(prices[max(0, n - lookback - 1):], dtype=float)     # None -> NaN
+    p0 = window[:-1]
+    p1 = window[1:]
+    with np.errstate(invalid='ignore'):
+        ok = (p0 > 0) & (p1 > 0)
+    if np.count_nonzero(ok) < 2:
         return None
-
-    m = sum(rets) / len(rets)
-    var = sum((r - m) ** 2 for r in rets) / (len(rets) - 1)
-    return math.sqrt(max(var, 0.0)) * math.sqrt(annualization)
+    rets = np.log(p1[ok] / p0[ok])
+    return float(np.std(rets, ddof=1)) * math.sqrt(annualization)
 
 def rolling_mean(series, window=200):
-    out = [None] * len(series)
-    for t in range(len(series)):
-        start = max(0, t - window + 1)
-        vals = [x for x in series[start:t+1] if x is not None]
-        if len(vals) == 0:
-            continue
-        out[t] = sum(vals) / len(vals)
-    return out
+    return RollingMean(window).series(series)
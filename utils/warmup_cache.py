@@ -0,0 +1,105 @@
+import dataclasses
+import hashlib
+import os
+
+# On-disk cache of post-warm-up spot markets (Market.snapshot() blobs). The
+# key hashes every setting the warm-up reads plus the seed, so runs that only
+# differ in option-side settings or NUM_STEPS share an entry. Entries are
+# files named by their key; reading one refreshes its mtime and the least
+# recently used files are deleted once the cache grows past its limits.
+
+# bump when a change to the spot simulation invalidates cached states
+CACHE_VERSION = 2
+
+# SimConfig fields the spot warm-up does not read; the seed is keyed separately
+NON_SPOT_FIELDS = frozenset({
+    'NUM_STEPS', 'SEED',
+    'NUM_OPTION_MARKET_MAKERS', 'NUM_OPTION_NOISE_TRADERS', 'NUM_OPTION_ARB',
+    'OPTION_STRIKES', 'OPTION_TAU', 'OPTION_R', 'OPTION_Q', 'OPTION_VOL',
+    'OPTION_SPREAD_FACTOR', 'OPTION_ARB_THRESHOLD', 'MIN_OPTION_PRICE',
+    'DELTA_HEDGE_THRESHOLD', 'DELTA_HEDGE_INTERVAL',
+})
+
+
+def warmup_key(config, seed):
+    # None for seed=None: fresh entropy never repeats, so there is nothing to share
+    if seed is None:
+        return None
+    spot = sorted((k, v) for k, v in config.as_dict().items() if k not in NON_SPOT_FIELDS)
+    text = repr((CACHE_VERSION, spot, int(seed)))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class WarmupCache:
+    def __init__(self, directory=".warmup_cache", max_bytes=1 << 30, max_entries=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pkl")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return blob
+
+    def put(self, key, blob):
+        # unique temp name, so pool workers filling the same key do not clash
+        tmp = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, self._path(key))
+        self.evict()
+
+    def get_or_build(self, config, seed, build):
+        # build() -> blob, called on a miss; uncacheable seeds always build
+        key = warmup_key(config, seed)
+        if key is None:
+            return build()
+        blob = self.get(key)
+        if blob is None:
+            blob = build()
+            self.put(key, blob)
+        return blob
+
+    def entries(self):
+        # [(mtime, size, path)], least recently used first
+        out = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".pkl"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            out.append((st.st_mtime, st.st_size, path))
+        out.sort()
+        return out
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, path in entries:
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+            over_count = self.max_entries is not None and count > self.max_entries
+            if not (over_bytes or over_count) or count == 1:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            count -= 1
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.remove(path)